@@ -6,6 +6,8 @@
 # Copyright (c) 2021 dmh23
 #
 
+import numpy as np
+
 from src.action_space.action_space import ActionSpace
 from src.action_space.action import Action
 
@@ -22,6 +24,13 @@ class ActionSpaceFilter:
     def should_show_action(self, index):
         return self._action_on[index]
 
+    def should_show_actions(self, indexes: np.ndarray) -> np.ndarray:
+        return np.array(self._action_on, dtype=bool)[indexes]
+
+    def get_actions_shown(self) -> tuple:
+        # Changes whenever the filter does, e.g. to tell whether something filtered earlier is still the same
+        return tuple(self._action_on)
+
     def set_filter_all(self):
         self._action_on = self._action_space.get_new_boolean_marker(True)
 
@@ -45,10 +45,15 @@ class Analyzer:
         self.current_track = current_track
         self.warning_track_changed()
 
-    def set_all_episodes(self, all_episodes, all_episodes_reward_percentiles):
+    def set_all_episodes(self, all_episodes, all_episodes_reward_percentiles, appended_episodes=None):
+        # Appended episodes are given when following a log that is still being written, and are already at the
+        # end of all_episodes (but the quarters of earlier episodes might also have changed)
         self.all_episodes = all_episodes
         self.all_episodes_reward_percentiles = all_episodes_reward_percentiles
-        self.warning_all_episodes_changed()
+        if appended_episodes is None:
+            self.warning_all_episodes_changed()
+        else:
+            self.warning_episodes_appended(appended_episodes)
 
     def set_log_meta(self, log_meta :LogMeta):
         self.log_meta = log_meta
@@ -94,6 +99,7 @@ class Analyzer:
 
     def recalculate(self):
         # You MIGHT override this to perform time-consuming analysis before redrawing
+        # (see BackgroundCalculation to do it in a worker thread so the UI stays responsive)
         pass
 
     def warning_track_changed(self):
@@ -111,6 +117,11 @@ class Analyzer:
         # Do not override to redraw() since Guru already calls redraw() at the right times!
         pass
 
+    def warning_episodes_appended(self, appended_episodes):
+        # You MIGHT override this to update cached or pre-calculated data structures without a full rebuild
+        # Do not override to redraw() since Guru already calls redraw() at the right times!
+        self.warning_all_episodes_changed()
+
     def warning_lost_control(self):
         # You MIGHT override this to stop activities such an animation if another analyser has just been chosen
         pass
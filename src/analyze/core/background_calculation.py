@@ -0,0 +1,124 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import queue
+import threading
+import tkinter as tk
+
+from src.utils.progress import ProgressReporter
+
+POLL_MILLISECONDS = 50
+
+
+class BackgroundCalculation:
+    #
+    # PUBLIC interface
+    #
+
+    # Runs the time-consuming part of an analyzer's recalculate() in a worker thread, so the UI stays responsive and
+    # never has to pump events (e.g. to draw a progress bar) in the middle of drawing. Each calculation started is a
+    # new generation, and only the result of the latest generation is handed back, on the main thread, by polling
+    # with after(). So a change to the controls part way through simply starts another calculation, and the stale
+    # one is told to give up as soon as it can and its result (if any) is thrown away
+
+    def __init__(self, widget: tk.Misc, please_wait: ProgressReporter, on_result: callable):
+        self._widget = widget
+        self._please_wait = please_wait
+        self._on_result = on_result
+
+        self._generation = 0
+        self._cancelled = None
+        self._progress = None
+        self._is_showing_progress = False
+        self._results = queue.Queue()
+        self._poll_id = None
+
+    def start(self, title: str, calculate: callable, *args):
+        # Calls calculate(cancelled: threading.Event, progress: ProgressReporter, *args) in a worker thread, and
+        # then on_result() with whatever it returns, unless another calculation is started (or this is cancelled)
+        # first. The calculation must not touch Tk, and should check cancelled now and then
+        self.cancel()
+        self._generation += 1
+        self._cancelled = threading.Event()
+        self._progress = _BackgroundProgress(title)
+
+        thread = threading.Thread(target=self._run_calculation,
+                                  args=(self._generation, self._cancelled, self._progress, calculate, args))
+        thread.daemon = True   # Set as daemon so thread is killed if main GUI is closed
+        thread.start()
+
+        if self._poll_id is None:
+            self._poll_id = self._widget.after(POLL_MILLISECONDS, self._poll)
+
+    def cancel(self):
+        if self._cancelled is not None:
+            self._cancelled.set()
+            self._cancelled = None
+
+    def is_running(self) -> bool:
+        return self._cancelled is not None
+
+    #
+    # PRIVATE implementation
+    #
+
+    def _run_calculation(self, generation: int, cancelled: threading.Event, progress: ProgressReporter,
+                         calculate: callable, args: tuple):
+        try:
+            result = calculate(cancelled, progress, *args)
+        except Exception as e:
+            self._results.put((generation, None, e))
+        else:
+            if not cancelled.is_set():
+                self._results.put((generation, result, None))
+
+    def _poll(self):
+        self._poll_id = None
+
+        latest = None
+        while not self._results.empty():
+            (generation, result, error) = self._results.get()
+            if generation == self._generation and self._cancelled is not None:
+                latest = (result, error)
+
+        if latest:
+            self._cancelled = None
+            self._stop_showing_progress()
+            (result, error) = latest
+            if error:
+                raise error
+            self._on_result(result)
+        elif self._cancelled is None:
+            self._stop_showing_progress()
+        else:
+            # Drawing the progress bar pumps events, so another calculation might even have started meanwhile
+            self._show_progress()
+            if self._cancelled is not None and self._poll_id is None:
+                self._poll_id = self._widget.after(POLL_MILLISECONDS, self._poll)
+
+    def _show_progress(self):
+        if not self._is_showing_progress:
+            self._is_showing_progress = True
+            self._please_wait.start(self._progress.title)
+        self._please_wait.set_progress(self._progress.percent_done)
+
+    def _stop_showing_progress(self):
+        if self._is_showing_progress:
+            self._is_showing_progress = False
+            self._please_wait.stop()
+
+
+class _BackgroundProgress(ProgressReporter):
+    # Just remembers the progress reported by the worker thread, for the main thread to draw when it next polls
+
+    def __init__(self, title: str):
+        self.title = title
+        self.percent_done = 0.0
+
+    def set_progress(self, percent_done: float):
+        self.percent_done = percent_done
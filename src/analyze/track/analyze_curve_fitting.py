@@ -114,6 +114,12 @@ class AnalyzeCurveFitting(TrackAnalyzer):
         self._all_sequences.save()
         self.guru_parent_redraw()
 
+    def warning_episodes_appended(self, appended_episodes):
+        new_sequences = extract_all_sequences(appended_episodes, 10)
+        self._episode_sequences.add_sequences(new_sequences)
+        self._all_sequences.add_sequences(new_sequences)
+        self._all_sequences.save()
+
     def highlight_previous(self):
         self._highlighted_sequence_id -= 1
         self.guru_parent_redraw()
@@ -6,15 +6,23 @@
 # Copyright (c) 2021 dmh23
 #
 
+import copy
+import functools
+import threading
 import tkinter as tk
 
 import src.analyze.core.measurement_brightness as measurement_brightness
 
+from src.analyze.core.background_calculation import BackgroundCalculation
 from src.analyze.track.track_analyzer import TrackAnalyzer
+from src.analyze.util.heat_map_cache import HeatMapCache
 from src.configuration.config_manager import ConfigManager
 from src.episode.episode import Episode
 from src.graphics.track_graphics import TrackGraphics
+from src.personalize.configuration.analysis import HEAT_MAP_CACHE_MEGABYTES
+from src.tracks.track import Track
 from src.ui.please_wait import PleaseWait
+from src.utils.progress import ProgressReporter, ProgressTicker
 from src.analyze.core.controls import ConvergenceGranularityControl, TrackAppearanceControl,\
     EpisodeRadioButtonControl, MoreFiltersControl, MeasurementControl, SkipControl
 
@@ -37,6 +45,14 @@ class AnalyzeHeatmap(TrackAnalyzer):
         self._statistics_heat_map = None
         self.please_wait = please_wait
 
+        # The heat maps are calculated in the background, and are only shown when they are for the current settings
+        # and episodes, which are held as (visits_key, statistics_key, episodes) - see recalculate()
+        self._background_calculation = BackgroundCalculation(control_frame, please_wait,
+                                                             self._callback_heat_maps_calculated)
+        self._heat_maps_for = None
+        self._calculating_for = None
+        self._heat_map_cache = HeatMapCache(HEAT_MAP_CACHE_MEGABYTES * 1024 * 1024)
+
         self._alternate_discount_factor_index = None
 
     def build_control_frame(self, control_frame):
@@ -48,7 +64,7 @@ class AnalyzeHeatmap(TrackAnalyzer):
         self._more_filters_control.add_to_control_frame()
 
     def redraw(self):
-        if self._visits_heat_map:
+        if self._visits_heat_map and not self._calculating_for:
             brightness = 0
             if self._appearance_control.bright_brightness():
                 brightness = 1
@@ -84,35 +100,28 @@ class AnalyzeHeatmap(TrackAnalyzer):
                 self._statistics_heat_map.draw_statistic(self.track_graphics, brightness, color_palette, self._visits_heat_map)
 
     def warning_filtered_episodes_changed(self):
-        if self._episodes_control.show_filtered():
-            self._visits_heat_map = None
-            self._statistics_heat_map = None
+        # Nothing to do, since recalculate() adds or removes just the episodes that are now in or out of the maps
+        pass
 
     def warning_track_changed(self):
-        self._visits_heat_map = None
-        self._statistics_heat_map = None
+        self._forget_heat_maps()
 
     def warning_all_episodes_changed(self):
-        self._visits_heat_map = None
-        self._statistics_heat_map = None
+        self._forget_heat_maps()
 
-    def warning_action_space_filter_changed(self):
-        if self._more_filters_control.filter_actions():
-            self._visits_heat_map = None
-            self._statistics_heat_map = None
+    def warning_lost_control(self):
+        self._background_calculation.cancel()
+        self._calculating_for = None
 
-    def warning_sector_filter_changed(self):
-        if self._more_filters_control.filter_sector():
-            self._visits_heat_map = None
-            self._statistics_heat_map = None
+    def warning_episodes_appended(self, appended_episodes):
+        # The earlier episodes are unchanged, so the new ones are simply added by recalculate() if they are wanted
+        pass
 
     def _callback_full_recalculate(self, optional_value=None):
-        self._visits_heat_map = None
-        self._statistics_heat_map = None
+        # Any change to the settings is seen by recalculate() when it next compares the keys of the heat maps
         self.guru_parent_redraw()
 
     def _callback_different_measurement(self, optional_value=None):
-        self._statistics_heat_map = None
         self.guru_parent_redraw()
 
     def _callback_quick_change_appearance(self, optional_value=None):
@@ -136,194 +145,181 @@ class AnalyzeHeatmap(TrackAnalyzer):
         else:
             episodes = None
 
-        if episodes:
-            if not self._visits_heat_map or (
-                    not self._measurement_control.measure_visits() and not self._statistics_heat_map):
-
-                self.please_wait.start("Calculating")
-
-                self._statistics_heat_map = self.current_track.get_new_heat_map(
-                    self._granularity_control.granularity() / 100, True)
-                if self._visits_heat_map:
-                    recalculate_visits = False
-                else:
-                    recalculate_visits = True
-                    self._visits_heat_map = self.current_track.get_new_heat_map(
-                        self._granularity_control.granularity() / 100, False)
-
-                if self._more_filters_control.filter_actions():
-                    action_space_filter = self.action_space_filter
-                else:
-                    action_space_filter = None
-
-                if self._more_filters_control.filter_sector() and self.sector_filter and len(self.sector_filter) == 1:
-                    waypoint_range = self.current_track.get_sector_start_and_finish(self.sector_filter)
-                else:
-                    waypoint_range = None
-
-                # Plug in brightness method - the new way
-                if self._measurement_control.measure_steering_straight():
-                    brightness_method = measurement_brightness.get_brightness_for_steering_straight
-                elif self._measurement_control.measure_steering_left():
-                    brightness_method = measurement_brightness.get_brightness_for_steering_left
-                elif self._measurement_control.measure_steering_right():
-                    brightness_method = measurement_brightness.get_brightness_for_steering_right
-                elif self._measurement_control.measure_projected_travel_distance():
-                    brightness_method = measurement_brightness.get_brightness_for_projected_travel_distance
-                else:
-                    brightness_method = None
-
-                if brightness_method:
-                    e: Episode
-                    for i, e in enumerate(episodes):
-                        e.apply_event_stat_to_heat_map(brightness_method, self._statistics_heat_map, skip_start, skip_end,
-                                                       action_space_filter, waypoint_range)
-                        if recalculate_visits:
-                            e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter,
-                                                       waypoint_range)
-                        self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-                # Else still doing it the OLD kludgy way ...
-                elif self._measurement_control.measure_visits():
-                    self._recalculate_measure_visits(episodes, skip_start, skip_end, action_space_filter, waypoint_range)
-                elif self._measurement_control.measure_action_speed():
-                    self._recalculate_measure_action_speed(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                elif self._measurement_control.measure_progress_speed():
-                    self._recalculate_measure_progress_speed(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                elif self._measurement_control.measure_track_speed():
-                    self._recalculate_measure_track_speed(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                elif self._measurement_control.measure_event_reward():
-                    self._recalculate_measure_reward(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                elif self._measurement_control.measure_new_event_reward():
-                    self._recalculate_measure_new_reward(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                elif self._measurement_control.measure_discounted_future_reward():
-                    self._recalculate_measure_discounted_future_reward(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                elif self._measurement_control.measure_new_discounted_future_reward():
-                    self._recalculate_measure_new_discounted_future_reward(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                elif self._measurement_control.measure_slide():
-                    self._recalculate_measure_slide(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                elif self._measurement_control.measure_skew():
-                    self._recalculate_measure_skew(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                elif self._measurement_control.measure_smoothness():
-                    self._recalculate_measure_smoothness(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                elif self._measurement_control.measure_acceleration():
-                    self._recalculate_measure_acceleration(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                elif self._measurement_control.measure_braking():
-                    self._recalculate_measure_braking(episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits)
-                else:
-                    self._alternate_discount_factor_index = self._measurement_control.get_alternate_discount_factor_index()
-                    if self._alternate_discount_factor_index is not None:
-                        self._recalculate_measure_alternate_discounted_future_reward(episodes, skip_start, skip_end,
-                                                                                     action_space_filter, waypoint_range, recalculate_visits)
-
-    def _recalculate_measure_visits(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_action_speed(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_action_speed_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_track_speed(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_track_speed_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_progress_speed(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_progress_speed_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_reward(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_reward_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_new_reward(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_new_reward_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_discounted_future_reward(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_discounted_future_reward_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_alternate_discounted_future_reward(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_alternate_discounted_future_reward_to_heat_map(self._statistics_heat_map, skip_start, skip_end,
-                                                                   action_space_filter, waypoint_range,
-                                                                   self._alternate_discount_factor_index)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_new_discounted_future_reward(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_new_discounted_future_reward_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_slide(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_slide_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_skew(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_skew_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_smoothness(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_smoothness_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_acceleration(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_acceleration_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
-
-    def _recalculate_measure_braking(self, episodes, skip_start, skip_end, action_space_filter, waypoint_range, recalculate_visits: bool):
-        e: Episode
-        for i, e in enumerate(episodes):
-            e.apply_braking_to_heat_map(self._statistics_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            if recalculate_visits:
-                e.apply_visits_to_heat_map(self._visits_heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
-            self.please_wait.set_progress((i + 1) / len(episodes) * 100)
+        if not episodes:
+            self._background_calculation.cancel()
+            self._calculating_for = None
+            self._set_heat_maps(None, None, None)
+            return
+
+        if self._more_filters_control.filter_actions():
+            # A deep copy, since the calculation might carry on in the background while the filter is changed, and
+            # the action filter dialog changes the list of actions shown in place
+            action_space_filter = copy.deepcopy(self.action_space_filter)
+        else:
+            action_space_filter = None
+
+        if self._more_filters_control.filter_sector() and self.sector_filter and len(self.sector_filter) == 1:
+            waypoint_range = self.current_track.get_sector_start_and_finish(self.sector_filter)
+        else:
+            waypoint_range = None
+
+        # Every setting that changes what each episode contributes to a heat map
+        granularity = self._granularity_control.granularity() / 100
+        filters = (skip_start, skip_end, action_space_filter, waypoint_range)
+        filters_key = (granularity, skip_start, skip_end,
+                       action_space_filter.get_actions_shown() if action_space_filter else None, waypoint_range)
+
+        (measure_name, apply_measure) = self._get_measure()
+        visits_key = ("visits",) + filters_key
+        statistics_key = (measure_name,) + filters_key
+        heat_maps_for = (visits_key, statistics_key, tuple(episodes))
+
+        if heat_maps_for == self._heat_maps_for:
+            # Back to what is already shown, so anything still being calculated is no longer wanted
+            self._background_calculation.cancel()
+            self._calculating_for = None
+            return
+        if heat_maps_for == self._calculating_for:
+            return
+
+        # Going back to heat maps that were calculated before is instant, and otherwise each episode's contribution to
+        # a heat map is only calculated once for the same key, so changing which episodes are shown (e.g. the episode
+        # filter) is quick, and only needs a worker thread if there are new ones
+        heat_map_jobs = [(visits_key, False, lambda e, heat_map: e.apply_visits_to_heat_map(heat_map, *filters)),
+                         (statistics_key, True,
+                          lambda e, heat_map: apply_measure(e, heat_map, *filters) if apply_measure else None)]
+        heat_maps = [self._heat_map_cache.get_heat_map(key, heat_maps_for[2]) for (key, _, _) in heat_map_jobs]
+        contributions = [None if heat_map else self._heat_map_cache.get_contributions(key)
+                         for (key, _, _), heat_map in zip(heat_map_jobs, heat_maps)]
+        args = (self.current_track, granularity, list(episodes), heat_map_jobs, heat_maps, contributions)
+
+        if all(e in c for c in contributions if c is not None for e in episodes):
+            self._background_calculation.cancel()
+            self._calculating_for = None
+            self._set_calculated_heat_maps(heat_maps_for,
+                                           _calculate_heat_maps(threading.Event(), ProgressReporter(), *args))
+        else:
+            self._calculating_for = heat_maps_for
+            self._background_calculation.start("Calculating", _calculate_heat_maps, *args)
+
+    def _get_measure(self):
+        # The name of the chosen measure, and how to apply it to a heat map for an episode given the filters, or
+        # None for both if there is nothing to measure but the visits
+        if self._measurement_control.measure_visits():
+            return None, None
+
+        # Plug in brightness method - the new way
+        if self._measurement_control.measure_steering_straight():
+            brightness_method = measurement_brightness.get_brightness_for_steering_straight
+        elif self._measurement_control.measure_steering_left():
+            brightness_method = measurement_brightness.get_brightness_for_steering_left
+        elif self._measurement_control.measure_steering_right():
+            brightness_method = measurement_brightness.get_brightness_for_steering_right
+        elif self._measurement_control.measure_projected_travel_distance():
+            brightness_method = measurement_brightness.get_brightness_for_projected_travel_distance
+        else:
+            brightness_method = None
+
+        if brightness_method:
+            return brightness_method.__name__, functools.partial(_apply_event_stat, brightness_method)
+
+        # Else still doing it the OLD kludgy way ...
+        if self._measurement_control.measure_action_speed():
+            method = Episode.apply_action_speed_to_heat_map
+        elif self._measurement_control.measure_progress_speed():
+            method = Episode.apply_progress_speed_to_heat_map
+        elif self._measurement_control.measure_track_speed():
+            method = Episode.apply_track_speed_to_heat_map
+        elif self._measurement_control.measure_event_reward():
+            method = Episode.apply_reward_to_heat_map
+        elif self._measurement_control.measure_new_event_reward():
+            method = Episode.apply_new_reward_to_heat_map
+        elif self._measurement_control.measure_discounted_future_reward():
+            method = Episode.apply_discounted_future_reward_to_heat_map
+        elif self._measurement_control.measure_new_discounted_future_reward():
+            method = Episode.apply_new_discounted_future_reward_to_heat_map
+        elif self._measurement_control.measure_slide():
+            method = Episode.apply_slide_to_heat_map
+        elif self._measurement_control.measure_skew():
+            method = Episode.apply_skew_to_heat_map
+        elif self._measurement_control.measure_smoothness():
+            method = Episode.apply_smoothness_to_heat_map
+        elif self._measurement_control.measure_acceleration():
+            method = Episode.apply_acceleration_to_heat_map
+        elif self._measurement_control.measure_braking():
+            method = Episode.apply_braking_to_heat_map
+        else:
+            self._alternate_discount_factor_index = self._measurement_control.get_alternate_discount_factor_index()
+            if self._alternate_discount_factor_index is None:
+                return None, None
+            index = self._alternate_discount_factor_index
+            return (("alternate_discounted_future_reward", index),
+                    lambda e, heat_map, *filters: e.apply_alternate_discounted_future_reward_to_heat_map(
+                        heat_map, *filters, index))
+
+        return method.__name__, method
+
+    def _callback_heat_maps_calculated(self, result):
+        heat_maps_for = self._calculating_for
+        self._calculating_for = None
+        self._set_calculated_heat_maps(heat_maps_for, result)
+        self.guru_parent_redraw()
+
+    def _set_calculated_heat_maps(self, heat_maps_for, result):
+        # Any heat maps that were not already in the cache are added to it
+        (visits_key, statistics_key, episodes) = heat_maps_for
+        for key, (heat_map, contributions) in zip([visits_key, statistics_key], result):
+            if contributions is not None:
+                self._heat_map_cache.put(key, episodes, heat_map, contributions)
+
+        ((visits_heat_map, _), (statistics_heat_map, _)) = result
+        self._set_heat_maps(heat_maps_for, visits_heat_map, statistics_heat_map)
+
+    def _set_heat_maps(self, heat_maps_for, visits_heat_map, statistics_heat_map):
+        self._heat_maps_for = heat_maps_for
+        self._visits_heat_map = visits_heat_map
+        self._statistics_heat_map = statistics_heat_map
+
+    def _forget_heat_maps(self):
+        self._background_calculation.cancel()
+        self._calculating_for = None
+        self._set_heat_maps(None, None, None)
+        self._heat_map_cache.clear()
+
+
+def _calculate_heat_maps(cancelled: threading.Event, progress: ProgressReporter, track: Track, granularity: float,
+                         episodes: list[Episode], heat_map_jobs: list, heat_maps: list, contributions: list):
+    # The heat map for each job and its contributions, or just the heat map if it was already finished, or else
+    # None if cancelled part way through. A new heat map has the contribution of every episode, either as already
+    # calculated or else calculated now (and added to its contributions)
+    ticker = ProgressTicker(progress, 0, 100, len(episodes) * heat_maps.count(None))
+    amount_done = 0
+    next_tick = ticker.tick(0)
+
+    result = []
+    for (_, allow_repeats, apply), heat_map, job_contributions in zip(heat_map_jobs, heat_maps, contributions):
+        if heat_map:
+            result.append((heat_map, None))
+            continue
+
+        heat_map = track.get_new_heat_map(granularity, allow_repeats)
+        for e in episodes:
+            if cancelled.is_set():
+                return None
+            contribution = job_contributions.get(e)
+            if contribution is None:
+                contribution = heat_map.get_contribution(functools.partial(apply, e))
+                job_contributions[e] = contribution
+            heat_map.add_contribution(e, contribution)
+
+            amount_done += 1
+            if amount_done >= next_tick:
+                next_tick = ticker.tick(amount_done)
+        result.append((heat_map, job_contributions))
+
+    ticker.finish()
+    return result
+
+
+def _apply_event_stat(stat_extractor: callable, episode: Episode, heat_map, *filters):
+    episode.apply_event_stat_to_heat_map(stat_extractor, heat_map, *filters)
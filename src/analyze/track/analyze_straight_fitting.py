@@ -7,6 +7,7 @@
 #
 
 import tkinter as tk
+import numpy as np
 
 from src.analyze.core.controls import InformationTextControl, NumericButtonsControl
 from src.analyze.track.track_analyzer import TrackAnalyzer
@@ -77,11 +78,18 @@ class AnalyzeStraightFitting(TrackAnalyzer):
 
     def _try_bearings(self, start, finish, step, waypoint_id):
         path_width = self._path_width_control.get_value()
+        bearings = []
         bearing = start
         while bearing <= finish:
-            distance = self.current_track.get_projected_distance_on_track(self._chosen_point, bearing, waypoint_id,
-                                                                          path_width)
+            bearings.append(bearing)
+            bearing += step
+
+        (x, y) = self._chosen_point
+        distances = self.current_track.get_projected_distances_on_track(
+            np.full(len(bearings), x), np.full(len(bearings), y), np.array(bearings),
+            np.full(len(bearings), waypoint_id), path_width)
+
+        for bearing, distance in zip(bearings, distances.tolist()):
             if distance > self._distance:
                 self._distance = distance
                 self._chosen_bearing = bearing
-            bearing += step
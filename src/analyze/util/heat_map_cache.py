@@ -0,0 +1,96 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+from src.analyze.util.heatmap import HeatMap
+
+
+class HeatMapCache:
+    #
+    # PUBLIC interface
+    #
+
+    # Heat maps that have been calculated, each for a key of every setting that affects it (other than which
+    # episodes are in it), most recently used last. Along with the finished heat map for the latest episodes, the
+    # contribution of every episode ever calculated for the key is kept too, so a heat map for other episodes only
+    # needs the contributions of any new ones (see HeatMap.get_contribution). The least recently used are thrown
+    # away to stay within the memory budget
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._entries = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get_heat_map(self, key, episodes: tuple):
+        # The finished heat map for exactly these episodes, if there is one
+        entry = self._use_entry(key)
+        if entry and entry.episodes == episodes:
+            self._hits += 1
+            return entry.heat_map
+
+        self._misses += 1
+        return None
+
+    def get_contributions(self, key) -> dict:
+        # A copy of the contribution of each episode, which can be added to (e.g. in a background thread)
+        entry = self._use_entry(key)
+        if entry:
+            return dict(entry.contributions)
+        return {}
+
+    def put(self, key, episodes: tuple, heat_map: HeatMap, contributions: dict):
+        self._entries.pop(key, None)
+        self._entries[key] = _HeatMapCacheEntry(episodes, heat_map, contributions)
+        self._remove_least_recently_used()
+
+    def clear(self):
+        self._entries = {}
+
+    def get_hits(self) -> int:
+        return self._hits
+
+    def get_misses(self) -> int:
+        return self._misses
+
+    def get_memory_size(self) -> int:
+        return sum(entry.get_memory_size() for entry in self._entries.values())
+
+    #
+    # PRIVATE implementation
+    #
+
+    def _use_entry(self, key):
+        # Dicts keep the order that keys were added, so moving a key to the end marks it as the most recently used
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._entries[key] = entry
+        return entry
+
+    def _remove_least_recently_used(self):
+        # Heat maps grow as their cell values are calculated for drawing, so the sizes are taken afresh each time,
+        # and the most recently used entry is always kept, even if it is over the budget by itself
+        sizes = [entry.get_memory_size() for entry in self._entries.values()]
+        total_size = sum(sizes)
+        for key, size in zip(list(self._entries.keys())[:-1], sizes):
+            if total_size <= self._max_bytes:
+                break
+            del self._entries[key]
+            total_size -= size
+
+
+class _HeatMapCacheEntry:
+    def __init__(self, episodes: tuple, heat_map: HeatMap, contributions: dict):
+        self.episodes = episodes
+        self.heat_map = heat_map
+        self.contributions = contributions
+
+    def get_memory_size(self) -> int:
+        # The heat map holds the contributions of its own episodes, so only the others are added
+        contributors = set(self.heat_map.get_contributors())
+        return self.heat_map.get_memory_size() + sum(
+            cells.nbytes + stats.nbytes for (e, (cells, stats)) in self.contributions.items() if e not in contributors)
@@ -10,7 +10,7 @@ import typing
 import numpy as np
 
 from src.graphics.track_graphics import TrackGraphics
-from src.utils.colors import get_color_for_data, ColorPalette
+from src.utils.colors import ColorPalette, get_color_lookup_indexes, get_color_lookup_table
 
 
 class HeatMap:
@@ -18,6 +18,9 @@ class HeatMap:
     # PUBLIC interface
     #
 
+    # Every visit that counts is held as the (flattened) index of its cell plus its stat, in arrays, and the counts
+    # and medians of all the cells are then calculated together by sorting these arrays, rather than cell by cell
+
     def __init__(self, min_x, min_y, max_x, max_y, granularity, allow_repeats: bool):
         self.min_x = min_x
         self.min_y = min_y
@@ -27,19 +30,79 @@ class HeatMap:
 
         self._granularity = granularity
 
-        x_size = self._get_x_index(max_x) + 1
-        y_size = self._get_y_index(max_y) + 1
+        self._x_size = self._get_x_index(max_x) + 1
+        self._y_size = self._get_y_index(max_y) + 1
+
+        self._cell_chunks = []
+        self._stat_chunks = []
+        self._last_visitors = np.full(self._x_size * self._y_size, -1, dtype=np.int64)
+        self._visitor_ids = {}
+        self._contributions = {}
 
-        self._stats = [[[] for _ in range(x_size)] for _ in range(y_size)]
-        self._last_visitor = [[None] * x_size for _ in range(y_size)]
+        # Results of _get_cell_values() for each stat method, until there are more visits
+        self._cell_values = {}
 
     def visit(self, x, y, visitor, stat: typing.Union[float, int]):
-        x_index = self._get_x_index(x)
-        y_index = self._get_y_index(y)
+        self.visit_all(np.array([x], dtype=float), np.array([y], dtype=float), visitor, np.array([stat], dtype=float))
+
+    def visit_all(self, x: np.ndarray, y: np.ndarray, visitors, stats: np.ndarray):
+        # The same as calling visit() for each point in turn, where visitors is one visitor for them all or else
+        # an array of a visitor for each point
+        if len(x) == 0:
+            return
 
-        if self._allow_repeats or visitor != self._last_visitor[y_index][x_index]:
-            self._last_visitor[y_index][x_index] = visitor
-            self._stats[y_index][x_index].append(float(stat))
+        cells = self._get_y_indexes(y) * self._x_size + self._get_x_indexes(x)
+        stats = np.asarray(stats, dtype=float)
+        if np.ndim(visitors) == 0:
+            visitor_ids = np.full(len(cells), self._get_visitor_id(visitors), dtype=np.int64)
+        else:
+            visitor_ids = np.array([self._get_visitor_id(v) for v in visitors], dtype=np.int64)
+
+        if not self._allow_repeats:
+            counts = self._is_new_visitor(cells, visitor_ids)
+            cells = cells[counts]
+            stats = stats[counts]
+
+        self._cell_chunks.append(cells)
+        self._stat_chunks.append(stats)
+        self._cell_values = {}
+
+    def get_contribution(self, apply_visits: callable):
+        # The visits that count when apply_visits(heat_map) visits a heat map like this one as a single new visitor
+        # (e.g. one episode), as arrays of their cells and stats. The visits of one visitor never change whether
+        # the visits of another count, so contributions can be added to (and removed from) any heat map with the
+        # same bounds and granularity, in any order
+        recorder = _VisitRecorder()
+        apply_visits(recorder)
+        if not recorder.x_chunks:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        cells = (self._get_y_indexes(np.concatenate(recorder.y_chunks)) * self._x_size +
+                 self._get_x_indexes(np.concatenate(recorder.x_chunks)))
+        stats = np.concatenate(recorder.stat_chunks)
+        if not self._allow_repeats:
+            (cells, first_visits) = np.unique(cells, return_index=True)
+            stats = stats[first_visits]
+        return cells, stats
+
+    def add_contribution(self, visitor, contribution: tuple):
+        assert visitor not in self._contributions
+        self._contributions[visitor] = contribution
+        self._cell_values = {}
+
+    def remove_contribution(self, visitor):
+        del self._contributions[visitor]
+        self._cell_values = {}
+
+    def get_contributors(self):
+        return list(self._contributions.keys())
+
+    def get_memory_size(self) -> int:
+        # Roughly the bytes held by all the arrays of visits, contributions and cell values
+        arrays = (self._cell_chunks + self._stat_chunks + [self._last_visitors] +
+                  [a for contribution in self._contributions.values() for a in contribution] +
+                  list(self._cell_values.values()))
+        return sum(a.nbytes for a in arrays)
 
     def get_visits_and_scope_range(self, brightness: int):
         assert brightness in [-1, 0, 1, 2]
@@ -64,7 +127,7 @@ class HeatMap:
 
         visits, min_visits, max_visits = self.get_visits_and_scope_range(brightness)
 
-        if not visits:
+        if visits is None:
             return
 
         colour_multiplier = 255 / max_visits / max_visits * 2
@@ -76,15 +139,8 @@ class HeatMap:
         elif brightness == -1:
             colour_multiplier /= 2
 
-        for yy, visits in enumerate(visits):
-            for xx, visit in enumerate(visits):
-                if visit >= min_visits:
-                    x = self.min_x + self._granularity * xx
-                    y = self.min_y + self._granularity * yy
-
-                    data = min(1.0, 30/255 + colour_multiplier / 255 * visit * visit)
-                    colour = get_color_for_data(data, color_palette)
-                    track_graphics.plot_box(x, y, x + self._granularity, y + self._granularity, colour)
+        data = np.minimum(1.0, 30/255 + colour_multiplier / 255 * visits * visits)
+        self._draw_cells(track_graphics, np.where(visits >= min_visits, data, math.nan), color_palette)
 
     # NEW way - heatmap itself is given the standard brightness calculation
     def draw_brightness_statistic(self, track_graphics: TrackGraphics, adjust_brightness: int,
@@ -102,13 +158,8 @@ class HeatMap:
 
         (stats, _, _) = self._get_stats_array(np.median, adjust_brightness, visits_heatmap)
 
-        for yy, stats in enumerate(stats):
-            for xx, stat in enumerate(stats):
-                if not math.isnan(stat):
-                    x = self.min_x + self._granularity * xx
-                    y = self.min_y + self._granularity * yy
-                    colour = get_color_for_data(max(0.1, min(1, stat * multiplier)), color_palette)
-                    track_graphics.plot_box(x, y, x + self._granularity, y + self._granularity, colour)
+        # NaN stats stay NaN, so only the cells with a stat are drawn
+        self._draw_cells(track_graphics, np.clip(stats * multiplier, 0.1, 1), color_palette)
 
     # Old way - heatmap contains the stats
     def draw_statistic(self, track_graphics: TrackGraphics, brightness: int, color_palette: ColorPalette, visits_heatmap,
@@ -137,16 +188,8 @@ class HeatMap:
 
         stat_range = max_stat - min_stat
 
-        for yy, stats in enumerate(stats):
-            for xx, stat in enumerate(stats):
-                if not math.isnan(stat):
-                    x = self.min_x + self._granularity * xx
-                    y = self.min_y + self._granularity * yy
-
-                    gap_from_best = max_stat - stat
-                    data = max(0.1, min(1, 1 - 0.9 * gap_from_best / stat_range))
-                    colour = get_color_for_data(data, color_palette)
-                    track_graphics.plot_box(x, y, x + self._granularity, y + self._granularity, colour)
+        gap_from_best = max_stat - stats
+        self._draw_cells(track_graphics, np.clip(1 - 0.9 * gap_from_best / stat_range, 0.1, 1), color_palette)
 
     #
     # PRIVATE implementation
@@ -160,41 +203,101 @@ class HeatMap:
         value = max(min(value, self.max_y), self.min_y)
         return round((value - self.min_y - self._granularity / 2) / self._granularity)
 
-    def _get_stats_count(self):
-        count = 0
-        for y_stats in self._stats:
-            for x_stats in y_stats:
-                if x_stats:
-                    count = max(count, len(x_stats))
-        return count
+    # The same as _get_x_index() and _get_y_index() for whole arrays, since rint() also rounds halves to even
+
+    def _get_x_indexes(self, values: np.ndarray):
+        values = np.minimum(np.maximum(values, self.min_x), self.max_x)
+        return np.rint((values - self.min_x - self._granularity / 2) / self._granularity).astype(np.int64)
+
+    def _get_y_indexes(self, values: np.ndarray):
+        values = np.minimum(np.maximum(values, self.min_y), self.max_y)
+        return np.rint((values - self.min_y - self._granularity / 2) / self._granularity).astype(np.int64)
+
+    def _get_visitor_id(self, visitor):
+        return self._visitor_ids.setdefault(visitor, len(self._visitor_ids))
+
+    def _is_new_visitor(self, cells: np.ndarray, visitor_ids: np.ndarray):
+        # A visit only counts if the visit before it to the same cell (in this or an earlier call) was by someone
+        # else, so the visits are grouped by cell, keeping them in order within each cell
+        order = np.argsort(cells, kind="stable")
+        sorted_cells = cells[order]
+        sorted_visitor_ids = visitor_ids[order]
+
+        is_first_in_cell = np.ones(len(cells), dtype=bool)
+        is_first_in_cell[1:] = sorted_cells[1:] != sorted_cells[:-1]
+        previous_visitor_ids = np.empty_like(sorted_visitor_ids)
+        previous_visitor_ids[1:] = sorted_visitor_ids[:-1]
+        previous_visitor_ids[is_first_in_cell] = self._last_visitors[sorted_cells[is_first_in_cell]]
+
+        is_last_in_cell = np.ones(len(cells), dtype=bool)
+        is_last_in_cell[:-1] = is_first_in_cell[1:]
+        self._last_visitors[sorted_cells[is_last_in_cell]] = sorted_visitor_ids[is_last_in_cell]
+
+        is_new_visitor = np.empty(len(cells), dtype=bool)
+        is_new_visitor[order] = sorted_visitor_ids != previous_visitor_ids
+        return is_new_visitor
+
+    def _get_cell_values(self, stat_method: callable):
+        # The result of stat_method (one of np.count_nonzero, np.median or np.sum) on the stats of each cell that was
+        # visited, exactly as if it were called on an array of them, or NaN for a cell that was never visited
+        values = self._cell_values.get(stat_method)
+        if values is not None:
+            return values
+
+        cell_count = self._x_size * self._y_size
+        cells = np.concatenate([np.zeros(0, dtype=np.int64)] + self._cell_chunks +
+                               [c for (c, _) in self._contributions.values()])
+        stats = np.concatenate([np.zeros(0)] + self._stat_chunks + [s for (_, s) in self._contributions.values()])
+        counts = np.bincount(cells, minlength=cell_count)
+
+        if stat_method is np.count_nonzero:
+            values = np.bincount(cells[stats != 0], minlength=cell_count).astype(float)
+        elif stat_method is np.sum:
+            values = np.bincount(cells, weights=stats, minlength=cell_count)
+        else:
+            assert stat_method is np.median
+
+            # The middle one or two stats of each cell, once they are sorted within each cell
+            sorted_stats = stats[np.lexsort((stats, cells))]
+            starts = np.cumsum(counts) - counts
+            visited = counts > 0
+            lower = sorted_stats[(starts + (counts - 1) // 2)[visited]]
+            upper = sorted_stats[(starts + counts // 2)[visited]]
+            values = np.zeros(cell_count)
+            values[visited] = (lower + upper) / 2
+            values[np.bincount(cells, weights=np.isnan(stats), minlength=cell_count) > 0] = math.nan
+
+        values[counts == 0] = math.nan
+        values = values.reshape(self._y_size, self._x_size)
+        self._cell_values[stat_method] = values
+        return values
 
     def _get_stats_array(self, stat_method: callable, brightness: int = 0, visits_heatmap = None):
+        stats = self._get_cell_values(stat_method)
+
         if visits_heatmap:
             visits, min_visits, _ = visits_heatmap.get_visits_and_scope_range(brightness)
-        else:
-            visits, min_visits = (None, None)
-
-        min_value = math.nan
-        max_value = 0.0
-        new_stats = []
-        for yy, y_stats in enumerate(self._stats):
-            new_y_stats = []
-            for xx, x_stats in enumerate(y_stats):
-                stat = math.nan
-                if x_stats:
-                    if not visits_heatmap or visits[yy][xx] >= min_visits:
-                        stat = stat_method(np.array(x_stats))
-                        min_value = min(stat, min_value)
-                        max_value = max(stat, max_value)
-                new_y_stats.append(stat)
-            new_stats.append(new_y_stats)
-        return new_stats, min_value, max_value
+            if visits is None:
+                stats = np.full(stats.shape, math.nan)
+            else:
+                stats = np.where(visits >= min_visits, stats, math.nan)
+
+        shown_stats = stats[~np.isnan(stats)]
+        if len(shown_stats) == 0:
+            return stats, math.nan, 0.0
+        return stats, shown_stats.min().item(), max(shown_stats.max().item(), 0.0)
+
+    def _draw_cells(self, track_graphics: TrackGraphics, data: np.ndarray, color_palette: ColorPalette):
+        # Every cell is drawn in the color for its data (between 0 and 1) at once, except where the data is NaN
+        track_graphics.plot_box_grid(self.min_x, self.min_y, self._granularity,
+                                     get_color_lookup_indexes(data, color_palette),
+                                     get_color_lookup_table(color_palette))
 
     def print_debug(self):
-        for v in reversed(self._get_stats_array(np.sum)):
+        for v in reversed(self._get_stats_array(np.sum)[0].tolist()):
             s = ""
             for w in v:
-                if w == 0:
+                if w == 0 or math.isnan(w):
                     s += "  "
                 else:
                     s += str(round(w)) + " "
@@ -203,6 +306,24 @@ class HeatMap:
 
 
 
+class _VisitRecorder:
+    # Stands in for a HeatMap to record the visits of a single visitor, see HeatMap.get_contribution()
+
+    def __init__(self):
+        self.x_chunks = []
+        self.y_chunks = []
+        self.stat_chunks = []
+
+    def visit(self, x, y, visitor, stat: typing.Union[float, int]):
+        self.visit_all(np.array([x], dtype=float), np.array([y], dtype=float), visitor, np.array([stat], dtype=float))
+
+    def visit_all(self, x: np.ndarray, y: np.ndarray, visitors, stats: np.ndarray):
+        assert np.ndim(visitors) == 0
+        self.x_chunks.append(np.asarray(x, dtype=float))
+        self.y_chunks.append(np.asarray(y, dtype=float))
+        self.stat_chunks.append(np.asarray(stats, dtype=float))
+
+
 def test_it():
     map = HeatMap(1, 1, 5.99, 7.99, 0.5, True)
 
@@ -234,7 +355,6 @@ def test_it():
     map.print_debug()
 
     print("=============")
-    print(map._stats[0])
 
     print(map._get_stats_array(np.sum))
 
@@ -9,7 +9,9 @@
 from src.graphics.track_graphics import TrackGraphics
 import math
 
-from src.utils.colors import get_color_for_data, ColorPalette
+import numpy as np
+
+from src.utils.colors import ColorPalette, get_color_lookup_indexes, get_color_lookup_table
 
 
 class VisitorMap:
@@ -67,15 +69,11 @@ class VisitorMap:
             colour_multiplier /= 2
             min_visits *= 1.5
 
-        for yy, visits in enumerate(self.visits):
-            for xx, visit in enumerate(visits):
-                if visit >= min_visits:
-                    x = self.min_x + self.granularity * xx
-                    y = self.min_y + self.granularity * yy
-
-                    data = min(1.0, 30/255 + colour_multiplier / 255 * visit * visit)
-                    colour = get_color_for_data(data, color_palette)
-                    track_graphics.plot_box(x, y, x + self.granularity, y + self.granularity, colour)
+        visits = np.array(self.visits, dtype=float)
+        data = np.where(visits >= min_visits, np.minimum(1.0, 30/255 + colour_multiplier / 255 * visits * visits),
+                        math.nan)
+        track_graphics.plot_box_grid(self.min_x, self.min_y, self.granularity,
+                                     get_color_lookup_indexes(data, color_palette), get_color_lookup_table(color_palette))
 
     def print_debug(self):
         for v in reversed(self.visits):
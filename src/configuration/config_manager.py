@@ -15,6 +15,7 @@ _KEY_LOG_DIRECTORY = "log_directory"
 _KEY_LAST_OPEN_TRACK = "last_open_track"
 _KEY_CALCULATE_ALTERNATE_DISCOUNT_FACTORS = "calculate_alternate_discount_factors"
 _KEY_CALCULATE_NEW_REWARD = "calculate_new_reward"
+_KEY_IMPORT_WORKER_COUNT = "import_worker_count"   # Zero means use every CPU, and one means import sequentially
 
 
 class ConfigManager:
@@ -30,6 +31,7 @@ class ConfigManager:
         self._ensure_field_set(_KEY_LAST_OPEN_TRACK, "reinvent_base")
         self._ensure_field_set(_KEY_CALCULATE_ALTERNATE_DISCOUNT_FACTORS, False)
         self._ensure_field_set(_KEY_CALCULATE_NEW_REWARD, False)
+        self._ensure_field_set(_KEY_IMPORT_WORKER_COUNT, 0)
 
         if not config_exists:
             self._save()
@@ -54,6 +56,9 @@ class ConfigManager:
     def get_calculate_alternate_discount_factors(self):
         return self._configuration_dictionary[_KEY_CALCULATE_ALTERNATE_DISCOUNT_FACTORS]
 
+    def get_import_worker_count(self):
+        return self._configuration_dictionary[_KEY_IMPORT_WORKER_COUNT]
+
     def set_log_directory(self, value):
         self._configuration_dictionary[_KEY_LOG_DIRECTORY] = value
         self._save()
@@ -68,4 +73,8 @@ class ConfigManager:
 
     def set_calculate_alternate_discount_factors(self, value):
         self._configuration_dictionary[_KEY_CALCULATE_ALTERNATE_DISCOUNT_FACTORS] = value
+        self._save()
+
+    def set_import_worker_count(self, value):
+        self._configuration_dictionary[_KEY_IMPORT_WORKER_COUNT] = value
         self._save()
\ No newline at end of file
@@ -6,7 +6,7 @@
 # Copyright (c) 2021 dmh23
 #
 
-import math
+import functools
 import typing
 
 import numpy as np
@@ -14,10 +14,12 @@ import numpy as np
 from src.action_space.action_space_filter import ActionSpaceFilter
 from src.action_space.action_space import ActionSpace
 from src.analyze.util.heatmap import HeatMap
-from src.event.event_meta import Event
+from src.episode.episode_table import EpisodeTable
+from src.episode.new_reward_scoring import score_steps
+from src.event.event_meta import Event, REWARD_INPUT_COLUMNS
 from src.sequences.sequences import Sequences
-from src.utils.geometry import get_bearing_between_points, get_turn_between_directions,\
-    get_distance_between_points, get_distance_of_point_from_line
+from src.utils.geometry import get_distances_between_points, get_bearings_between_points,\
+    get_turns_between_directions
 
 from src.tracks.track import Track
 from src.sequences.sequence import Sequence
@@ -43,20 +45,157 @@ POS_XRIGHT = "XR"
 
 ALL_POSITIONS = [POS_XLEFT, POS_LEFT, POS_CENTRAL, POS_RIGHT, POS_XRIGHT]
 
+# Attributes of the full analysis that are calculated along with a column, when first wanted
+_FULL_ANALYSIS_ATTRIBUTE_COLUMNS = {
+    "discounted_future_rewards": "discounted_future_rewards",
+    "new_rewards": "new_reward",
+    "new_discounted_future_rewards": "new_reward"
+}
+
+# The columns and attributes set by analyzing the steps of an episode, see get_step_analysis()
+STEP_ANALYSIS_COLUMNS = ["dodgy_data", "track_speed", "progress_speed", "reward_total", "average_reward_so_far",
+                         "time_elapsed", "total_distance_travelled", "true_bearing", "slide", "sequence_count",
+                         "acceleration", "braking"]
+
+_STEP_ANALYSIS_ATTRIBUTES = ["outcome", "lap_complete", "percent_complete", "step_count", "is_real_start",
+                             "time_taken", "predicted_lap_time", "total_reward", "average_reward",
+                             "predicted_lap_reward", "action_frequency", "repeated_action_percent",
+                             "peak_track_speed", "peak_progress_speed", "max_slide", "distance_travelled",
+                             "flying_start_speed"]
+
+_BLOCKED_WAYPOINT_ATTRIBUTES = ["_blocked_left_waypoints", "_blocked_right_waypoints",
+                                "_blocked_left_object_locations", "_blocked_right_object_locations"]
+
 
 class Episode:
 
-    def __init__(self, episode_id, iteration, events, object_locations, action_space: ActionSpace,
+    def __init__(self, episode_id, iteration, table: EpisodeTable, object_locations, action_space: ActionSpace,
                  do_full_analysis: bool, track: Track = None,
-                 calculate_new_reward=False, calculate_alternate_discount_factors=False):
+                 calculate_new_reward=False, calculate_alternate_discount_factors=False,
+                 step_analysis: dict = None):
 
         assert track is not None or not do_full_analysis
 
-        self.events = events
+        self.table = table                  # The steps of this episode, as a view of the columns of the whole log
+        self.events = table.get_events()    # ... and the same steps seen as Events, each created only when wanted
         self.id = episode_id
         self.iteration = iteration
         self.object_locations = object_locations
 
+        if step_analysis is None:
+            self._analyze_steps(action_space)
+        else:
+            # The steps were already analyzed elsewhere (e.g. in another process, see get_step_analysis) and the
+            # table already holds the columns that were set
+            self.__dict__.update(step_analysis)
+            self.rewards = table.get_column_as_list("reward")
+
+        if do_full_analysis:
+            # The full analysis is only done when first wanted, since many analyzers never use it at all, so each part
+            # is calculated when one of its columns is read (or one of its attributes, see __getattr__)
+            self._track = track
+            table.set_pending_columns(["projected_travel_distance"],   # Relies on blocked waypoints
+                                      functools.partial(self.set_projected_distances_on_events, track))
+            table.set_pending_columns(["track_side", "distance_from_center",
+                                       "before_waypoint_index", "after_waypoint_index"],
+                                      functools.partial(self._set_positions_on_track_on_events, track))
+            table.set_pending_columns(["skew"],   # Relies on before and after
+                                      functools.partial(self._set_skew_on_events, track))
+
+            if calculate_new_reward:
+                table.set_pending_columns(["new_reward", "new_reward_total", "new_discounted_future_reward"],
+                                          functools.partial(self._set_new_rewards, track))
+            else:
+                self.new_rewards = None
+                self.new_discounted_future_rewards = None
+
+            table.set_pending_columns(["discounted_future_rewards"],
+                                      functools.partial(self._set_discounted_future_rewards,
+                                                        calculate_alternate_discount_factors))
+        else:
+            self._track = None
+            self.new_rewards = []
+            self.new_discounted_future_rewards = []
+            self._blocked_left_waypoints = []
+            self._blocked_right_waypoints = []
+            self._blocked_left_object_locations = []
+            self._blocked_right_object_locations = []
+
+        # THIS VARIABLE IS ASSIGNED RETROSPECTIVELY AFTER THE Log CLASS HAS LOADED ALL EPISODES
+        self.quarter = None
+
+    def get_step_analysis(self) -> dict:
+        # The attributes set by analyzing the steps, which together with the columns in STEP_ANALYSIS_COLUMNS are
+        # all that is needed to create this episode again without repeating the analysis
+        return {name: self.__dict__[name] for name in _STEP_ANALYSIS_ATTRIBUTES}
+
+    def __getattr__(self, name: str):
+        # Only called for attributes that are not set (yet), which is how the attributes of the full analysis are
+        # calculated the first time they are wanted
+        column_name = _FULL_ANALYSIS_ATTRIBUTE_COLUMNS.get(name)
+        if column_name is not None and "table" in self.__dict__:
+            if self.table.is_column_pending(column_name):
+                self.table.get_column(column_name)
+            # Another thread (e.g. the background analysis) might have just set it, since it is set before the column
+            # stops being pending
+            if name in self.__dict__:
+                return self.__dict__[name]
+
+        if name in _BLOCKED_WAYPOINT_ATTRIBUTES and self.__dict__.get("_track") is not None:
+            (self._blocked_left_waypoints, self._blocked_right_waypoints,
+             self._blocked_left_object_locations,
+             self._blocked_right_object_locations) = self.get_blocked_waypoints(self._track)
+            return self.__dict__[name]
+
+        raise AttributeError(name)
+
+    def complete_analysis(self):
+        # Does whatever is left of the full analysis straight away, rather than when it is first wanted
+        self.table.calculate_pending_columns()
+
+    def get_starting_position_as_percent_from_race_start(self, track :Track):
+        first_event_percent = track.get_waypoint_percent_from_race_start(self.events[0].closest_waypoint_index)
+
+        #  5 is magic number because there are 20 evenly spaced start points, i.e. every 5% round the track
+        return round(first_event_percent / 5) * 5
+
+    def get_distance_travelled(self):
+        if self.events:
+            return self.events[-1].total_distance_travelled
+        else:
+            return 0
+
+    def get_track_speed_after_seconds(self, seconds):
+        later_steps = np.flatnonzero(self.table.get_column("time_elapsed") >= seconds)
+        if len(later_steps) > 0:
+            return self.table.get_value("track_speed", later_steps[0])
+
+    # Otherwise known as "smoothness"
+    @staticmethod
+    def get_repeated_action_percent(events):
+        if not events or len(events) < 2:
+            return 0
+
+        return Episode._get_repeated_action_percent(np.array([e.action_taken for e in events]))
+
+    @staticmethod
+    def _get_repeated_action_percent(actions_taken):
+        if len(actions_taken) < 2:
+            return 0
+
+        count = int(np.count_nonzero(actions_taken[1:] == actions_taken[:-1]))
+        return 100 * count / len(actions_taken)
+
+    def set_quarter(self, quarter: int):
+        assert 1 <= quarter <= 4
+        self.quarter = quarter
+
+    # The fields of every step are calculated as NumPy operations on whole columns of the table, since this is done
+    # for every step of every episode when a log is loaded
+
+    def _analyze_steps(self, action_space: ActionSpace):
+        events = self.events
+        table = self.table
         first_event = events[0]
         last_event = events[-1]
 
@@ -100,7 +239,7 @@ class Episode:
             self.repeated_action_percent = None
         else:
             self.action_frequency = self._get_action_frequency(action_space)
-            self.repeated_action_percent = self.get_repeated_action_percent(self.events)
+            self.repeated_action_percent = self._get_repeated_action_percent(table.get_column("action_taken"))
 
         self._mark_dodgy_data()   # Must be first, before all the analysis below, especially for speeds
 
@@ -116,198 +255,132 @@ class Episode:
         self.set_sequence_length_on_events()
         self.set_acceleration_and_braking_on_events()
 
-        if do_full_analysis:
-            (self._blocked_left_waypoints, self._blocked_right_waypoints,
-             self._blocked_left_object_locations, self._blocked_right_object_locations) = self.get_blocked_waypoints(track)
-            self.set_projected_distances_on_events(track)   # Relies on blocked waypoints
-            self._set_side_and_distance_from_center_on_events(track)
-            self._set_before_and_after_waypoints_on_events(track)
-            self._set_skew_on_events(track)   # Relies on before and after
-
-            if calculate_new_reward:
-                self._set_new_rewards(track)
-                self.new_rewards = self._get_list_of_new_rewards()
-                self._set_new_discounted_future_reward()
-                self.new_discounted_future_rewards = self._get_list_of_new_discounted_future_rewards()
-            else:
-                self.new_rewards = None
-                self.new_discounted_future_rewards = None
-
-            self._set_discounted_future_rewards(calculate_alternate_discount_factors)
-            self.discounted_future_rewards = self._get_lists_of_discounted_future_rewards()
-        else:
-            self.new_rewards = []
-            self.new_discounted_future_rewards = []
-            self._blocked_left_waypoints = []
-            self._blocked_right_waypoints = []
-            self._blocked_left_object_locations = []
-            self._blocked_right_object_locations = []
-
         # THESE MUST BE AT THE END SINCE THEY ARE CALCULATED FROM DATA SET FURTHER UP/ABOVE
         self.distance_travelled = self.get_distance_travelled()
         self.flying_start_speed = self.get_track_speed_after_seconds(1)
 
-        # THIS VARIABLE IS ASSIGNED RETROSPECTIVELY AFTER THE Log CLASS HAS LOADED ALL EPISODES
-        self.quarter = None
-
-    def get_starting_position_as_percent_from_race_start(self, track :Track):
-        first_event_percent = track.get_waypoint_percent_from_race_start(self.events[0].closest_waypoint_index)
-
-        #  5 is magic number because there are 20 evenly spaced start points, i.e. every 5% round the track
-        return round(first_event_percent / 5) * 5
-
-    def get_distance_travelled(self):
-        if self.events:
-            return self.events[-1].total_distance_travelled
-        else:
-            return 0
-
-    def get_track_speed_after_seconds(self, seconds):
-        for e in self.events:
-            if e.time_elapsed >= seconds:
-                return e.track_speed
-
-    # Otherwise known as "smoothness"
-    @staticmethod
-    def get_repeated_action_percent(events):
-        if not events or len(events) < 2:
-            return 0
-
-        previous_action_taken = events[0].action_taken
-        count = 0
-
-        for e in events[1:]:
-            if e.action_taken == previous_action_taken:
-                count += 1
-            previous_action_taken = e.action_taken
-
-        return 100 * count / len(events)
+    def _mark_dodgy_data(self):
+        x = self.table.get_column("x")
+        y = self.table.get_column("y")
+        time_gaps = np.diff(self.table.get_column("time"))
+        distances = get_distances_between_points(x[:-1], y[:-1], x[1:], y[1:])
 
-    def set_quarter(self, quarter: int):
-        assert 1 <= quarter <= 4
-        self.quarter = quarter
+        # Each step except the first and last, compared with the gaps to the steps either side of it
+        distance_to_previous = distances[:-1]
+        distance_to_next = distances[1:]
+        dodgy_data = np.zeros(len(x), dtype=bool)
+        dodgy_data[1:-1] = (time_gaps[:-1] > 3 * time_gaps[1:]) | (
+                (np.maximum(distance_to_next, distance_to_previous) > 0.1) &
+                ((distance_to_next > 2 * distance_to_previous) | (distance_to_previous > 2 * distance_to_next)))
 
-    def _mark_dodgy_data(self):
-        e: Event
-        for i, e in enumerate(self.events[1:-1]):
-            previous_event = self.events[i]
-            previous_point = (previous_event.x, previous_event.y)
-            next_event = self.events[i + 2]
-            next_point = (next_event.x, next_event.y)
-            current_point = (e.x, e.y)
-
-            distance_to_previous = get_distance_between_points(current_point, previous_point)
-            distance_to_next = get_distance_between_points(current_point, next_point)
-
-            time_gap_to_previous = e.time - previous_event.time
-            time_gap_to_next = next_event.time - e.time
-
-            if time_gap_to_previous > 3 * time_gap_to_next:
-                e.dodgy_data = True
-            elif max(distance_to_next, distance_to_previous) > 0.1:
-                if distance_to_next > 2 * distance_to_previous or distance_to_previous > 2 * distance_to_next:
-                    e.dodgy_data = True
+        self.table.set_column("dodgy_data", dodgy_data)
 
     def set_track_speed_on_events(self):
-        previous = [self.events[0]] * 6   # 6 here matches DRF, but (TODO) DRF is marginally more accurate algorithm
-        improve_previous = False
-        for e in self.events:
-            if e.dodgy_data or previous[0].dodgy_data:
-                e.track_speed = previous[-1].track_speed
-                improve_previous = True
-            else:
-                distance = get_distance_between_points((e.x, e.y), (previous[0].x, previous[0].y))
-                time_taken = e.time - previous[0].time
-                if time_taken > 0:
-                    e.track_speed = distance / time_taken
-                    if e.track_speed > self.peak_track_speed:
-                        self.peak_track_speed = e.track_speed
-                    if improve_previous:
-                        previous[-1].track_speed = (e.track_speed + previous[-1].track_speed) / 2
-                improve_previous = False
-
-            previous = previous[1:] + [e]
-
-    def set_progress_speed_on_events(self):
-        previous = [self.events[0]] * 5   # 5 here excludes current step so matches DRF of 6 including current step
-        improve_previous = False
-        for e in self.events:
-            if e.dodgy_data or previous[0].dodgy_data:
-                e.progress_speed = previous[-1].progress_speed
-                improve_previous = True
-            else:
-                progress_gain = e.progress - previous[0].progress
-                time_taken = e.time - previous[0].time
+        # 6 steps back matches DRF, but (TODO) DRF is marginally more accurate algorithm
+        x = self.table.get_column("x")
+        y = self.table.get_column("y")
+        earlier = self._get_earlier_step_indexes(6)
+        distance = get_distances_between_points(x[earlier], y[earlier], x, y)
 
-                if time_taken > 0:
-                    e.progress_speed = progress_gain / 100 * e.track_length / time_taken
-                    if e.progress_speed > self.peak_progress_speed:
-                        self.peak_progress_speed = e.progress_speed
-                    if improve_previous:
-                        previous[-1].progress_speed = (e.progress_speed + previous[-1].progress_speed) / 2
-                improve_previous = False
+        (track_speed, self.peak_track_speed) = self._get_speeds_smoothed_over_dodgy_data(distance, earlier)
+        self.table.set_column("track_speed", track_speed)
 
-            previous = previous[1:] + [e]
+    def set_progress_speed_on_events(self):
+        # 5 steps back excludes current step so matches DRF of 6 including current step
+        progress = self.table.get_column("progress")
+        earlier = self._get_earlier_step_indexes(5)
+        progress_gain = progress - progress[earlier]
+        distance = progress_gain / 100 * self.table.get_column("track_length")
+
+        (progress_speed, self.peak_progress_speed) = self._get_speeds_smoothed_over_dodgy_data(distance, earlier)
+        self.table.set_column("progress_speed", progress_speed)
+
+    def _get_earlier_step_indexes(self, steps_back: int):
+        return np.maximum(np.arange(self.step_count) - steps_back, 0)
+
+    def _get_speeds_smoothed_over_dodgy_data(self, distance: np.ndarray, earlier: np.ndarray):
+        # Dodgy data (at this step or the earlier one) repeats the speed of the last good step, and then the step
+        # just before the next good speed is averaged with it. The speed remains zero if no time has passed.
+        dodgy_data = self.table.get_column("dodgy_data")
+        time = self.table.get_column("time")
+        time_taken = time - time[earlier]
+
+        is_good = ~(dodgy_data | dodgy_data[earlier])
+        has_speed = is_good & (time_taken > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            speed = np.where(has_speed, distance / time_taken, 0.0)
+
+        if has_speed.any():
+            peak_speed = max(0, speed[has_speed].max())
+        else:
+            peak_speed = 0
 
-    def set_true_bearing_and_slide_on_events(self):
-        previous_event = self.events[0]
-        self.events[0].slide = 0.0
-        self.events[0].true_bearing = self.events[0].heading
-        self.max_slide = 0.0
+        last_good_step = np.maximum.accumulate(np.where(is_good, np.arange(len(speed)), 0))
+        speed = speed[last_good_step]
 
-        for e in self.events[1:]:
-            previous_location = (previous_event.x, previous_event.y)
-            current_location = (e.x, e.y)
-            if e.progress == previous_event.progress:   # Handle new AWS bug duplicating log entry position
-                e.true_bearing = previous_event.true_bearing
-            elif e.progress - previous_event.progress < 0.05:   # x and y rounding means slow progress is inaccurate
-                e.true_bearing = previous_event.true_bearing
-            else:
-                e.true_bearing = get_bearing_between_points(previous_location, current_location)
-            e.slide = get_turn_between_directions(e.heading, e.true_bearing)
-            if e.step > SLIDE_SETTLING_PERIOD:
-                self.max_slide = max(self.max_slide, abs(e.slide))
-            previous_event = e
+        improved = np.flatnonzero(has_speed[1:] & ~is_good[:-1]) + 1
+        speed[improved - 1] = (speed[improved] + speed[improved - 1]) / 2
 
-    def _set_side_and_distance_from_center_on_events(self, track: Track):
-        for e in self.events:
-            current_location = (e.x, e.y)
-            e.track_side = track.get_position_of_point_relative_to_waypoint(current_location, e.closest_waypoint_index)
-            closest_waypoint = track.get_waypoint(e.closest_waypoint_index)
-            next_waypoint = track.get_next_different_waypoint(e.closest_waypoint_index)
-            previous_waypoint = track.get_previous_different_waypoint(e.closest_waypoint_index)
-            distance_of_next_waypoint = get_distance_between_points(current_location, next_waypoint)
-            distance_of_previous_waypoint = get_distance_between_points(current_location, previous_waypoint)
-            if distance_of_next_waypoint < distance_of_previous_waypoint:
-                e.distance_from_center = get_distance_of_point_from_line(current_location, closest_waypoint, next_waypoint)
-            else:
-                e.distance_from_center = get_distance_of_point_from_line(current_location, closest_waypoint, previous_waypoint)
+        return speed, peak_speed
 
-    def _set_before_and_after_waypoints_on_events(self, track: Track):
-        e: Event
-        for e in self.events:
-            (e.before_waypoint_index, e.after_waypoint_index) = track.get_waypoint_ids_before_and_after((e.x, e.y),
-                                                                                                        e.closest_waypoint_index)
+    def set_true_bearing_and_slide_on_events(self):
+        x = self.table.get_column("x")
+        y = self.table.get_column("y")
+        heading = self.table.get_column("heading")
+        progress = self.table.get_column("progress")
+
+        # The bearing only moves on with progress, to handle new AWS bug duplicating log entry position, and
+        # because x and y rounding means slow progress is inaccurate
+        has_bearing = np.ones(len(x), dtype=bool)
+        has_bearing[1:] = np.diff(progress) >= 0.05
+        true_bearing = np.empty(len(x))
+        true_bearing[0] = heading[0]
+        true_bearing[1:] = get_bearings_between_points(x[:-1], y[:-1], x[1:], y[1:])
+        true_bearing = true_bearing[np.maximum.accumulate(np.where(has_bearing, np.arange(len(x)), 0))]
+
+        slide = get_turns_between_directions(heading, true_bearing)
+        slide[0] = 0.0
+
+        settled_slide = slide[self.table.get_column("step") > SLIDE_SETTLING_PERIOD]
+        self.max_slide = max(0.0, np.abs(settled_slide).max()) if len(settled_slide) else 0.0
+
+        self.table.set_column("true_bearing", true_bearing)
+        self.table.set_column("slide", slide)
+
+    def _set_positions_on_track_on_events(self, track: Track):
+        (track_side, distance_from_center, before_waypoint_index, after_waypoint_index) = \
+            track.get_positions_of_points_on_track(self.table.get_column("x"), self.table.get_column("y"),
+                                                   self.table.get_column("closest_waypoint_index"))
+
+        self.table.set_column("track_side", track_side.astype("U1"))
+        self.table.set_column("distance_from_center", distance_from_center)
+        self.table.set_column("before_waypoint_index", before_waypoint_index)
+        self.table.set_column("after_waypoint_index", after_waypoint_index)
 
     def _set_skew_on_events(self, track: Track):
-        e: Event
-        for e in self.events:
-            (track_bearing, _) = track.get_bearing_and_distance_to_next_waypoint(e.before_waypoint_index)
-            e.skew = get_turn_between_directions(track_bearing, e.true_bearing)
+        track_bearing = track.get_bearings_to_next_waypoints(self.table.get_column("before_waypoint_index"))
+        self.table.set_column("skew", get_turns_between_directions(track_bearing,
+                                                                   self.table.get_column("true_bearing")))
 
     def set_acceleration_and_braking_on_events(self):
-        previous_time = -1
-        max_event_id = len(self.events) - 1
-        for i, e in enumerate(self.events):
-            if e.time_elapsed != previous_time:
-                earlier_event = self.events[max(0, i - 2)]
-                later_event = self.events[min(max_event_id, i + 2)]
-                time_difference = later_event.time_elapsed - earlier_event.time_elapsed
-                if e.speed < 1.05 * e.track_speed and earlier_event.track_speed > later_event.track_speed:
-                    e.braking = (earlier_event.track_speed - later_event.track_speed) / time_difference
-                elif e.speed > 0.95 * e.track_speed and earlier_event.track_speed < later_event.track_speed:
-                    e.acceleration = (later_event.track_speed - earlier_event.track_speed) / time_difference
-            previous_time = e.time_elapsed
+        speed = self.table.get_column("speed")
+        track_speed = self.table.get_column("track_speed")
+        time_elapsed = self.table.get_column("time_elapsed")
+
+        # Only for the first of any steps at the same time, comparing the track speed two steps either side
+        is_new_time = np.ones(len(speed), dtype=bool)
+        is_new_time[1:] = time_elapsed[1:] != time_elapsed[:-1]
+        indexes = np.arange(len(speed))
+        earlier = np.maximum(indexes - 2, 0)
+        later = np.minimum(indexes + 2, len(speed) - 1)
+        time_difference = time_elapsed[later] - time_elapsed[earlier]
+        speed_change = track_speed[later] - track_speed[earlier]
+
+        is_braking = is_new_time & (speed < 1.05 * track_speed) & (speed_change < 0)
+        is_accelerating = is_new_time & ~is_braking & (speed > 0.95 * track_speed) & (speed_change > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.table.set_column("braking", np.where(is_braking, -speed_change / time_difference, 0.0))
+            self.table.set_column("acceleration", np.where(is_accelerating, speed_change / time_difference, 0.0))
 
     def get_blocked_waypoints(self, track: Track):
         left_wps = []
@@ -327,292 +400,265 @@ class Episode:
         return left_wps, right_wps, left_locations, right_locations
 
     def set_projected_distances_on_events(self, track: Track):
-        e: Event
-        for e in self.events:
-            e.projected_travel_distance = track.get_projected_distance_on_track((e.x, e.y), e.true_bearing,
-                                                                                e.closest_waypoint_index, 0.0,
-                                                                                self._blocked_left_waypoints,
-                                                                                self._blocked_right_waypoints,
-                                                                                self._blocked_left_object_locations,
-                                                                                self._blocked_right_object_locations)
+        projected_travel_distance = track.get_projected_distances_on_track(
+            self.table.get_column("x"), self.table.get_column("y"), self.table.get_column("true_bearing"),
+            self.table.get_column("closest_waypoint_index"), 0.0,
+            self._blocked_left_waypoints, self._blocked_right_waypoints,
+            self._blocked_left_object_locations, self._blocked_right_object_locations)
         if self.outcome in [OFF_TRACK, CRASHED]:
-            self.events[-1].projected_travel_distance = 0.0
+            projected_travel_distance[-1] = 0.0
+
+        self.table.set_column("projected_travel_distance", projected_travel_distance)
 
     def set_reward_total_on_events(self):
-        reward_total = 0.0
-        for e in self.events:
-            reward_total += e.reward
-            e.reward_total = reward_total
-            e.average_reward_so_far = reward_total / e.step
+        reward_total = np.cumsum(self.table.get_column("reward"))
+        self.table.set_column("reward_total", reward_total)
+        self.table.set_column("average_reward_so_far", reward_total / self.table.get_column("step"))
 
     def set_time_elapsed_on_events(self):
-        start_time = self.events[0].time
-        for e in self.events:
-            e.time_elapsed = e.time - start_time + TIME_BEFORE_FIRST_STEP
+        time = self.table.get_column("time")
+        self.table.set_column("time_elapsed", time - time[0] + TIME_BEFORE_FIRST_STEP)
 
     def set_total_distance_travelled_on_events(self):
-        distance = 0.0
-        previous = self.events[0]
+        x = self.table.get_column("x")
+        y = self.table.get_column("y")
+        total_distance_travelled = np.zeros(len(x))
+        np.cumsum(get_distances_between_points(x[:-1], y[:-1], x[1:], y[1:]), out=total_distance_travelled[1:])
 
-        for e in self.events:
-            x_diff = e.x - previous.x
-            y_diff = e.y - previous.y
-            distance += math.sqrt(x_diff * x_diff + y_diff * y_diff)
-            e.total_distance_travelled = distance
-            previous = e
+        self.table.set_column("total_distance_travelled", total_distance_travelled)
 
     def set_sequence_length_on_events(self):
-        sequence = 0
-        previous_action_id = -1
+        # Continuous actions are never counted as the same action repeated
+        sequence_start = np.arange(self.step_count)
+        if not self.table.is_continuous_action_space():
+            actions_taken = self.table.get_column("action_taken")
+            is_same_action = np.zeros(self.step_count, dtype=bool)
+            is_same_action[1:] = actions_taken[1:] == actions_taken[:-1]
+            sequence_start = np.maximum.accumulate(np.where(is_same_action, 0, sequence_start))
 
-        for e in self.events:
-            if e.action_taken is None:
-                sequence = 1
-            elif e.action_taken == previous_action_id:
-                sequence += 1
-            else:
-                sequence = 1
-                previous_action_id = e.action_taken
-            e.sequence_count = sequence
+        self.table.set_column("sequence_count", np.arange(self.step_count) - sequence_start + 1)
+
+    # The attributes of the episode are set before the columns, since another thread might be waiting for them as
+    # soon as the columns are no longer pending
 
     def _set_discounted_future_rewards(self, calculate_alternate_discount_factors: bool):
-        for i in range(len(self.events)):
-            self.events[i].discounted_future_rewards = discount_factors.get_discounted_future_rewards(
-                self.rewards[i:], calculate_alternate_discount_factors, True)
+        # A row per step, with a column per discount factor
+        discounted_future_rewards = discount_factors.get_discounted_future_rewards_of_episode(
+            self.table.get_column("reward"), calculate_alternate_discount_factors)
 
-    def _set_new_discounted_future_reward(self):
-        for i in range(len(self.events)):
-            self.events[i].new_discounted_future_reward = discount_factors.get_discounted_future_rewards(
-                self.new_rewards[i:], False, False)
+        # List of lists since there is a list of rewards per discount factor (0 = the current DF)
+        self.discounted_future_rewards = discounted_future_rewards.T.tolist()
+        self.table.set_column("discounted_future_rewards", discounted_future_rewards)
 
-    def get_list_of_rewards(self):
-        list_of_rewards = []
-        for e in self.events:
-            list_of_rewards.append(e.reward)
-        return list_of_rewards
+    def _set_new_rewards(self, track: Track):
+        columns = {name: self.table.get_column(name) for name in REWARD_INPUT_COLUMNS}
+        self.set_new_rewards(score_steps(NEW_REWARD_FUNCTION, columns, track.get_all_waypoints_as_tuple(),
+                                         track.get_width()))
 
-    def _get_list_of_new_rewards(self):
-        list_of_new_rewards = []
-        for e in self.events:
-            list_of_new_rewards.append(e.new_reward)
-        return list_of_new_rewards
-
-    # List of lists since there is a list of rewards per discount factor (0 = the current DF)
-    def _get_lists_of_discounted_future_rewards(self):
-        all_lists = []
-        for i in range(len(self.events[0].discounted_future_rewards)):
-            list_of_rewards = []
-            for e in self.events:
-                list_of_rewards.append(e.discounted_future_rewards[i])
-            all_lists.append(list_of_rewards)
-        return all_lists
-
-    # Single list since for NEW future rewards we only do the current DF for efficiency
-    def _get_list_of_new_discounted_future_rewards(self):
-        list_of_rewards = []
-        for e in self.events:
-            list_of_rewards.append(e.new_discounted_future_reward)
-        return list_of_rewards
+    def set_new_rewards(self, new_reward: np.ndarray):
+        # The new reward of every step, which might have been scored elsewhere (e.g. by the Log for all its episodes)
+        new_reward = np.asarray(new_reward, dtype=np.float64)
+
+        # Single list since for NEW future rewards we only do the current DF for efficiency
+        new_discounted_future_reward = discount_factors.get_discounted_future_rewards_of_episode(new_reward, False)[:, 0]
+
+        self.new_rewards = new_reward.tolist()
+        self.new_discounted_future_rewards = new_discounted_future_reward.tolist()
+        self.table.set_column("new_reward", new_reward)
+        self.table.set_column("new_reward_total", np.cumsum(new_reward))
+        self.table.set_column("new_discounted_future_reward", new_discounted_future_reward)
+
+    def get_list_of_rewards(self):
+        return self.table.get_column_as_list("reward")
 
     def _get_action_frequency(self, action_space: ActionSpace):
         action_frequency = action_space.get_new_frequency_counter()
-        for e in self.events:
-            action_frequency[e.action_taken] += 1
+        for action_taken in self.table.get_column_as_list("action_taken"):
+            action_frequency[action_taken] += 1
         return action_frequency
 
-    def _set_new_rewards(self, track: Track):
-        if NEW_REWARD_FUNCTION:
-            total = 0.0
-            for e in self.events:
-                e.new_reward = NEW_REWARD_FUNCTION(e.get_reward_input_params(track))
-                total += e.new_reward
-                e.new_reward_total = total
-
     def get_closest_event_to_point(self, point):
         (x, y) = point
-        event = None
-        index = -1
-        distance = 0
-
-        for i, e in enumerate(self.events):
-            d = (e.x - x) * (e.x - x) + (e.y - y) * (e.y - y)
-            if d < distance or not event:
-                event = e
-                distance = d
-                index = i
+        x_diff = self.table.get_column("x") - x
+        y_diff = self.table.get_column("y") - y
 
-        return event, index
+        # The first of the closest, if there is more than one
+        index = int(np.argmin(x_diff * x_diff + y_diff * y_diff))
+        return self.events[index], index
 
     def apply_visits_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                       action_space_filter: ActionSpaceFilter, waypoint_range):
-        self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range, self._get_event_visitor_dummy)
+        self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
+                                        self._get_visitor_dummy_stats)
 
     def apply_track_speed_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                       action_space_filter: ActionSpaceFilter, waypoint_range):
-        self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range, self._get_event_track_speed)
+        self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
+                                        self._get_track_speed_stats)
 
     def apply_action_speed_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                        action_space_filter: ActionSpaceFilter, waypoint_range):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_event_action_speed)
+                                        self._get_action_speed_stats)
 
     def apply_progress_speed_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                          action_space_filter: ActionSpaceFilter, waypoint_range):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_event_progress_speed)
+                                        self._get_progress_speed_stats)
 
     def apply_reward_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                  action_space_filter: ActionSpaceFilter, waypoint_range):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_event_reward)
+                                        self._get_reward_stats)
 
     def apply_new_reward_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                  action_space_filter: ActionSpaceFilter, waypoint_range):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_new_event_reward)
+                                        self._get_new_reward_stats)
 
     def apply_discounted_future_reward_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                  action_space_filter: ActionSpaceFilter, waypoint_range):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_event_future_discounted_reward)
+                                        self._get_alternate_future_discounted_reward_stats, 0)
 
     def apply_alternate_discounted_future_reward_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                  action_space_filter: ActionSpaceFilter, waypoint_range, discount_factor_index):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_event_alternate_future_discounted_reward, discount_factor_index)
+                                        self._get_alternate_future_discounted_reward_stats, discount_factor_index)
 
     def apply_new_discounted_future_reward_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                  action_space_filter: ActionSpaceFilter, waypoint_range):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_event_new_future_discounted_reward)
+                                        self._get_new_future_discounted_reward_stats)
 
     def apply_slide_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                 action_space_filter: ActionSpaceFilter, waypoint_range):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_event_slide)
+                                        self._get_slide_stats)
 
     def apply_skew_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                action_space_filter: ActionSpaceFilter, waypoint_range):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_event_skew)
+                                        self._get_skew_stats)
 
     def apply_smoothness_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                    action_space_filter: ActionSpaceFilter, waypoint_range):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_event_smoothness)
+                                        self._get_smoothness_stats)
 
     def apply_acceleration_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                    action_space_filter: ActionSpaceFilter, waypoint_range):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_event_acceleration)
+                                        self._get_acceleration_stats)
 
     def apply_braking_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
                                    action_space_filter: ActionSpaceFilter, waypoint_range):
         self._apply_episode_to_heat_map(heat_map, skip_start, skip_end, action_space_filter, waypoint_range,
-                                        self._get_event_braking)
+                                        self._get_braking_stats)
 
-    @staticmethod
-    def _get_event_track_speed(event: Event):
-        return event.track_speed
-
-    @staticmethod
-    def _get_event_action_speed(event: Event):
-        return event.speed
+    # The stat of every step for each measure, as an array (any negative stats are treated as zero anyway)
 
     @staticmethod
-    def _get_event_progress_speed(event: Event):
-        return max(0, event.progress_speed)
+    def _get_track_speed_stats(table: EpisodeTable):
+        return table.get_column("track_speed")
 
     @staticmethod
-    def _get_event_reward(event: Event):
-        return max(0, event.reward)
+    def _get_action_speed_stats(table: EpisodeTable):
+        return table.get_column("speed")
 
     @staticmethod
-    def _get_new_event_reward(event: Event):
-        return max(0, event.new_reward)
+    def _get_progress_speed_stats(table: EpisodeTable):
+        return table.get_column("progress_speed")
 
     @staticmethod
-    def _get_event_future_discounted_reward(event: Event):
-        return max(0, event.discounted_future_rewards[0])
+    def _get_reward_stats(table: EpisodeTable):
+        return table.get_column("reward")
 
     @staticmethod
-    def _get_event_alternate_future_discounted_reward(event: Event, discount_factor_index: int):
-        return max(0, event.discounted_future_rewards[discount_factor_index])
+    def _get_new_reward_stats(table: EpisodeTable):
+        return table.get_column("new_reward")
 
     @staticmethod
-    def _get_event_new_future_discounted_reward(event: Event):
-        return max(0, event.new_discounted_future_reward)
+    def _get_alternate_future_discounted_reward_stats(table: EpisodeTable, discount_factor_index: int):
+        return table.get_column("discounted_future_rewards")[:, discount_factor_index]
 
     @staticmethod
-    def _get_event_slide(event: Event):
-        return abs(event.slide)
+    def _get_new_future_discounted_reward_stats(table: EpisodeTable):
+        return table.get_column("new_discounted_future_reward")
 
     @staticmethod
-    def _get_event_skew(event: Event):
-        return abs(event.skew)
+    def _get_slide_stats(table: EpisodeTable):
+        return np.abs(table.get_column("slide"))
 
     @staticmethod
-    def _get_event_steering(event: Event):
-        return max(0, 30 - abs(event.steering_angle))
+    def _get_skew_stats(table: EpisodeTable):
+        return np.abs(table.get_column("skew"))
 
     @staticmethod
-    def _get_event_smoothness(event: Event):
-        return event.sequence_count - 1
+    def _get_smoothness_stats(table: EpisodeTable):
+        return table.get_column("sequence_count") - 1
 
     @staticmethod
-    def _get_event_acceleration(event: Event):
-        return event.acceleration
+    def _get_acceleration_stats(table: EpisodeTable):
+        return table.get_column("acceleration")
 
     @staticmethod
-    def _get_event_braking(event: Event):
-        return event.braking
+    def _get_braking_stats(table: EpisodeTable):
+        return table.get_column("braking")
 
     @staticmethod
-    def _get_event_visitor_dummy(event: Event):
-        return 1
+    def _get_visitor_dummy_stats(table: EpisodeTable):
+        return np.ones(len(table))
 
     def apply_event_stat_to_heat_map(self, stat_extractor: callable, heat_map: HeatMap, skip_start, skip_end, action_space_filter: ActionSpaceFilter, waypoint_range):
-        assert min(skip_start, skip_end) >= 0
-        previous = self.events[0]
-        if self.lap_complete:
-            skip_end = self.events[-1].step
+        stats = np.array([stat_extractor(e) for e in self.events], dtype=float)
+        self._apply_stats_to_heat_map(stats, heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
+
+    def _apply_episode_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end,
+                                   action_space_filter: ActionSpaceFilter, waypoint_range, stats_extractor: callable,
+                                   optional_parameter=None):
+        if optional_parameter is None:
+            stats = stats_extractor(self.table)
         else:
-            skip_end = self.events[-1].step - skip_end
-        for e in self.events:
-            e: Event
-            stat = stat_extractor(e)
-            if skip_start <= e.step <= skip_end and e.is_within_waypoint_range(waypoint_range) and (
-                    not action_space_filter or action_space_filter.should_show_action(e.action_taken)):
-                self._apply_event_stat_to_heat_map(e, previous, heat_map, stat)
-            previous = e
-
-    # This is now the OLD way to do this
-    def _apply_episode_to_heat_map(self, heat_map: HeatMap, skip_start, skip_end, action_space_filter: ActionSpaceFilter, waypoint_range, stat_extractor: callable, optional_parameter=None):
+            stats = stats_extractor(self.table, optional_parameter)
+        self._apply_stats_to_heat_map(stats, heat_map, skip_start, skip_end, action_space_filter, waypoint_range)
+
+    def _apply_stats_to_heat_map(self, stats: np.ndarray, heat_map: HeatMap, skip_start, skip_end,
+                                 action_space_filter: ActionSpaceFilter, waypoint_range):
         assert min(skip_start, skip_end) >= 0
-        previous = self.events[0]
+        steps = self.table.get_column("step")
         if self.lap_complete:
-            skip_end = self.events[-1].step
+            skip_end = steps[-1]
         else:
-            skip_end = self.events[-1].step - skip_end
-        for e in self.events:
-            e: Event
-            if optional_parameter is None:
-                stat = stat_extractor(e)
-            else:
-                stat = stat_extractor(e, optional_parameter)
-            if skip_start <= e.step <= skip_end and e.is_within_waypoint_range(waypoint_range) and (
-                    not action_space_filter or action_space_filter.should_show_action(e.action_taken)):
-                self._apply_event_stat_to_heat_map(e, previous, heat_map, stat)
-            previous = e
-
-    def _apply_event_stat_to_heat_map(self, e, previous, heat_map: HeatMap, stat: typing.Union[float, int]):
-        stat = max(0, stat)
-        heat_map.visit(e.x, e.y, self, stat)
-        x_diff = e.x - previous.x
-        y_diff = e.y - previous.y
-        heat_map.visit(e.x - 0.25 * x_diff, e.y - 0.25 * y_diff, self, stat)
-        heat_map.visit(e.x - 0.50 * x_diff, e.y - 0.50 * y_diff, self, stat)
-        heat_map.visit(e.x - 0.75 * x_diff, e.y - 0.75 * y_diff, self, stat)
+            skip_end = steps[-1] - skip_end
+
+        shown = (skip_start <= steps) & (steps <= skip_end) & self._are_within_waypoint_range(waypoint_range)
+        if action_space_filter:
+            shown &= action_space_filter.should_show_actions(self.table.get_column("action_taken"))
+
+        # Each step is visited at itself and at three more points back towards the previous step
+        x = self.table.get_column("x")
+        y = self.table.get_column("y")
+        x_diff = x - np.concatenate([x[:1], x[:-1]])
+        y_diff = y - np.concatenate([y[:1], y[:-1]])
+        fractions = np.array([0.0, 0.25, 0.50, 0.75])
+        visits_x = (x[shown, np.newaxis] - fractions * x_diff[shown, np.newaxis]).ravel()
+        visits_y = (y[shown, np.newaxis] - fractions * y_diff[shown, np.newaxis]).ravel()
+
+        stats = np.asarray(stats, dtype=float)[shown]
+        heat_map.visit_all(visits_x, visits_y, self, np.repeat(np.where(stats > 0, stats, 0.0), len(fractions)))
+
+    def _are_within_waypoint_range(self, waypoint_range):
+        # The same as Event.is_within_waypoint_range() for every step
+        closest_waypoints = self.table.get_column("closest_waypoint_index")
+        if not waypoint_range:
+            return np.ones(len(closest_waypoints), dtype=bool)
+
+        (start, finish) = waypoint_range
+        if start <= finish:
+            return (start <= closest_waypoints) & (closest_waypoints <= finish)
+        else:
+            return (closest_waypoints >= start) | (closest_waypoints <= finish)
 
     # Only "probably" because spinning can fool this simple logic
     def probably_finishes_section_(self, start, finish):
@@ -681,11 +727,7 @@ class Episode:
         return self.events[start_event.step - 1:finish_event.step]
 
     def does_debug_contain(self, search_string):
-        for e in self.events:
-            if search_string in e.debug_log:
-                return True
-
-        return False
+        return self.table.get_debug_logs().contains(search_string)
 
     def get_latest_event_index_on_or_before(self, required_time):
         if required_time <= 0.0:
@@ -0,0 +1,191 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import threading
+
+import numpy as np
+
+from src.event.event_meta import Event
+from src.log.debug_logs import DebugLogs
+
+# The columns that are calculated by us, rather than read from the log, with the type and initial value of each
+DERIVED_COLUMNS = [
+    ("before_waypoint_index", np.int64, 0),
+    ("after_waypoint_index", np.int64, 0),
+    ("track_speed", np.float64, 0.0),
+    ("progress_speed", np.float64, 0.0),
+    ("reward_total", np.float64, 0.0),
+    ("average_reward_so_far", np.float64, 0.0),
+    ("time_elapsed", np.float64, 0.0),
+    ("total_distance_travelled", np.float64, 0.0),
+    ("slide", np.float64, 0.0),
+    ("skew", np.float64, 0.0),
+    ("true_bearing", np.float64, 0.0),
+    ("distance_from_center", np.float64, 0.0),
+    ("sequence_count", np.int64, 0),
+    ("new_reward", np.float64, 0.0),
+    ("new_reward_total", np.float64, 0.0),
+    ("new_discounted_future_reward", np.float64, 0.0),
+    ("acceleration", np.float64, 0.0),
+    ("braking", np.float64, 0.0),
+    ("projected_travel_distance", np.float64, 0.0),
+    ("track_side", "U1", "L"),
+    ("dodgy_data", np.bool_, False)
+]
+
+
+class EpisodeTable:
+    #
+    # PUBLIC interface
+    #
+
+    # The steps of one or more episodes held as one array per field (i.e. struct-of-arrays), which is the only copy
+    # of the data. Each step is only seen as an Event when something asks for one, and the Event is just a view of
+    # one row, so a step costs a few hundred bytes rather than a few KB for an object holding every field
+
+    def __init__(self, columns: dict, debug_logs: DebugLogs, is_continuous_action_space: bool):
+        self._columns = columns
+        self._debug_logs = debug_logs
+        self._is_continuous_action_space = is_continuous_action_space
+        self._length = len(columns["step"])
+
+        # Values of fields that are not held as columns
+        self._missing_values = {"discounted_future_rewards": []}
+        if is_continuous_action_space:
+            self._missing_values["action_taken"] = None
+
+        # Columns that are only calculated when first read, which might be from a background thread too
+        self._pending_columns = {}
+        self._pending_columns_lock = threading.RLock()
+
+    def __len__(self):
+        return self._length
+
+    def is_continuous_action_space(self) -> bool:
+        return self._is_continuous_action_space
+
+    def get_column(self, name: str) -> np.ndarray:
+        # The column itself, not a copy, so the caller must not write to any of the columns read from the log
+        if name in self._pending_columns:
+            self._calculate_pending_column(name)
+        return self._columns[name]
+
+    def get_column_as_list(self, name: str) -> list:
+        # Python values, which are much quicker than NumPy scalars when looping over every step
+        if name in self._pending_columns:
+            self._calculate_pending_column(name)
+        if name in self._columns:
+            return self._columns[name].tolist()
+        else:
+            return [self._missing_values[name]] * self._length
+
+    def set_column(self, name: str, values):
+        # Sets a derived column, writing through to the whole table when this table is a view of some of its rows,
+        # or adds a new column (such as discounted future rewards, with a row per step)
+        values = np.asarray(values)
+        column = self._columns.get(name)
+        if column is not None and column.shape == values.shape:
+            column[:] = values
+        else:
+            self._columns[name] = values
+            self._missing_values.pop(name, None)
+        self._pending_columns.pop(name, None)
+
+    def set_pending_columns(self, names: list[str], calculate: callable):
+        # These columns are all set by calling calculate(), which only happens the first time one of them is read
+        for name in names:
+            self._pending_columns[name] = calculate
+
+    def is_column_pending(self, name: str) -> bool:
+        return name in self._pending_columns
+
+    def calculate_pending_columns(self):
+        for name in list(self._pending_columns.keys()):
+            self._calculate_pending_column(name)
+
+    def get_value(self, name: str, row: int):
+        if name in self._pending_columns:
+            self._calculate_pending_column(name)
+        column = self._columns.get(name)
+        if column is not None:
+            return column[row].tolist()
+        elif name in self._missing_values:
+            value = self._missing_values[name]
+            return list(value) if isinstance(value, list) else value
+        else:
+            raise AttributeError(name)
+
+    def get_debug_log(self, row: int) -> str:
+        return self._debug_logs.get(row)
+
+    def get_debug_logs(self) -> DebugLogs:
+        return self._debug_logs
+
+    def get_rows(self, start: int, finish: int):
+        # Rows start to finish - 1, like a slice, as a table of views onto these same columns
+        return EpisodeTable({name: column[start:finish] for (name, column) in self._columns.items()},
+                            self._debug_logs.get_range(start, finish), self._is_continuous_action_space)
+
+    def get_event(self, row: int) -> Event:
+        return Event(self, row)
+
+    def get_events(self):
+        return EpisodeEvents(self)
+
+
+    #
+    # PRIVATE implementation
+    #
+
+    def _calculate_pending_column(self, name: str):
+        # A column stays pending until it is set, so another thread that wants it meanwhile waits here for it
+        with self._pending_columns_lock:
+            calculate = self._pending_columns.get(name)
+            if calculate is not None:
+                calculate()
+                for other_name in [n for (n, c) in self._pending_columns.items() if c is calculate]:
+                    del self._pending_columns[other_name]
+
+
+class EpisodeEvents:
+    # The steps of a table as a read-only sequence of Events, so code that expects a list of Events works unchanged
+
+    def __init__(self, table: EpisodeTable):
+        self._table = table
+
+    def __len__(self):
+        return len(self._table)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Event(self._table, row) for row in range(*index.indices(len(self._table)))]
+
+        if index < 0:
+            index += len(self._table)
+        if not 0 <= index < len(self._table):
+            raise IndexError("event index out of range")
+        return Event(self._table, index)
+
+    def __iter__(self):
+        table = self._table
+        for row in range(len(table)):
+            yield Event(table, row)
+
+
+def create_episode_table(trace_columns: np.ndarray, debug_logs: DebugLogs,
+                         is_continuous_action_space: bool) -> EpisodeTable:
+    # The trace columns from the log (see parse.TRACE_COLUMNS_DTYPE) are used as they are, without copying, except
+    # that there is no action taken in a continuous action space
+    trace_columns = np.asarray(trace_columns)   # Plain views of a memory-mapped cache, which are cheaper to slice
+    columns = {name: trace_columns[name] for name in trace_columns.dtype.names}
+    if is_continuous_action_space:
+        del columns["action_taken"]
+    for (name, dtype, initial_value) in DERIVED_COLUMNS:
+        columns[name] = np.full(len(trace_columns), initial_value, dtype=dtype)
+
+    return EpisodeTable(columns, debug_logs, is_continuous_action_space)
@@ -0,0 +1,54 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import hashlib
+import inspect
+import pickle
+
+import numpy as np
+
+from src.event.event_meta import REWARD_INPUT_COLUMNS, get_reward_input_params_of_steps
+from src.tracks.track import Track
+
+# Increase this whenever the reward input params change, so that new rewards scored with the old params are not used
+NEW_REWARD_FORMAT_VERSION = 1
+
+
+def score_steps(reward_function, columns: dict, waypoints: tuple, track_width: float) -> np.ndarray:
+    # The new reward of every step, given an array of the values of each of REWARD_INPUT_COLUMNS, which is quick
+    # enough to send to another process with a batch of steps to be scored there
+    step_count = len(columns["step"])
+    if not reward_function:
+        return np.zeros(step_count)
+
+    step_values = {name: columns[name].tolist() for name in REWARD_INPUT_COLUMNS}
+    new_reward = np.empty(step_count)
+    for i, params in enumerate(get_reward_input_params_of_steps(step_values, waypoints, track_width)):
+        new_reward[i] = reward_function(params)
+    return new_reward
+
+
+def get_reward_function_key(reward_function, track: Track):
+    # Identifies the new rewards of any steps on this track, by hashing the source of the whole module that defines
+    # the reward function (so changes to any helper functions it calls are seen too), or None if there is no source
+    try:
+        source = inspect.getsource(inspect.getmodule(reward_function))
+    except (OSError, TypeError):
+        return None
+
+    key_text = "\n".join([str(NEW_REWARD_FORMAT_VERSION), track.get_world_name(), reward_function.__qualname__, source])
+    return hashlib.sha256(key_text.encode()).hexdigest()
+
+
+def can_score_in_processes(reward_function) -> bool:
+    # Only a function that can be found by name (i.e. not a lambda or nested function) can be sent to another process
+    try:
+        pickle.dumps(reward_function)
+        return True
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
@@ -6,59 +6,49 @@
 # Copyright (c) 2021 dmh23
 #
 
-from src.tracks.track import Track
-
 _STATUS_OFF_TRACK = "off_track"
 
 _STATUS_CRASHED = "crashed"    # TODO - get correct value, this is just a guess
 _STATUS_REVERSED = "reversed"    # TODO - get correct value, this is just a guess
 
+# The fields of a step that its reward input params are made from
+REWARD_INPUT_COLUMNS = ["all_wheels_on_track", "x", "y", "heading", "distance_from_center", "progress", "step",
+                        "speed", "steering_angle", "track_length", "before_waypoint_index", "after_waypoint_index",
+                        "track_side", "status"]
+
 
 class Event:
-    def __init__(self):
-        self.episode = 0
-        self.step = 0
-        self.x = 0.0
-        self.y = 0.0
-        self.heading = 0.0
-        self.steering_angle = 0.0
-        self.speed = 0.0
-        self.action_taken = 0
-        self.reward = 0.0
-        self.job_completed = False
-        self.all_wheels_on_track = True
-        self.progress = 0.0
-        self.closest_waypoint_index = 0
-        self.time = 0.0
-        self.status = ""
-        self.track_length = 0.0
+    # A read-only view of one step of an episode, i.e. one row of an EpisodeTable (see src.episode.episode_table)
+    # which holds the actual data. Every field is read as an attribute, exactly as if it were held here:
+    #
+    #   Fields direct from the log ... episode, step, x, y, heading, steering_angle, speed, action_taken (None for
+    #       a continuous action space), reward, job_completed, all_wheels_on_track, progress, closest_waypoint_index,
+    #       time, status, track_length
+    #
+    #   Fields calculated by us ... before_waypoint_index, after_waypoint_index, track_speed, progress_speed,
+    #       reward_total, average_reward_so_far, time_elapsed, total_distance_travelled, slide, skew, true_bearing,
+    #       distance_from_center, sequence_count, discounted_future_rewards (list, one per discount factor),
+    #       new_reward, new_reward_total, new_discounted_future_reward, acceleration, braking,
+    #       projected_travel_distance, track_side, dodgy_data
+    #
+    #   Debug text ... debug_log, which is only read from the table's debug logs when it is asked for
+
+    __slots__ = ("_table", "_row")
 
-        self.debug_log = ""
+    def __init__(self, table, row: int):
+        self._table = table
+        self._row = row
 
-        # Data added separately (everything above comes direct from the log, whereas this is calculated by us ...
-        self.before_waypoint_index = 0
-        self.after_waypoint_index = 0
-        self.track_speed = 0.0
-        self.progress_speed = 0.0
-        self.reward_total = 0.0
-        self.average_reward_so_far = 0.0
-        self.time_elapsed = 0.0
-        self.total_distance_travelled = 0.0
-        self.slide = 0.0
-        self.skew = 0.0
-        self.true_bearing = 0.0
-        self.distance_from_center = 0.0
-        self.sequence_count = 0
-        self.discounted_future_rewards = []
-        self.new_reward = 0.0
-        self.new_reward_total = 0.0
-        self.new_discounted_future_reward = 0.0
-        self.acceleration = 0.0
-        self.braking = 0.0
-        self.projected_travel_distance = 0.0
-        self.track_side = "L"
+    def __getattr__(self, name: str):
+        # Only called for names that are not found in the usual way, i.e. the fields of the step
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name == "debug_log":
+            return self.get_debug_log()
+        return self._table.get_value(name, self._row)
 
-        self.dodgy_data = False
+    def get_debug_log(self) -> str:
+        return self._table.get_debug_log(self._row)
 
     def is_within_waypoint_range(self, waypoint_range):
         if waypoint_range:
@@ -70,28 +60,61 @@ class Event:
         else:
             return True
 
-    def get_reward_input_params(self, current_track: Track):
-        point = (self.x, self.y)
-        side = current_track.get_position_of_point_relative_to_waypoint(point, self.closest_waypoint_index)
-        params = {
-            'all_wheels_on_track': self.all_wheels_on_track,
-            'x': self.x,
-            'y': self.y,
-            'heading': self.heading,
-            'distance_from_center': self.distance_from_center,
+
+def get_reward_input_params_of_steps(columns: dict, waypoints: tuple, track_width: float):
+    # The reward input params of each step in turn, from a list of the values of each of REWARD_INPUT_COLUMNS. Every
+    # step shares the same waypoints, which are a tuple so that a reward function cannot change them for the others
+    #
+    # SAMPLE AS AT 31st MARCH 2021:
+    #
+    # 'all_wheels_on_track': True
+    # 'x': 4.085043155152535
+    # 'y': 0.6837354098890907
+    # 'heading': 0.034683898621264996
+    # 'distance_from_center': 0.00012227425889283888
+    # 'projection_distance': 1.025310673102175
+    # 'progress': 0.7897196081016897
+    # 'steps': 2.0
+    # 'speed': 1.3333333333333333
+    # 'steering_angle': 15.0
+    # 'track_width': 0.7619997315412399
+    # 'track_length': 17.709159380834848
+    # 'waypoints': [(3.059733510017395, 0.6826554089784622), (3.2095088958740234, 0.6831344813108444), ... ... ...
+    # 'closest_waypoints': [6, 7]
+    # 'is_left_of_center': True
+    # 'is_reversed': False
+    # 'closest_objects': [0, 0]
+    # 'objects_location': []
+    # 'objects_left_of_center': []
+    # 'object_in_camera': False
+    # 'objects_speed': []
+    # 'objects_heading': []
+    # 'objects_distance_from_center': []
+    # 'objects_distance': []
+    # 'is_crashed': False
+    # 'is_offtrack': False
+    for (all_wheels_on_track, x, y, heading, distance_from_center, progress, step, speed, steering_angle,
+         track_length, before_waypoint_index, after_waypoint_index, track_side, status) in \
+            zip(*[columns[name] for name in REWARD_INPUT_COLUMNS]):
+        yield {
+            'all_wheels_on_track': all_wheels_on_track,
+            'x': x,
+            'y': y,
+            'heading': heading,
+            'distance_from_center': distance_from_center,
             'projection_distance': 0.0,             # TODO
-            'progress': self.progress,
-            'steps': float(self.step),
-            'speed': float(self.speed),
-            'steering_angle': float(self.steering_angle),
-            'track_width': current_track.get_width(),
-            'track_length': float(self.track_length),
-            'waypoints': current_track.get_all_waypoints(),
-            'closest_waypoints': [int(self.before_waypoint_index), int(self.after_waypoint_index)],
-            'is_left_of_center': side == "L",
-            'is_reversed': self.status == _STATUS_REVERSED,
-            'is_crashed': self.status == _STATUS_CRASHED,
-            'is_offtrack': self.status == _STATUS_OFF_TRACK,
+            'progress': progress,
+            'steps': float(step),
+            'speed': float(speed),
+            'steering_angle': float(steering_angle),
+            'track_width': track_width,
+            'track_length': float(track_length),
+            'waypoints': waypoints,
+            'closest_waypoints': [int(before_waypoint_index), int(after_waypoint_index)],
+            'is_left_of_center': track_side == "L",
+            'is_reversed': status == _STATUS_REVERSED,
+            'is_crashed': status == _STATUS_CRASHED,
+            'is_offtrack': status == _STATUS_OFF_TRACK,
             'closest_objects': [0, 0],              # TODO
             'objects_location': [],                 # TODO
             'objects_left_of_center': [],           # TODO
@@ -101,33 +124,3 @@ class Event:
             'objects_distance_from_center': [],     # TODO
             'objects_distance': []                  # TODO
         }
-        return params
-
-        # SAMPLE AS AT 31st MARCH 2021:
-        #
-        # 'all_wheels_on_track': True
-        # 'x': 4.085043155152535
-        # 'y': 0.6837354098890907
-        # 'heading': 0.034683898621264996
-        # 'distance_from_center': 0.00012227425889283888
-        # 'projection_distance': 1.025310673102175
-        # 'progress': 0.7897196081016897
-        # 'steps': 2.0
-        # 'speed': 1.3333333333333333
-        # 'steering_angle': 15.0
-        # 'track_width': 0.7619997315412399
-        # 'track_length': 17.709159380834848
-        # 'waypoints': [(3.059733510017395, 0.6826554089784622), (3.2095088958740234, 0.6831344813108444), ... ... ...
-        # 'closest_waypoints': [6, 7]
-        # 'is_left_of_center': True
-        # 'is_reversed': False
-        # 'closest_objects': [0, 0]
-        # 'objects_location': []
-        # 'objects_left_of_center': []
-        # 'object_in_camera': False
-        # 'objects_speed': []
-        # 'objects_heading': []
-        # 'objects_distance_from_center': []
-        # 'objects_distance': []
-        # 'is_crashed': False
-        # 'is_offtrack': False
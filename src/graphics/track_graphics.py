@@ -6,7 +6,14 @@
 # Copyright (c) 2021 dmh23
 #
 
+import base64
+import math
+import struct
+import zlib
 from tkinter import *
+
+import numpy as np
+
 import src.utils.geometry as geometry
 import src.configuration.real_world as config
 
@@ -23,8 +30,15 @@ class TrackGraphics:
         self.car_widgets = []
         self.old_car_widgets = []
 
+        # Tk only shows an image while Python still holds it
+        self.images = []
+        self._box_grid_pixels_key = None
+        self._box_grid_pixels = None
+        self._color_lookup_tables = {}
+
     def reset_to_blank(self):
         self.canvas.delete("all")
+        self.images = []
 
     def set_track_area(self, min_x, min_y, max_x, max_y):
         assert max_x > min_x
@@ -92,6 +106,22 @@ class TrackGraphics:
 
         return self.canvas.create_rectangle(x, y, x2, y2, fill=colour, width=0)
 
+    def plot_box_grid(self, min_x, min_y, box_size, colour_indexes: np.ndarray, colours: list):
+        # The same as calling plot_box() for every box in a grid, with colour_indexes holding the index in colours of
+        # each box (in rows upwards from min_y), or -1 for no box, but drawn as one image rather than a rectangle each
+        pixels = self._get_box_grid_pixels(min_x, min_y, box_size, colour_indexes.shape)
+        if pixels is None:
+            return None
+        (left, top, pixel_boxes) = pixels
+
+        # The last colour is transparent, for boxes that are not drawn and for pixels that are outside the grid
+        box_colour_indexes = np.append(colour_indexes.ravel(), -1)
+        rgba = self._get_color_lookup_table(colours)[box_colour_indexes[pixel_boxes]]
+
+        image = PhotoImage(data=base64.b64encode(_get_png(rgba)), format="png")
+        self.images.append(image)
+        return self.canvas.create_image(left, top, image=image, anchor=NW)
+
     def plot_angled_box(self, x: float, y: float, width: float, length: float, colour: str, heading: float):
 
         middle = (x, y)
@@ -161,3 +191,60 @@ class TrackGraphics:
         for w in self.old_car_widgets:
             self.canvas.delete(w)
         self.old_car_widgets = []
+
+    def _get_box_grid_pixels(self, min_x, min_y, box_size, shape: tuple):
+        # Where the image of a grid of boxes goes on the canvas, and the index of the box that each of its pixels
+        # shows, which only changes when the grid or the track area does (i.e. not just for new colours)
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        key = (min_x, min_y, box_size, shape, self.scale, self.min_x, self.max_y, width, height)
+        if key != self._box_grid_pixels_key:
+            self._box_grid_pixels_key = key
+            self._box_grid_pixels = _get_box_grid_pixels(min_x, min_y, box_size, shape, self.scale, self.min_x,
+                                                         self.max_y, width, height)
+        return self._box_grid_pixels
+
+    def _get_color_lookup_table(self, colours: list):
+        # The RGBA of each colour, as Tk sees it, followed by a transparent colour
+        key = tuple(colours)
+        if key not in self._color_lookup_tables:
+            lookup_table = np.zeros((len(colours) + 1, 4), dtype=np.uint8)
+            for i, colour in enumerate(colours):
+                (r, g, b) = self.canvas.winfo_rgb(colour)
+                lookup_table[i] = (r >> 8, g >> 8, b >> 8, 255)
+            self._color_lookup_tables[key] = lookup_table
+        return self._color_lookup_tables[key]
+
+
+def _get_box_grid_pixels(min_x, min_y, box_size, shape: tuple, scale, canvas_min_x, canvas_max_y, width, height):
+    # The box of each pixel is the box under the middle of the pixel, or one past the last box if there is none,
+    # and only the part of the grid that is on the canvas is included
+    (rows, columns) = shape
+    left = max(0, math.floor((min_x - canvas_min_x) * scale))
+    right = min(width, math.ceil((min_x + columns * box_size - canvas_min_x) * scale))
+    top = max(0, math.floor((canvas_max_y - min_y - rows * box_size) * scale))
+    bottom = min(height, math.ceil((canvas_max_y - min_y) * scale))
+    if right <= left or bottom <= top:
+        return None
+
+    x_boxes = np.floor((canvas_min_x + (np.arange(left, right) + 0.5) / scale - min_x) / box_size).astype(int)
+    y_boxes = np.floor((canvas_max_y - (np.arange(top, bottom) + 0.5) / scale - min_y) / box_size).astype(int)
+    is_in_grid = (((0 <= y_boxes) & (y_boxes < rows))[:, np.newaxis] &
+                  ((0 <= x_boxes) & (x_boxes < columns))[np.newaxis, :])
+    pixel_boxes = np.where(is_in_grid, y_boxes[:, np.newaxis] * columns + x_boxes[np.newaxis, :], rows * columns)
+    return left, top, pixel_boxes
+
+
+def _get_png(rgba: np.ndarray) -> bytes:
+    # An image with 8 bit RGBA pixels, in rows from the top, as a PNG file
+    (height, width, _) = rgba.shape
+    scanlines = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    scanlines[:, 1:] = rgba.reshape(height, width * 4)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + _get_png_chunk(b"IHDR", header) +
+            _get_png_chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 1)) + _get_png_chunk(b"IEND", b""))
+
+
+def _get_png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
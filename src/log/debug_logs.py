@@ -0,0 +1,88 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import numpy as np
+
+
+class DebugLogs:
+    #
+    # PUBLIC interface
+    #
+
+    # The debug output that comes before each step (e.g. printed by the reward function) held as spans of one
+    # UTF-8 buffer, which is a memory-mapped episode cache when possible. The text of a step is only decoded if it is
+    # actually wanted, so there is no string per step held in memory
+
+    def __init__(self, buffer, offsets: np.ndarray):
+        # Step i is buffer[offsets[i]:offsets[i + 1]], where the buffer is bytes or a read-only mmap
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __reduce__(self):
+        # A memory-mapped buffer cannot be pickled (e.g. to return it from another process), so only the text of
+        # these steps is copied instead
+        (text, offsets) = self.get_text_and_offsets()
+        return DebugLogs, (bytes(text), offsets)
+
+    def get(self, index: int) -> str:
+        return self._buffer[self._offsets[index]:self._offsets[index + 1]].decode()
+
+    def get_range(self, start: int, finish: int):
+        # Steps start to finish - 1, like a slice
+        return DebugLogs(self._buffer, self._offsets[start:finish + 1])
+
+    def contains(self, search_string: str) -> bool:
+        # The text of every step ends with a newline, so a match can only cross from one step to the next if the
+        # search string itself contains a newline
+        search_bytes = search_string.encode()
+        if "\n" in search_string:
+            for start, finish in zip(self._offsets[:-1].tolist(), self._offsets[1:].tolist()):
+                if self._buffer.find(search_bytes, start, finish) >= 0:
+                    return True
+            return False
+        else:
+            return self._buffer.find(search_bytes, int(self._offsets[0]), int(self._offsets[-1])) >= 0
+
+    def get_text_and_offsets(self):
+        # Returns all the text as bytes, with offsets starting from zero
+        start = int(self._offsets[0])
+        return self._buffer[start:int(self._offsets[-1])], self._offsets - start
+
+
+def create_debug_logs(debug_logs: list[str]) -> DebugLogs:
+    text = "".join(debug_logs)
+    buffer = text.encode()
+
+    # Character lengths are also byte lengths in the usual case of pure ASCII
+    if len(buffer) == len(text):
+        lengths = [len(d) for d in debug_logs]
+    else:
+        lengths = [len(d.encode()) for d in debug_logs]
+
+    offsets = np.zeros(len(debug_logs) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return DebugLogs(buffer, offsets)
+
+
+def concatenate_debug_logs(all_debug_logs: list[DebugLogs]) -> DebugLogs:
+    if len(all_debug_logs) == 1:
+        return all_debug_logs[0]
+
+    all_text = []
+    all_offsets = [np.zeros(1, dtype=np.int64)]
+    length = 0
+    for d in all_debug_logs:
+        (text, offsets) = d.get_text_and_offsets()
+        all_text.append(bytes(text))
+        all_offsets.append(offsets[1:] + length)
+        length += len(text)
+
+    return DebugLogs(b"".join(all_text), np.concatenate(all_offsets))
@@ -0,0 +1,158 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import json
+import mmap
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+from src.log.debug_logs import DebugLogs
+from src.log.evaluation_phase import EvaluationPhase
+
+
+#
+# PUBLIC Constants and Interface
+#
+
+CACHE_FILE_SUFFIX = ".cache.npz"
+
+# Increase this whenever the layout of the cache changes, including any change to parse.TRACE_COLUMNS_DTYPE
+CACHE_FORMAT_VERSION = 1
+
+
+def write_episode_cache(cache_path: str, source_path: str, trace_columns: np.ndarray, debug_logs: DebugLogs,
+                        episode_offsets: list[int], episode_ids: list[int], episode_iterations: list[int],
+                        episode_object_locations: list, evaluation_phases: list[EvaluationPhase]):
+    source_stats = os.stat(source_path)
+
+    (debug_text, debug_offsets) = debug_logs.get_text_and_offsets()
+
+    evaluation_lengths = [p.length for p in evaluation_phases]
+    if evaluation_phases:
+        evaluation_rewards = np.concatenate([p.rewards for p in evaluation_phases])
+        evaluation_progresses = np.concatenate([p.progresses for p in evaluation_phases])
+    else:
+        evaluation_rewards = np.zeros(0)
+        evaluation_progresses = np.zeros(0)
+
+    # Write to a temporary file first so a half-written cache is never seen by a later load
+    temporary_path = cache_path + ".tmp"
+    try:
+        with open(temporary_path, "wb") as cache_file:
+            np.savez(cache_file,
+                     format_version=np.array(CACHE_FORMAT_VERSION),
+                     source_size=np.array(source_stats.st_size),
+                     source_mtime=np.array(source_stats.st_mtime),
+                     trace_columns=trace_columns,
+                     debug_text=np.frombuffer(debug_text, dtype=np.uint8),
+                     debug_offsets=debug_offsets,
+                     episode_offsets=np.array(episode_offsets, dtype=np.int64),
+                     episode_ids=np.array(episode_ids, dtype=np.int64),
+                     episode_iterations=np.array(episode_iterations, dtype=np.int64),
+                     episode_object_locations=np.array(json.dumps(episode_object_locations)),
+                     evaluation_lengths=np.array(evaluation_lengths, dtype=np.int64),
+                     evaluation_rewards=evaluation_rewards,
+                     evaluation_progresses=evaluation_progresses)
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        # The cache is only an optimisation, e.g. on Windows it cannot be replaced while a log is open
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+def read_episode_cache(cache_path: str, source_path: str):
+    if not os.path.isfile(cache_path) or not os.path.isfile(source_path):
+        return None
+
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            source_stats = os.stat(source_path)
+            if (int(cache["format_version"]) != CACHE_FORMAT_VERSION or
+                    int(cache["source_size"]) != source_stats.st_size or
+                    float(cache["source_mtime"]) != source_stats.st_mtime):
+                return None
+
+            debug_offsets = cache["debug_offsets"]
+
+            episode_offsets = cache["episode_offsets"].tolist()
+            episode_ids = cache["episode_ids"].tolist()
+            episode_iterations = cache["episode_iterations"].tolist()
+            episode_object_locations = json.loads(str(cache["episode_object_locations"]))
+
+            evaluation_phases = []
+            evaluation_rewards = cache["evaluation_rewards"]
+            evaluation_progresses = cache["evaluation_progresses"]
+            start = 0
+            for length in cache["evaluation_lengths"].tolist():
+                evaluation_phases.append(EvaluationPhase(evaluation_rewards[start:start + length],
+                                                         evaluation_progresses[start:start + length]))
+                start += length
+
+        trace_columns = _memory_map_npz_member(cache_path, "trace_columns")
+        debug_logs = _memory_map_npz_text_member(cache_path, "debug_text", debug_offsets)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+    return (trace_columns, debug_logs, episode_offsets, episode_ids, episode_iterations,
+            episode_object_locations, evaluation_phases)
+
+
+#
+# PRIVATE Implementation
+#
+
+_ZIP_LOCAL_HEADER_SIZE = 30
+
+
+def _memory_map_npz_member(npz_path: str, member_name: str) -> np.ndarray:
+    (is_stored, data_offset, shape, fortran_order, dtype) = _find_npz_member_data(npz_path, member_name)
+
+    if not is_stored or dtype.hasobject or 0 in shape:
+        with np.load(npz_path, allow_pickle=False) as cache:
+            return cache[member_name]
+
+    return np.memmap(npz_path, dtype=dtype, mode="r", offset=data_offset, shape=shape,
+                     order="F" if fortran_order else "C")
+
+
+def _memory_map_npz_text_member(npz_path: str, member_name: str, offsets: np.ndarray) -> DebugLogs:
+    # Text is mapped with mmap rather than np.memmap, since it can then be searched in place with find()
+    (is_stored, data_offset, shape, _, dtype) = _find_npz_member_data(npz_path, member_name)
+
+    if not is_stored or dtype != np.uint8 or 0 in shape:
+        with np.load(npz_path, allow_pickle=False) as cache:
+            return DebugLogs(cache[member_name].tobytes(), offsets)
+
+    with open(npz_path, "rb") as raw_file:
+        text_map = mmap.mmap(raw_file.fileno(), 0, access=mmap.ACCESS_READ)
+    return DebugLogs(text_map, offsets + data_offset)
+
+
+def _find_npz_member_data(npz_path: str, member_name: str):
+    # np.load() ignores mmap_mode for .npz files, but np.savez() stores members uncompressed so the raw .npy
+    # data can still be mapped directly by finding where it starts within the zip file
+    with zipfile.ZipFile(npz_path) as npz_file:
+        info = npz_file.getinfo(member_name + ".npy")
+
+    with open(npz_path, "rb") as raw_file:
+        raw_file.seek(info.header_offset)
+        local_header = raw_file.read(_ZIP_LOCAL_HEADER_SIZE)
+        name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+        raw_file.seek(info.header_offset + _ZIP_LOCAL_HEADER_SIZE + name_length + extra_length)
+
+        version = np.lib.format.read_magic(raw_file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(raw_file)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(raw_file)
+        data_offset = raw_file.tell()
+
+    return info.compress_type == zipfile.ZIP_STORED, data_offset, shape, fortran_order, dtype
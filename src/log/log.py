@@ -6,27 +6,46 @@
 # Copyright (c) 2021 dmh23
 #
 
+import heapq
+import io
 import numpy as np
 import os
 import json
 import tarfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Union
 
 import src.log.parse as parse
 
+from src.log.debug_logs import DebugLogs, concatenate_debug_logs, create_debug_logs
+from src.log.episode_cache import CACHE_FILE_SUFFIX, read_episode_cache, write_episode_cache
+from src.log.new_reward_cache import get_new_reward_cache_path, read_new_reward_cache, write_new_reward_cache
 from src.log.evaluation_phase import EvaluationPhase
 from src.log.log_meta import LogMeta
-
-from src.episode.episode import Episode
-from src.personalize.configuration.analysis import TIME_BEFORE_FIRST_STEP
-from src.ui.please_wait import PleaseWait
+from src.log.reorder_buffer import ReorderBuffer
+from src.log.trace_parse_state import TraceParseState
+
+from src.action_space.action_space import ActionSpace
+from src.episode.episode import Episode, STEP_ANALYSIS_COLUMNS
+from src.episode.episode_table import EpisodeTable, create_episode_table
+from src.episode.new_reward_scoring import can_score_in_processes, get_reward_function_key, score_steps
+from src.event.event_meta import REWARD_INPUT_COLUMNS
+from src.personalize.configuration.analysis import NEW_REWARD_FUNCTION, TIME_BEFORE_FIRST_STEP
 from src.tracks.track import Track
 
 from src.utils.discount_factors import discount_factors
+from src.utils.processes import PROCESS_CONTEXT
+from src.utils.progress import ProgressReporter, ProgressTicker
 
 META_FILE_SUFFIX = ".meta.json"
 LOG_FILE_SUFFIX = ".log"
 CONSOLE_LOG_SUFFIX = ".gz"
 
+PROGRESS_MIN_TICK_BYTES = 64 * 1024   # Reading a log only reports progress after at least this much more is read
+EPISODE_ANALYSIS_CHUNK_SIZE = 200     # Episodes analyzed in each other process at a time, when there are enough
+NEW_REWARD_BATCH_SIZE = 5000          # Steps scored by the new reward function at a time, in each other process
+
 
 class Log:
     #
@@ -39,61 +58,126 @@ class Log:
             received_json = json.load(file)
             self._log_meta.set_from_json(received_json)
 
-    def load_all(self, meta_file_name, please_wait: PleaseWait, track: Track,
-                 calculate_new_reward=False, calculate_alternate_discount_factors=False):
+    def load_all(self, meta_file_name: Union[str, list[str]], please_wait: ProgressReporter, track: Track,
+                 calculate_new_reward=False, calculate_alternate_discount_factors=False, follow=False):
+        # A list of meta files loads the logs of all the workers of one training session, as a single log
+        if isinstance(meta_file_name, list):
+            worker_meta_file_names = meta_file_name
+            meta_file_name = worker_meta_file_names[0]
+        else:
+            worker_meta_file_names = [meta_file_name]
+
+        self.stop_background_analysis()
         please_wait.start("Loading")
         self.load_meta(meta_file_name)
         self._log_file_name = meta_file_name[:-len(META_FILE_SUFFIX)]
         discount_factors.reset_for_log(self._log_meta.hyper.discount_factor)
         please_wait.set_progress(2)
 
-        if self._log_file_name.endswith(CONSOLE_LOG_SUFFIX):
-            with tarfile.open(os.path.join(self._log_directory, self._log_file_name), "r") as tar:
-                for member in tar:
-                    if "/logs/training" in member.name and member.name.endswith("-robomaker.log"):
-                        binary_io = tar.extractfile(member)
-                        self._parse_episode_events(
-                            binary_io, True,
-                            please_wait,
-                            2, 50, 95, True, False, member.size, track,
-                            calculate_new_reward, calculate_alternate_discount_factors)
+        # The new rewards of all the episodes are scored together once they have all been created
+        score_new_rewards = calculate_new_reward and bool(NEW_REWARD_FUNCTION)
+        episodes_progress_percent = 80 if score_new_rewards else 95
+
+        if len(worker_meta_file_names) > 1:
+            assert not follow
+            self._read_worker_episode_columns([m[:-len(META_FILE_SUFFIX)] for m in worker_meta_file_names],
+                                              please_wait, 2, 50)
+            self._create_episodes_from_columns(0, please_wait, 50, episodes_progress_percent, True, track,
+                                               calculate_new_reward, calculate_alternate_discount_factors)
+            self._log_meta.episode_stats = LogMeta.EpisodeStats()
+            self._analyze_episode_details()
+        elif follow:
+            # A log that is still being written is always parsed from the text, and never cached
+            assert self.can_follow()
+            self._follow_state = TraceParseState()
+            self._follow_track = track
+            self._follow_calculate_new_reward = calculate_new_reward
+            self._follow_calculate_alternate_discount_factors = calculate_alternate_discount_factors
+            self._read_followed_log(please_wait, 2, episodes_progress_percent)
+        elif self._load_episode_cache():
+            self._create_episodes_from_columns(0, please_wait, 2, episodes_progress_percent, True, track,
+                                               calculate_new_reward, calculate_alternate_discount_factors)
         else:
-            with open(os.path.join(self._log_directory, self._log_file_name), "r") as file_io:
-                self._parse_episode_events(
-                    file_io, False,
-                    please_wait,
-                    2, 50, 95, True, False, 0, track,
-                    calculate_new_reward, calculate_alternate_discount_factors)
+            self._parse_log_file(please_wait, 2, 50, episodes_progress_percent, True, False, track,
+                                 calculate_new_reward, calculate_alternate_discount_factors)
+            self.save_episode_cache()
+
+        if score_new_rewards:
+            # Only the log of a single worker is cached, as for its episodes, and never one that is still growing
+            self._score_new_rewards(0, track, please_wait, episodes_progress_percent, 95,
+                                    len(worker_meta_file_names) == 1 and not follow)
 
         self._divide_episodes_into_quarters(please_wait, 95, 100)
         please_wait.set_progress(100)
         please_wait.stop(0.3)
 
-    def parse(self, log_file_name, please_wait: PleaseWait, min_progress_percent: float, max_progress_percent: float):
+    def follow(self, please_wait: ProgressReporter):
+        # Reads whatever has been appended to the log since it was loaded (or last followed) and returns any new
+        # episodes, which have also been appended to get_episodes()
+        assert self.is_following()
+        was_analyzing_in_background = self._background_analysis_thread is not None
+        self.stop_background_analysis()
+        first_new_episode_index = len(self._episodes)
+        if self._follow_calculate_new_reward and NEW_REWARD_FUNCTION:
+            self._read_followed_log(please_wait, 0, 80)
+            self._score_new_rewards(first_new_episode_index, self._follow_track, please_wait, 80, 95, False)
+        else:
+            self._read_followed_log(please_wait, 0, 95)
+
+        new_episodes = self._episodes[first_new_episode_index:]
+        if new_episodes:
+            self._divide_episodes_into_quarters(please_wait, 95, 100)
+        if was_analyzing_in_background:
+            self.start_background_analysis()
+        return new_episodes
+
+    def start_background_analysis(self):
+        # Completes the full analysis of every episode in a background thread, so that it is usually done before
+        # anything wants it, rather than making the first track analyzer wait (see Episode.complete_analysis)
+        self.stop_background_analysis()
+        self._background_analysis_stop = threading.Event()
+        self._background_analysis_thread = threading.Thread(
+            target=_complete_analysis_of_episodes, args=(list(self._episodes), self._background_analysis_stop))
+        self._background_analysis_thread.daemon = True   # Set as daemon so thread is killed if main GUI is closed
+        self._background_analysis_thread.start()
+
+    def stop_background_analysis(self):
+        # Waits for the thread to finish the episode it is part way through, so nothing else runs alongside it
+        if self._background_analysis_thread is not None:
+            self._background_analysis_stop.set()
+            self._background_analysis_thread.join()
+            self._background_analysis_stop = None
+            self._background_analysis_thread = None
+
+    def can_follow(self):
+        # Console logs are compressed archives of a finished training job, so only plain logs can grow
+        return not self._log_file_name.endswith(CONSOLE_LOG_SUFFIX)
+
+    def is_following(self):
+        return self._follow_state is not None
+
+    def has_grown(self):
+        # Cheap enough to poll frequently, so follow() is only called when there might be something new
+        if not self.is_following():
+            return False
+        return self._get_log_file_size() > self._follow_state.file_offset
+
+    def has_been_replaced(self):
+        # A followed log that is now shorter than what has been read was truncated or replaced (e.g. by a new training
+        # job with the same name), so it can only be followed by loading it again from the start
+        if not self.is_following():
+            return False
+        return self._get_log_file_size() < self._follow_state.file_offset
+
+    def parse(self, log_file_name, please_wait: ProgressReporter, min_progress_percent: float, max_progress_percent: float):
         self._log_file_name = log_file_name
         self._meta_file_name = log_file_name + META_FILE_SUFFIX
 
         # TODO - Extract correct model name
-        # TODO - Move this common file handling logic into _parse_episode_events()
-        if self._log_file_name.endswith(CONSOLE_LOG_SUFFIX):
-            with tarfile.open(os.path.join(self._log_directory, self._log_file_name), "r") as tar:
-                for member in tar:
-                    if "/logs/training" in member.name and member.name.endswith("-robomaker.log"):
-                        binary_io = tar.extractfile(member)
-                        self._parse_episode_events(
-                            binary_io, True,
-                            please_wait,
-                            min_progress_percent,
-                            min_progress_percent + 0.9 * (max_progress_percent - min_progress_percent),
-                            max_progress_percent, False, True, member.size)
-        else:
-            with open(os.path.join(self._log_directory, self._log_file_name), "r") as file_io:
-                self._parse_episode_events(
-                    file_io, False,
-                    please_wait,
-                    min_progress_percent,
-                    min_progress_percent + 0.9 * (max_progress_percent - min_progress_percent),
-                    max_progress_percent, False, True, 0)
+        self._parse_log_file(please_wait,
+                             min_progress_percent,
+                             min_progress_percent + 0.9 * (max_progress_percent - min_progress_percent),
+                             max_progress_percent, False, True)
 
         self._analyze_episode_details()
 
@@ -101,6 +185,20 @@ class Log:
         with open(os.path.join(self._log_directory, self._meta_file_name), "w+") as meta_file:
             log_json = self._log_meta.get_as_json()
             json.dump(log_json, meta_file, indent=2)
+        self.save_episode_cache()
+
+    def save_episode_cache(self):
+        if self._trace_columns_chunks:
+            write_episode_cache(self._get_episode_cache_path(),
+                                os.path.join(self._log_directory, self._log_file_name),
+                                self.get_trace_columns(), concatenate_debug_logs(self._debug_logs),
+                                self._episode_offsets, self._episode_ids, self._episode_iterations,
+                                self._episode_object_locations, self._evaluation_phases)
+
+    def set_meta_from_json(self, log_file_name: str, meta_json: dict):
+        self._log_file_name = log_file_name
+        self._meta_file_name = log_file_name + META_FILE_SUFFIX
+        self._log_meta.set_from_json(meta_json)
 
     def get_meta_file_name(self):
         return self._meta_file_name
@@ -117,6 +215,20 @@ class Log:
     def get_episodes(self):
         return self._episodes
 
+    def get_trace_columns(self):
+        # Joined up only when wanted, since a followed log is read in many chunks
+        if not self._trace_columns_chunks:
+            return None
+        if len(self._trace_columns_chunks) == 1:
+            return self._trace_columns_chunks[0]
+        return np.concatenate(self._trace_columns_chunks)
+
+    def get_out_of_order_step_count(self):
+        return self._out_of_order_step_count
+
+    def get_lost_step_count(self):
+        return self._lost_step_count
+
     #
     # PRIVATE implementation
     #
@@ -125,10 +237,27 @@ class Log:
         self._log_meta = LogMeta()
         self._episodes = []
         self._evaluation_phases = []
+        self._trace_columns_chunks = []     # Each chunk is viewed by its own episodes, so is never copied
+        self._out_of_order_step_count = 0
+        self._lost_step_count = 0
+        self._debug_logs = []     # In chunks, since a followed log is added to many times
+        self._episode_offsets = [0]
+        self._episode_ids = []
+        self._episode_iterations = []
+        self._episode_object_locations = []
+        self._follow_state = None
+        self._follow_track = None
+        self._follow_calculate_new_reward = False
+        self._follow_calculate_alternate_discount_factors = False
+        self._background_analysis_stop = None
+        self._background_analysis_thread = None
         self._log_file_name = ""
         self._meta_file_name = ""
         self._log_directory = log_directory
 
+    def _get_log_file_size(self):
+        return os.path.getsize(os.path.join(self._log_directory, self._log_file_name))
+
     # def _parse_intro_events(self, file_io, is_binary: bool):
     #     for line_of_text in file_io:
     #         if is_binary:
@@ -138,20 +267,64 @@ class Log:
     #         else:
     #             parse.parse_intro_event(line_of_text, self._log_meta)
 
-    def _parse_episode_events(self, file_io, is_binary: bool, please_wait: PleaseWait,
+    def _parse_log_file(self, please_wait: ProgressReporter,
+                        min_progress_percent: float, mid_progress_percent: float, max_progress_percent: float,
+                        do_full_analysis: bool, parse_intro: bool, track: Track = None,
+                        calculate_new_reward=False, calculate_alternate_discount_factors=False,
+                        create_episodes=True):
+        if self._log_file_name.endswith(CONSOLE_LOG_SUFFIX):
+            with tarfile.open(os.path.join(self._log_directory, self._log_file_name), "r") as tar:
+                for member in tar:
+                    if "/logs/training" in member.name and member.name.endswith("-robomaker.log"):
+                        binary_io = tar.extractfile(member)
+                        self._parse_episode_events(
+                            binary_io, True,
+                            please_wait,
+                            min_progress_percent, mid_progress_percent, max_progress_percent,
+                            do_full_analysis, parse_intro, member.size, track,
+                            calculate_new_reward, calculate_alternate_discount_factors,
+                            create_episodes=create_episodes)
+        else:
+            with open(os.path.join(self._log_directory, self._log_file_name), "r") as file_io:
+                self._parse_episode_events(
+                    file_io, False,
+                    please_wait,
+                    min_progress_percent, mid_progress_percent, max_progress_percent,
+                    do_full_analysis, parse_intro, 0, track,
+                    calculate_new_reward, calculate_alternate_discount_factors,
+                    create_episodes=create_episodes)
+
+    def _parse_episode_events(self, file_io, is_binary: bool, please_wait: ProgressReporter,
                               min_progress_percent: float, mid_progress_percent: float, max_progress_percent: float,
                               do_full_analysis: bool, parse_intro: bool, file_size_override: int, track: Track = None,
-                              calculate_new_reward=False, calculate_alternate_discount_factors=False):
+                              calculate_new_reward=False, calculate_alternate_discount_factors=False,
+                              state: TraceParseState = None, create_episodes=True):
+        if state is None:
+            state = TraceParseState()
+
         episode_events = []
         episode_iterations = []
         episode_object_locations = []
-        saved_events = []
-        intro = True
-        saved_debug = ""
-        evaluation_rewards = []
-        saved_object_locations = None
+        saved_events = state.sequencer.reorder_buffer
+        previous_out_of_order_count = saved_events.out_of_order_count
+        previous_lost_count = saved_events.get_lost_count()
         iteration_id = 0
 
+        # Held in locals while parsing, since this loop runs for every line of the log
+        intro = state.intro
+        saved_debug_lines = state.saved_debug_lines
+        evaluation_rewards = state.evaluation_rewards
+        saved_object_locations = state.saved_object_locations
+
+        # A followed log is only ever parsed as columns, since the episodes are built from the trace columns, and
+        # likewise when the episodes are not wanted yet
+        parse_as_columns = parse.PARSE_TRACE_AS_COLUMNS or state is self._follow_state or not create_episodes
+        trace_lines = []
+        trace_columns_chunks = []
+        trace_debug_logs = []
+        trace_object_locations = []
+        iteration_markers = []
+
         # TODO - This fudge goes away when all the file handling is re-located into here ...
         if file_size_override > 0:
             file_size = file_size_override
@@ -159,82 +332,391 @@ class Log:
             file_size = os.path.getsize(os.path.join(self._log_directory, self._log_file_name))
 
         file_amount_read = 0
+        ticker = ProgressTicker(please_wait, min_progress_percent, mid_progress_percent, file_size,
+                                PROGRESS_MIN_TICK_BYTES)
+        next_tick = ticker.tick(0)
 
         for line_of_text in file_io:
+            file_amount_read += len(line_of_text)
+            if file_amount_read >= next_tick:
+                next_tick = ticker.tick(file_amount_read)
+
             if is_binary:
                 line_of_text = line_of_text.decode()
 
-            if line_of_text.startswith(parse.EPISODE_STARTS_WITH):
-                intro = False
-                parse.parse_episode_event(line_of_text, episode_events, episode_object_locations,
-                                          saved_events, saved_debug, saved_object_locations,
-                                          self._log_meta.action_space.is_continuous())
-                saved_debug = ""
-                saved_object_locations = None
-            elif parse.EPISODE_STARTS_WITH in line_of_text and (len(line_of_text) > 1000 or parse.SENT_SIGTERM in line_of_text):
-                end_of_str = line_of_text[line_of_text.find(parse.EPISODE_STARTS_WITH):]
+            line_type = parse.classify_line(line_of_text)
+
+            if line_type == parse.LINE_TYPE_TRACE:
+                trace_text = line_of_text
+            elif line_type == parse.LINE_TYPE_EMBEDDED_TRACE:
+                trace_text = line_of_text[line_of_text.find(parse.EPISODE_STARTS_WITH):]
+            else:
+                trace_text = None
+
+            if trace_text is not None:
                 intro = False
-                parse.parse_episode_event(end_of_str, episode_events, episode_object_locations,
-                                          saved_events, saved_debug, saved_object_locations,
-                                          self._log_meta.action_space.is_continuous())
-                saved_debug = ""
+                if parse_as_columns:
+                    trace_lines.append(trace_text)
+                    trace_debug_logs.append("".join(saved_debug_lines))
+                    trace_object_locations.append(saved_object_locations)
+                    if len(trace_lines) >= parse.TRACE_COLUMNS_CHUNK_SIZE:
+                        trace_columns_chunks.append(parse.parse_episode_event_columns(
+                            trace_lines, self._log_meta.action_space.is_continuous()))
+                        trace_lines = []
+                else:
+                    parse.parse_episode_event(trace_text, episode_events, episode_object_locations,
+                                              saved_events, "".join(saved_debug_lines), saved_object_locations,
+                                              self._log_meta.action_space.is_continuous())
+                saved_debug_lines = []
                 saved_object_locations = None
             elif not intro:
-                evaluation_reward = parse.parse_evaluation_reward_info(line_of_text)
-                evaluation_progresses = parse.parse_evaluation_progress_info(line_of_text)
-                object_locations = parse.parse_object_locations(line_of_text)
-
-                if evaluation_reward is not None:
-                    evaluation_rewards.append(evaluation_reward)
-                elif evaluation_progresses is not None:
+                if line_type == parse.LINE_TYPE_OTHER:
+                    saved_debug_lines.append(line_of_text)
+                elif line_type == parse.LINE_TYPE_EVALUATION_REWARD:
+                    evaluation_rewards.append(parse.parse_evaluation_reward_info(line_of_text))
+                elif line_type == parse.LINE_TYPE_EVALUATION_PROGRESSES:
+                    evaluation_progresses = parse.parse_evaluation_progress_info(line_of_text)
                     # Rare case in which final reward is missing from log file for some reason
                     if len(evaluation_progresses) == len(evaluation_rewards) + 1:
                         evaluation_progresses = evaluation_progresses[:-1]
                     assert len(evaluation_progresses) == len(evaluation_rewards)
                     self._evaluation_phases.append(EvaluationPhase(evaluation_rewards, evaluation_progresses))
                     evaluation_rewards = []
-                    while len(episode_events) - 1 > len(episode_iterations):  # Minus 1 avoids counting next (empty) one
-                        episode_iterations.append(iteration_id)
-                    iteration_id += 1
-                elif line_of_text.startswith(parse.STILL_EVALUATING):
-                    saved_debug = ""  # Make sure debug info doesn't include any output from evaluation phase
+                    if parse_as_columns:
+                        iteration_markers.append(state.sequencer.row_count + len(trace_debug_logs))
+                    else:
+                        while len(episode_events) - 1 > len(episode_iterations):  # Minus 1 avoids counting next (empty) one
+                            episode_iterations.append(iteration_id)
+                        iteration_id += 1
+                elif line_type == parse.LINE_TYPE_STILL_EVALUATING:
+                    saved_debug_lines = []  # Make sure debug info doesn't include any output from evaluation phase
                     saved_object_locations = None
-                elif object_locations:
-                    saved_object_locations = object_locations
                 else:
-                    saved_debug += line_of_text
+                    object_locations = parse.parse_object_locations(line_of_text)
+                    if object_locations:
+                        saved_object_locations = object_locations
+                    else:
+                        saved_debug_lines.append(line_of_text)
             else:
                 if parse_intro:
                     parse.parse_intro_event(line_of_text, self._log_meta)
 
-                object_locations = parse.parse_object_locations(line_of_text)
-                if object_locations:
-                    saved_object_locations = object_locations
-                    intro = False
-
-            file_amount_read += len(line_of_text)
-            percent_read = file_amount_read / file_size * 100
-            scaled_percent_read = (mid_progress_percent - min_progress_percent) / 100 * percent_read
-            please_wait.set_progress(min_progress_percent + scaled_percent_read)
+                if line_type == parse.LINE_TYPE_OBJECT_LOCATIONS:
+                    object_locations = parse.parse_object_locations(line_of_text)
+                    if object_locations:
+                        saved_object_locations = object_locations
+                        intro = False
+
+        ticker.finish()
+
+        state.intro = intro
+        state.saved_debug_lines = saved_debug_lines
+        state.evaluation_rewards = evaluation_rewards
+        state.saved_object_locations = saved_object_locations
+
+        if parse_as_columns:
+            is_continuous = self._log_meta.action_space.is_continuous()
+            trace_columns_chunks.append(parse.parse_episode_event_columns(trace_lines, is_continuous))
+            trace_columns = np.concatenate(trace_columns_chunks)
+
+            # Only completed episodes are kept, so the unfinished one (if any) stays behind in the state
+            sequencer = state.sequencer
+            sequencer.add_rows(trace_columns["episode"].tolist(), trace_columns["step"].tolist(),
+                               trace_columns["job_completed"].tolist(), trace_object_locations, iteration_markers)
+            self._add_reorder_statistics(saved_events, previous_out_of_order_count, previous_lost_count)
+
+            available_columns = np.concatenate([state.pending_columns, trace_columns])
+            available_debug_logs = state.pending_debug_logs + trace_debug_logs
+            first_available_row = state.pending_first_row
+
+            first_episode_id = sequencer.taken_episode_count
+            (episode_rows, episode_object_locations, episode_iterations) = sequencer.take_completed_episodes()
+
+            first_needed_row = sequencer.get_first_needed_row()
+            state.pending_columns = available_columns[first_needed_row - first_available_row:].copy()
+            state.pending_debug_logs = available_debug_logs[first_needed_row - first_available_row:]
+            state.pending_first_row = first_needed_row
+
+            first_episode_index = len(self._episode_ids)
+            self._append_episode_columns(available_columns, available_debug_logs, first_available_row,
+                                         episode_rows, first_episode_id, episode_iterations, episode_object_locations)
+            if create_episodes:
+                self._create_episodes_from_columns(first_episode_index, please_wait,
+                                                   mid_progress_percent, max_progress_percent, do_full_analysis,
+                                                   track, calculate_new_reward, calculate_alternate_discount_factors)
+            return
+
+        self._add_reorder_statistics(saved_events, previous_out_of_order_count, previous_lost_count)
 
         if saved_events:
             episode_events = episode_events[:-1]
 
         last_episode = episode_events[-1]
-        if len(last_episode) == 0 or not last_episode[-1].job_completed:
+        if len(last_episode) == 0 or not last_episode[-1][0][parse.TRACE_ROW_JOB_COMPLETED]:
             episode_events = episode_events[:-1]
 
-        total_episodes = len(episode_events)
-
         while len(episode_events) > len(episode_iterations):
             episode_iterations.append(iteration_id)
 
-        for i, e in enumerate(episode_events):
-            self._episodes.append(Episode(i, episode_iterations[i], e, episode_object_locations[i],
+        # The rows are already in episode order, so the episodes are simply consecutive rows of the columns
+        trace_rows = [r for rows in episode_events for r in rows]
+        trace_columns = np.array([row for (row, _) in trace_rows], dtype=parse.TRACE_COLUMNS_DTYPE)
+        episode_rows = []
+        first_row = 0
+        for rows in episode_events:
+            episode_rows.append(range(first_row, first_row + len(rows)))
+            first_row += len(rows)
+
+        first_episode_index = len(self._episode_ids)
+        self._append_episode_columns(trace_columns, [debug for (_, debug) in trace_rows], 0, episode_rows, 0,
+                                     episode_iterations, episode_object_locations)
+        self._create_episodes_from_columns(first_episode_index, please_wait,
+                                           mid_progress_percent, max_progress_percent, do_full_analysis,
+                                           track, calculate_new_reward, calculate_alternate_discount_factors)
+
+    def _read_followed_log(self, please_wait: ProgressReporter, min_progress_percent: float, max_progress_percent: float):
+        with open(os.path.join(self._log_directory, self._log_file_name), "rb") as file:
+            file.seek(self._follow_state.file_offset)
+            new_text = file.read()
+
+        # Leave any line that is still being written until next time
+        complete_length = new_text.rfind(b"\n") + 1
+        if complete_length == 0:
+            return
+        self._follow_state.file_offset += complete_length
+
+        self._parse_episode_events(
+            io.StringIO(new_text[:complete_length].decode(), newline=None), False,
+            please_wait,
+            min_progress_percent,
+            min_progress_percent + 0.5 * (max_progress_percent - min_progress_percent),
+            max_progress_percent, True, False, complete_length, self._follow_track,
+            self._follow_calculate_new_reward, self._follow_calculate_alternate_discount_factors,
+            self._follow_state)
+
+    def _add_reorder_statistics(self, reorder_buffer: ReorderBuffer,
+                                previous_out_of_order_count: int, previous_lost_count: int):
+        self._out_of_order_step_count += reorder_buffer.out_of_order_count - previous_out_of_order_count
+        self._lost_step_count += reorder_buffer.get_lost_count() - previous_lost_count
+
+    def _append_episode_columns(self, trace_columns: np.ndarray, trace_debug_logs: list[str], first_row: int,
+                                episode_rows: list[list[int]], first_episode_id: int, episode_iterations: list[int],
+                                episode_object_locations: list):
+        # Re-order the trace so each episode is a contiguous slice, and hence every episode is a view of the chunk.
+        # Nothing is added for a read of a followed log that completes no episodes
+        if self._trace_columns_chunks and not episode_rows:
+            return
+        order = np.fromiter((r - first_row for rows in episode_rows for r in rows), dtype=np.int64)
+        self._trace_columns_chunks.append(trace_columns[order])
+        self._debug_logs.append(create_debug_logs([trace_debug_logs[r] for r in order.tolist()]))
+
+        for i, rows in enumerate(episode_rows):
+            self._episode_offsets.append(self._episode_offsets[-1] + len(rows))
+            self._episode_ids.append(first_episode_id + i)
+            self._episode_iterations.append(episode_iterations[i])
+            self._episode_object_locations.append(episode_object_locations[i])
+
+    def _create_episodes_from_columns(self, first_episode_index: int, please_wait: ProgressReporter,
+                                      min_progress_percent: float, max_progress_percent: float,
+                                      do_full_analysis: bool, track: Track,
+                                      calculate_new_reward: bool, calculate_alternate_discount_factors: bool):
+        is_continuous = self._log_meta.action_space.is_continuous()
+        episode_count = len(self._episode_ids) - first_episode_index
+        if episode_count == 0:
+            return
+        chunk_count = -(-episode_count // EPISODE_ANALYSIS_CHUNK_SIZE)
+        worker_count = min(chunk_count, os.cpu_count() or 1)
+
+        # The latest chunk of the trace columns and debug logs always starts with the first of these new episodes,
+        # and each episode is a view of some rows of one table of all these new episodes
+        first_row = self._episode_offsets[first_episode_index]
+        table = create_episode_table(self._trace_columns_chunks[-1], self._debug_logs[-1], is_continuous)
+
+        if worker_count > 1:
+            mid_progress_percent = min_progress_percent + 0.8 * (max_progress_percent - min_progress_percent)
+            step_analyses = self._analyze_steps_in_processes(table, first_episode_index, chunk_count, worker_count,
+                                                             please_wait, min_progress_percent, mid_progress_percent)
+            min_progress_percent = mid_progress_percent
+        else:
+            step_analyses = [None] * episode_count
+
+        ticker = ProgressTicker(please_wait, min_progress_percent, max_progress_percent, episode_count)
+        next_tick = ticker.tick(0)
+
+        for i in range(first_episode_index, len(self._episode_ids)):
+            start = self._episode_offsets[i] - first_row
+            finish = self._episode_offsets[i + 1] - first_row
+            self._episodes.append(Episode(self._episode_ids[i], self._episode_iterations[i],
+                                          table.get_rows(start, finish), self._episode_object_locations[i],
                                           self._log_meta.action_space, do_full_analysis, track,
-                                          calculate_new_reward, calculate_alternate_discount_factors))
-            please_wait.set_progress(
-                mid_progress_percent + i / total_episodes * (max_progress_percent - mid_progress_percent))
+                                          calculate_new_reward, calculate_alternate_discount_factors,
+                                          step_analyses[i - first_episode_index]))
+            if i - first_episode_index >= next_tick:
+                next_tick = ticker.tick(i - first_episode_index)
+        ticker.finish()
+
+    def _analyze_steps_in_processes(self, table: EpisodeTable, first_episode_index: int,
+                                    chunk_count: int, worker_count: int, please_wait: ProgressReporter,
+                                    min_progress_percent: float, max_progress_percent: float):
+        # Analyzing the steps is most of the cost of creating the episodes, so chunks of episodes are analyzed in
+        # other processes, which send back just the columns that were set plus a few attributes of each episode
+        trace_columns = self._trace_columns_chunks[-1]
+        first_row = self._episode_offsets[first_episode_index]
+        episode_offsets = np.array(self._episode_offsets[first_episode_index:]) - first_row
+        episode_count = len(episode_offsets) - 1
+        chunk_starts = [c * EPISODE_ANALYSIS_CHUNK_SIZE for c in range(chunk_count)] + [episode_count]
+
+        step_analyses = [None] * episode_count
+        ticker = ProgressTicker(please_wait, min_progress_percent, max_progress_percent, chunk_count)
+        ticker.tick(0)
+
+        with ProcessPoolExecutor(max_workers=worker_count, mp_context=PROCESS_CONTEXT) as executor:
+            pending = {}
+            for c in range(chunk_count):
+                chunk_offsets = episode_offsets[chunk_starts[c]:chunk_starts[c + 1] + 1]
+                chunk_columns = trace_columns[chunk_offsets[0]:chunk_offsets[-1]]
+                future = executor.submit(_analyze_steps_of_episodes, np.asarray(chunk_columns),
+                                         chunk_offsets - chunk_offsets[0], self._log_meta.action_space)
+                pending[future] = c
+
+            for done_count, future in enumerate(as_completed(pending), 1):
+                c = pending[future]
+                (columns, chunk_step_analyses) = future.result()
+                chunk_table = table.get_rows(episode_offsets[chunk_starts[c]], episode_offsets[chunk_starts[c + 1]])
+                for name, column in columns.items():
+                    chunk_table.set_column(name, column)
+                step_analyses[chunk_starts[c]:chunk_starts[c + 1]] = chunk_step_analyses
+                ticker.tick(done_count)
+
+        ticker.finish()
+        return step_analyses
+
+    def _score_new_rewards(self, first_episode_index: int, track: Track, please_wait: ProgressReporter,
+                           min_progress_percent: float, max_progress_percent: float, use_cache: bool):
+        # Scores every step of these episodes at once, rather than each episode doing so when first wanted, since
+        # calling the reward function for every step is slow enough to be worth doing in batches in other processes
+        episodes = self._episodes[first_episode_index:]
+        if not episodes:
+            return
+
+        step_count = sum(len(e.table) for e in episodes)
+        log_path = os.path.join(self._log_directory, self._log_file_name)
+        key = get_reward_function_key(NEW_REWARD_FUNCTION, track) if use_cache else None
+
+        new_reward = None
+        if key is not None:
+            new_reward = read_new_reward_cache(get_new_reward_cache_path(log_path, key), log_path, key, step_count)
+
+        if new_reward is None:
+            columns = {name: np.concatenate([e.table.get_column(name) for e in episodes])
+                       for name in REWARD_INPUT_COLUMNS}
+            new_reward = _score_steps_in_batches(columns, track, please_wait,
+                                                 min_progress_percent, max_progress_percent)
+            if key is not None:
+                write_new_reward_cache(get_new_reward_cache_path(log_path, key), log_path, key, new_reward)
+
+        start = 0
+        for e in episodes:
+            e.set_new_rewards(new_reward[start:start + len(e.table)])
+            start += len(e.table)
+
+    def _get_episode_cache_path(self):
+        return os.path.join(self._log_directory, self._log_file_name + CACHE_FILE_SUFFIX)
+
+    def _load_episode_cache(self):
+        cache = read_episode_cache(self._get_episode_cache_path(),
+                                   os.path.join(self._log_directory, self._log_file_name))
+        if cache is None:
+            return False
+
+        (trace_columns, debug_logs, self._episode_offsets, self._episode_ids,
+         self._episode_iterations, self._episode_object_locations, self._evaluation_phases) = cache
+        self._trace_columns_chunks = [trace_columns]
+        self._debug_logs = [debug_logs]
+        return True
+
+    def _read_episode_columns(self, please_wait: ProgressReporter,
+                              min_progress_percent: float, max_progress_percent: float):
+        # Just the trace columns of each episode, from the cache when possible, without creating the episodes
+        if not self._load_episode_cache():
+            self._parse_log_file(please_wait, min_progress_percent, max_progress_percent, max_progress_percent,
+                                 False, False, create_episodes=False)
+            self.save_episode_cache()
+
+    def _get_episode_columns(self):
+        return (self.get_trace_columns(), concatenate_debug_logs(self._debug_logs), self._episode_offsets,
+                self._episode_iterations, self._episode_object_locations, self._evaluation_phases,
+                self._out_of_order_step_count, self._lost_step_count)
+
+    def _read_worker_episode_columns(self, worker_log_file_names: list[str], please_wait: ProgressReporter,
+                                     min_progress_percent: float, max_progress_percent: float):
+        # Each worker's log is read in its own process when possible, so all the workers together take about as
+        # long as the longest one
+        worker_count = min(len(worker_log_file_names), os.cpu_count() or 1)
+        all_worker_columns = [None] * len(worker_log_file_names)
+        ticker = ProgressTicker(please_wait, min_progress_percent, max_progress_percent, len(worker_log_file_names))
+        ticker.tick(0)
+
+        if worker_count > 1:
+            with ProcessPoolExecutor(max_workers=worker_count, mp_context=PROCESS_CONTEXT) as executor:
+                pending = {executor.submit(_read_worker_log_episode_columns, self._log_directory, f): i
+                           for i, f in enumerate(worker_log_file_names)}
+                for done_count, future in enumerate(as_completed(pending), 1):
+                    all_worker_columns[pending[future]] = future.result()
+                    ticker.tick(done_count)
+        else:
+            for i, f in enumerate(worker_log_file_names):
+                all_worker_columns[i] = _read_worker_log_episode_columns(self._log_directory, f)
+                ticker.tick(i + 1)
+
+        ticker.finish()
+        self._merge_worker_episode_columns(all_worker_columns)
+
+    def _merge_worker_episode_columns(self, all_worker_columns: list):
+        # Every worker does an equal share of the episodes in each training iteration, so the episodes are merged
+        # iteration by iteration, and in worker order within each iteration. The clock of each worker starts
+        # separately, so timestamps cannot be compared from one worker to another. This is not a streaming merge:
+        # the columns of every worker are all held until the merged copy is made, so at its peak this takes about
+        # twice the memory of the merged log
+        episodes_per_worker_iteration = self._log_meta.hyper.episodes_per_training_iteration // len(all_worker_columns)
+        all_worker_episodes = [self._get_worker_episode_order(w, len(columns[2]) - 1, episodes_per_worker_iteration)
+                               for w, columns in enumerate(all_worker_columns)]
+
+        trace_columns = []
+        debug_logs = []
+        for (_, w, i) in heapq.merge(*all_worker_episodes):
+            (worker_trace_columns, worker_debug_logs, episode_offsets, episode_iterations, episode_object_locations,
+             _, _, _) = all_worker_columns[w]
+            start = episode_offsets[i]
+            finish = episode_offsets[i + 1]
+            trace_columns.append(worker_trace_columns[start:finish])
+            debug_logs.append(worker_debug_logs.get_range(start, finish))
+            self._episode_offsets.append(self._episode_offsets[-1] + finish - start)
+            self._episode_ids.append(len(self._episode_ids))
+            self._episode_iterations.append(episode_iterations[i])
+            self._episode_object_locations.append(episode_object_locations[i])
+
+        if trace_columns:
+            merged_trace_columns = np.concatenate(trace_columns)
+        else:
+            merged_trace_columns = np.empty(0, dtype=parse.TRACE_COLUMNS_DTYPE)
+        merged_trace_columns["episode"] = np.repeat(np.arange(len(self._episode_ids)), np.diff(self._episode_offsets))
+        self._trace_columns_chunks = [merged_trace_columns]
+        self._debug_logs = [concatenate_debug_logs(debug_logs)]
+
+        for (_, _, _, _, _, evaluation_phases, out_of_order_step_count, lost_step_count) in all_worker_columns:
+            self._evaluation_phases += evaluation_phases
+            self._out_of_order_step_count += out_of_order_step_count
+            self._lost_step_count += lost_step_count
+
+    @staticmethod
+    def _get_worker_episode_order(worker: int, episode_count: int, episodes_per_worker_iteration: int):
+        # Yields the merge order of each episode of one worker, which is always increasing
+        for i in range(episode_count):
+            if episodes_per_worker_iteration > 0:
+                yield i // episodes_per_worker_iteration, worker, i
+            else:
+                yield 0, worker, i
 
     def _analyze_episode_details(self):
         self._log_meta.episode_stats.episode_count = len(self._episodes)
@@ -295,17 +777,22 @@ class Log:
         training_end_time = self._episodes[-1].events[-1].time
         self._log_meta.episode_stats.training_minutes = int(round((training_end_time - training_start_time) / 60))
 
-    def _divide_episodes_into_quarters(self, please_wait: PleaseWait,
+    def _divide_episodes_into_quarters(self, please_wait: ProgressReporter,
                                        min_progress_percent: float, max_progress_percent: float):
+        if not self._episodes:
+            return
+
         total_iterations = self._episodes[-1].iteration + 1
 
         if total_iterations < 4:
             self._divide_episodes_into_quarters_ignoring_iteration(please_wait,
                                                                    min_progress_percent, max_progress_percent)
         else:
+            ticker = ProgressTicker(please_wait, min_progress_percent, max_progress_percent, total_iterations)
+            next_tick = ticker.tick(0)
             for e in self._episodes:
-                please_wait.set_progress(min_progress_percent +
-                                         e.iteration / total_iterations * (max_progress_percent - min_progress_percent))
+                if e.iteration >= next_tick:
+                    next_tick = ticker.tick(e.iteration)
 
                 if e.iteration <= round(total_iterations * 0.25) - 1:
                     e.set_quarter(1)
@@ -315,15 +802,18 @@ class Log:
                     e.set_quarter(3)
                 else:
                     e.set_quarter(4)
+            ticker.finish()
 
-    def _divide_episodes_into_quarters_ignoring_iteration(self, please_wait: PleaseWait,
+    def _divide_episodes_into_quarters_ignoring_iteration(self, please_wait: ProgressReporter,
                                                           min_progress_percent: float,
                                                           max_progress_percent: float):
         total_episodes = len(self._episodes)
+        ticker = ProgressTicker(please_wait, min_progress_percent, max_progress_percent, total_episodes)
+        next_tick = ticker.tick(0)
         e: Episode
         for e in self._episodes:
-            please_wait.set_progress(
-                min_progress_percent + e.id / total_episodes * (max_progress_percent - min_progress_percent))
+            if e.id >= next_tick:
+                next_tick = ticker.tick(e.id)
 
             if e.id <= round(total_episodes * 0.25) - 1:
                 e.set_quarter(1)
@@ -333,3 +823,69 @@ class Log:
                 e.set_quarter(3)
             else:
                 e.set_quarter(4)
+        ticker.finish()
+
+
+def _read_worker_log_episode_columns(log_directory: str, log_file_name: str):
+    # Reads one worker's log, possibly in another process, and returns its episode columns ready for merging
+    log = Log(log_directory)
+    log.load_meta(log_file_name + META_FILE_SUFFIX)
+    log._log_file_name = log_file_name
+    log._read_episode_columns(ProgressReporter(), 0, 100)
+    return log._get_episode_columns()
+
+
+def _score_steps_in_batches(columns: dict, track: Track, please_wait: ProgressReporter,
+                            min_progress_percent: float, max_progress_percent: float):
+    step_count = len(columns["step"])
+    batch_starts = list(range(0, step_count, NEW_REWARD_BATCH_SIZE)) + [step_count]
+    batch_count = len(batch_starts) - 1
+    worker_count = min(batch_count, os.cpu_count() or 1)
+    waypoints = track.get_all_waypoints_as_tuple()
+    track_width = track.get_width()
+
+    new_reward = np.zeros(step_count)
+    ticker = ProgressTicker(please_wait, min_progress_percent, max_progress_percent, batch_count)
+    ticker.tick(0)
+
+    if worker_count > 1 and can_score_in_processes(NEW_REWARD_FUNCTION):
+        with ProcessPoolExecutor(max_workers=worker_count, mp_context=PROCESS_CONTEXT) as executor:
+            pending = {}
+            for b in range(batch_count):
+                batch_columns = {name: c[batch_starts[b]:batch_starts[b + 1]] for (name, c) in columns.items()}
+                future = executor.submit(score_steps, NEW_REWARD_FUNCTION, batch_columns, waypoints, track_width)
+                pending[future] = b
+
+            for done_count, future in enumerate(as_completed(pending), 1):
+                b = pending[future]
+                new_reward[batch_starts[b]:batch_starts[b + 1]] = future.result()
+                ticker.tick(done_count)
+    else:
+        for b in range(batch_count):
+            batch_columns = {name: c[batch_starts[b]:batch_starts[b + 1]] for (name, c) in columns.items()}
+            new_reward[batch_starts[b]:batch_starts[b + 1]] = score_steps(NEW_REWARD_FUNCTION, batch_columns,
+                                                                         waypoints, track_width)
+            ticker.tick(b + 1)
+
+    ticker.finish()
+    return new_reward
+
+
+def _analyze_steps_of_episodes(trace_columns: np.ndarray, episode_offsets: np.ndarray, action_space: ActionSpace):
+    # Analyzes the steps of a chunk of episodes, possibly in another process, and returns the columns that were set
+    # along with the step analysis of each episode, which is much smaller than pickling the episodes themselves
+    table = create_episode_table(trace_columns, DebugLogs(b"", np.zeros(len(trace_columns) + 1, dtype=np.int64)),
+                                 action_space.is_continuous())
+    step_analyses = []
+    for start, finish in zip(episode_offsets[:-1].tolist(), episode_offsets[1:].tolist()):
+        episode = Episode(0, 0, table.get_rows(start, finish), [], action_space, False)
+        step_analyses.append(episode.get_step_analysis())
+
+    return {name: table.get_column(name) for name in STEP_ANALYSIS_COLUMNS}, step_analyses
+
+
+def _complete_analysis_of_episodes(episodes: list[Episode], stop: threading.Event):
+    for e in episodes:
+        if stop.is_set():
+            return
+        e.complete_analysis()
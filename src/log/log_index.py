@@ -0,0 +1,175 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import json
+import os
+
+from src.log.log import LOG_FILE_SUFFIX, META_FILE_SUFFIX, CONSOLE_LOG_SUFFIX
+from src.log.log_meta import LogMeta
+
+INDEX_FILE_NAME = "guru_log_index.json"
+INDEX_VERSION = 1
+
+
+class LogIndexEntry:
+    #
+    # PUBLIC interface (this whole class is basically just a data structure, so it's all public)
+    #
+
+    # The parts of a log's meta file needed to choose a log, without the cost of reading the meta file itself
+
+    def __init__(self, meta_file_name: str):
+        self.meta_file_name = meta_file_name
+        self.model_name = ""
+        self.world_name = ""
+        self.race_type = ""
+        self.job_type = ""
+        self.episode_stats = LogMeta.EpisodeStats()
+
+        # Identifies the version of the meta file that this entry was taken from
+        self.modified_time = 0
+        self.file_size = 0
+
+    def set_from_log_meta(self, log_meta: LogMeta):
+        self.model_name = log_meta.model_name
+        self.world_name = log_meta.world_name
+        self.race_type = log_meta.race_type
+        self.job_type = log_meta.job_type
+        self.episode_stats = log_meta.episode_stats
+
+    def get_as_json(self):
+        new_json = dict()
+        new_json["model_name"] = self.model_name
+        new_json["world_name"] = self.world_name
+        new_json["race_type"] = self.race_type
+        new_json["job_type"] = self.job_type
+        new_json["episode_stats"] = self.episode_stats.get_as_json()
+        new_json["modified_time"] = self.modified_time
+        new_json["file_size"] = self.file_size
+        return new_json
+
+    def set_from_json(self, received_json):
+        self.model_name = received_json["model_name"]
+        self.world_name = received_json["world_name"]
+        self.race_type = received_json["race_type"]
+        self.job_type = received_json["job_type"]
+        self.episode_stats.set_from_json(received_json["episode_stats"])
+        self.modified_time = received_json["modified_time"]
+        self.file_size = received_json["file_size"]
+
+
+class LogIndex:
+    #
+    # PUBLIC interface
+    #
+
+    # An index of every log in a directory, saved in the directory itself so that it survives between runs. Each
+    # meta file is only read again when its modified time or size changes, so refreshing the index is just a
+    # directory listing unless logs have been imported or refreshed since
+
+    def __init__(self, log_directory: str):
+        self._log_directory = log_directory
+        self._entries = {}
+        self._new_log_files = []
+        self._load()
+
+    def refresh(self):
+        entries = {}
+        log_files = []
+        meta_file_names = set()
+        changed = False
+
+        with os.scandir(self._log_directory) as directory:
+            for f in directory:
+                if f.name.endswith(META_FILE_SUFFIX):
+                    meta_file_names.add(f.name)
+                    stat = f.stat()
+                    entry = self._entries.get(f.name)
+                    if entry is None or entry.modified_time != stat.st_mtime_ns or entry.file_size != stat.st_size:
+                        entry = self._read_meta_file(f.name, stat)
+                        changed = True
+                    entries[f.name] = entry
+                elif f.name.endswith(LOG_FILE_SUFFIX) or f.name.endswith(CONSOLE_LOG_SUFFIX):
+                    log_files.append(f.name)
+
+        if len(entries) != len(self._entries):
+            changed = True
+
+        self._entries = entries
+        self._new_log_files = [f for f in log_files if f + META_FILE_SUFFIX not in meta_file_names]
+
+        if changed:
+            self._save()
+
+    def get_entries(self) -> list[LogIndexEntry]:
+        return list(self._entries.values())
+
+    def get_new_log_files(self) -> list[str]:
+        # Log files that have not been imported yet, i.e. they have no meta file
+        return self._new_log_files
+
+    #
+    # PRIVATE implementation
+    #
+
+    def _get_index_path(self):
+        return os.path.join(self._log_directory, INDEX_FILE_NAME)
+
+    def _read_meta_file(self, meta_file_name: str, stat: os.stat_result):
+        with open(os.path.join(self._log_directory, meta_file_name), 'rb') as file:
+            log_meta = LogMeta()
+            log_meta.set_from_json(json.load(file))
+
+        entry = LogIndexEntry(meta_file_name)
+        entry.set_from_log_meta(log_meta)
+        entry.modified_time = stat.st_mtime_ns
+        entry.file_size = stat.st_size
+        return entry
+
+    def _load(self):
+        # A missing, unreadable or out of date index is simply rebuilt from the meta files
+        try:
+            with open(self._get_index_path(), 'rb') as file:
+                received_json = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if received_json.get("version") != INDEX_VERSION:
+            return
+
+        for meta_file_name, entry_json in received_json["logs"].items():
+            entry = LogIndexEntry(meta_file_name)
+            entry.set_from_json(entry_json)
+            self._entries[meta_file_name] = entry
+
+    def _save(self):
+        index_json = dict()
+        index_json["version"] = INDEX_VERSION
+        index_json["logs"] = {name: entry.get_as_json() for (name, entry) in self._entries.items()}
+
+        # Written under a temporary name first, so that the index is never left half written
+        temp_path = self._get_index_path() + ".tmp"
+        try:
+            with open(temp_path, "w") as index_file:
+                json.dump(index_json, index_file)
+            os.replace(temp_path, self._get_index_path())
+        except OSError:
+            print("WARNING - unable to save log index in " + self._log_directory)
+
+
+_log_indexes = {}
+
+
+def get_log_index(log_directory: str) -> LogIndex:
+    # Returns the index for the directory, kept in memory between calls, after bringing it up to date
+    log_index = _log_indexes.get(log_directory)
+    if log_index is None:
+        log_index = LogIndex(log_directory)
+        _log_indexes[log_directory] = log_index
+    log_index.refresh()
+    return log_index
@@ -6,22 +6,38 @@
 # Copyright (c) 2021 dmh23
 #
 
+import multiprocessing
 import os
+import queue
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
-from src.log.log import LOG_FILE_SUFFIX, Log, META_FILE_SUFFIX, CONSOLE_LOG_SUFFIX
+from src.log.log import LOG_FILE_SUFFIX, Log, CONSOLE_LOG_SUFFIX
+from src.log.log_index import get_log_index
+from src.utils.processes import PROCESS_CONTEXT
+from src.utils.progress import ProgressReporter
 
+PROGRESS_POLL_SECONDS = 0.1
 
-def refresh_all_log_meta(please_wait, log_directory):
+
+def refresh_all_log_meta(please_wait, log_directory, worker_count: int = 1):
     please_wait.start("Refreshing")
     log_files = []
     for f in os.listdir(log_directory):
         if f.endswith(LOG_FILE_SUFFIX) or f.endswith(CONSOLE_LOG_SUFFIX):
             log_files.append(f)
-    import_new_logs(log_files, please_wait, log_directory)
+    import_new_logs(log_files, please_wait, log_directory, worker_count)
 
 
-def import_new_logs(log_files, please_wait, log_directory):
+def import_new_logs(log_files, please_wait, log_directory, worker_count: int = 1):
     please_wait.start("Importing")
+    if worker_count <= 0:
+        worker_count = os.cpu_count() or 1
+    worker_count = min(worker_count, len(log_files))
+
+    if worker_count > 1:
+        _import_new_logs_in_parallel(log_files, please_wait, log_directory, worker_count)
+        return
+
     total_count = len(log_files)
     for i, f in enumerate(log_files):
         log = Log(log_directory)
@@ -30,40 +46,85 @@ def import_new_logs(log_files, please_wait, log_directory):
 
 
 def get_model_info_for_open_model_dialog(track, log_directory):
-    all_logs_count = 0
+    # Returns the index entry (rather than the full log meta) of each model trained on this track
+    all_log_entries = get_log_index(log_directory).get_entries()
     model_names = []
     model_logs = {}
-    for f in os.listdir(log_directory):
-        if f.endswith(META_FILE_SUFFIX):
-            all_logs_count += 1
-            log = Log(log_directory)
-            log.load_meta(f)
-
-            if track.has_world_name(log.get_log_meta().world_name):
-                model_name = log.get_log_meta().model_name
-                model_names.append(model_name)
-                model_logs[model_name] = log
-    return model_logs, model_names, all_logs_count
+    for entry in all_log_entries:
+        if track.has_world_name(entry.world_name):
+            model_names.append(entry.model_name)
+            model_logs[entry.model_name] = entry
+    return model_logs, model_names, len(all_log_entries)
 
 
 def get_possible_new_model_log_files(log_directory: str):
-    new_log_files = []
+    return get_log_index(log_directory).get_new_log_files()
 
-    all_files = os.listdir(log_directory)
-    for f in all_files:
-        if f.endswith(LOG_FILE_SUFFIX) or f.endswith(CONSOLE_LOG_SUFFIX):
-            expected_meta = f + META_FILE_SUFFIX
-            if expected_meta not in all_files:
-                new_log_files.append(f)
 
-    return new_log_files
+def get_world_names_of_existing_logs(log_directory):
+    return {entry.world_name for entry in get_log_index(log_directory).get_entries()}
+
 
+#
+# PRIVATE implementation of parallel import, where each log is parsed in its own process and only the
+# LogMeta JSON is returned (the binary episode cache is written directly by the worker process)
+#
 
-def get_world_names_of_existing_logs(log_directory):
-    world_names = set()
-    for f in os.listdir(log_directory):
-        if f.endswith(META_FILE_SUFFIX):
-            log = Log(log_directory)
-            log.load_meta(f)
-            world_names.add(log.get_log_meta().world_name)
-    return world_names
+def _import_new_logs_in_parallel(log_files, please_wait, log_directory, worker_count: int):
+    total_count = len(log_files)
+    percent_done = [0.0] * total_count
+    progress_queue = PROCESS_CONTEXT.Queue()
+
+    with ProcessPoolExecutor(max_workers=worker_count, mp_context=PROCESS_CONTEXT,
+                             initializer=_initialize_import_worker, initargs=(progress_queue,)) as executor:
+        pending = {executor.submit(_import_log_in_worker, log_directory, f, i): i for i, f in enumerate(log_files)}
+        while pending:
+            done, _ = wait(pending, timeout=PROGRESS_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                log = Log(log_directory)
+                log.set_meta_from_json(log_files[i], future.result())
+                log.save()
+                percent_done[i] = 100.0
+
+            _read_worker_progress(progress_queue, percent_done)
+            please_wait.set_progress(sum(percent_done) / total_count)
+
+    progress_queue.close()
+
+
+def _read_worker_progress(progress_queue: multiprocessing.Queue, percent_done: list[float]):
+    while True:
+        try:
+            (i, percent) = progress_queue.get_nowait()
+        except queue.Empty:
+            return
+        percent_done[i] = max(percent_done[i], percent)
+
+
+_worker_progress_queue = None
+
+
+def _initialize_import_worker(progress_queue: multiprocessing.Queue):
+    global _worker_progress_queue
+    _worker_progress_queue = progress_queue
+
+
+def _import_log_in_worker(log_directory: str, log_file: str, index: int):
+    log = Log(log_directory)
+    log.parse(log_file, _WorkerPleaseWait(index), 0, 100)
+    log.save_episode_cache()
+    return log.get_log_meta().get_as_json()
+
+
+class _WorkerPleaseWait(ProgressReporter):
+    # Forwards progress to the parent process, at most once per whole percent
+
+    def __init__(self, index: int):
+        self._index = index
+        self._last_percent_sent = 0
+
+    def set_progress(self, percent_done: float):
+        if int(percent_done) > self._last_percent_sent:
+            self._last_percent_sent = int(percent_done)
+            _worker_progress_queue.put((self._index, float(self._last_percent_sent)))
@@ -0,0 +1,91 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import glob
+import os
+import zipfile
+
+import numpy as np
+
+
+#
+# PUBLIC Constants and Interface
+#
+
+# Each reward function has its own cache beside the log, so switching back to one that was used before costs nothing.
+# Only the most recently used few are kept for each log, since every edit of the reward function makes another
+NEW_REWARD_CACHE_FILE_SUFFIX = ".new_reward.npz"
+NEW_REWARD_CACHE_KEY_LENGTH = 16
+NEW_REWARD_CACHES_KEPT_PER_LOG = 4
+
+
+def get_new_reward_cache_path(log_path: str, reward_function_key: str):
+    return log_path + "." + reward_function_key[:NEW_REWARD_CACHE_KEY_LENGTH] + NEW_REWARD_CACHE_FILE_SUFFIX
+
+
+def write_new_reward_cache(cache_path: str, source_path: str, reward_function_key: str, new_reward: np.ndarray):
+    source_stats = os.stat(source_path)
+
+    # Write to a temporary file first so a half-written cache is never seen by a later load
+    temporary_path = cache_path + ".tmp"
+    try:
+        with open(temporary_path, "wb") as cache_file:
+            np.savez(cache_file,
+                     reward_function_key=np.array(reward_function_key),
+                     source_size=np.array(source_stats.st_size),
+                     source_mtime=np.array(source_stats.st_mtime),
+                     new_reward=new_reward)
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        # The cache is only an optimisation
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    _remove_least_recently_used_caches(source_path)
+
+
+def read_new_reward_cache(cache_path: str, source_path: str, reward_function_key: str, step_count: int):
+    if not os.path.isfile(cache_path) or not os.path.isfile(source_path):
+        return None
+
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            source_stats = os.stat(source_path)
+            if (str(cache["reward_function_key"]) != reward_function_key or
+                    int(cache["source_size"]) != source_stats.st_size or
+                    float(cache["source_mtime"]) != source_stats.st_mtime):
+                return None
+
+            new_reward = cache["new_reward"]
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+    if len(new_reward) != step_count:
+        return None
+
+    # Marks it as recently used, so it is one of the caches that are kept
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return new_reward
+
+
+#
+# PRIVATE implementation
+#
+
+def _remove_least_recently_used_caches(source_path: str):
+    prefix = source_path + "."
+    cache_paths = [p for p in glob.glob(glob.escape(prefix) + "*" + NEW_REWARD_CACHE_FILE_SUFFIX)
+                   if len(p) == len(prefix) + NEW_REWARD_CACHE_KEY_LENGTH + len(NEW_REWARD_CACHE_FILE_SUFFIX)]
+    try:
+        cache_paths.sort(key=os.path.getmtime, reverse=True)
+        for cache_path in cache_paths[NEW_REWARD_CACHES_KEPT_PER_LOG:]:
+            os.remove(cache_path)
+    except OSError:
+        pass
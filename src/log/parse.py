@@ -7,9 +7,12 @@
 #
 
 import json
+import re
+
+import numpy as np
 
-from src.event.event_meta import Event
 from src.log.log_meta import LogMeta
+from src.log.reorder_buffer import ReorderBuffer
 from src.action_space.action import Action
 
 
@@ -21,64 +24,70 @@ EPISODE_STARTS_WITH = "SIM_TRACE_LOG"
 SENT_SIGTERM = "Sent SIGTERM"
 STILL_EVALUATING = "Reset agent"
 
+# Plain integers rather than an IntEnum, since classify_line() is called for every line of every log
+LINE_TYPE_OTHER = 0
+LINE_TYPE_TRACE = 1
+LINE_TYPE_EMBEDDED_TRACE = 2    # Trace that follows other output on the same line, rather than starting the line
+LINE_TYPE_EVALUATION_REWARD = 3
+LINE_TYPE_EVALUATION_PROGRESSES = 4
+LINE_TYPE_STILL_EVALUATING = 5
+LINE_TYPE_OBJECT_LOCATIONS = 6
+
+# Set to False to revert to the original line-by-line conversion of each SIM_TRACE_LOG entry
+PARSE_TRACE_AS_COLUMNS = True
+
+# Trace lines are gathered and then converted to columns in chunks of this many lines
+TRACE_COLUMNS_CHUNK_SIZE = 50000
+
+# How many steps can arrive early while waiting for a missing step, before the missing step is presumed lost
+TRACE_REORDER_WINDOW = 20
+
+TRACE_COLUMNS_DTYPE = np.dtype([
+    ("episode", np.int64),
+    ("step", np.int64),
+    ("x", np.float64),
+    ("y", np.float64),
+    ("heading", np.float64),
+    ("steering_angle", np.float64),
+    ("speed", np.float64),
+    ("action_taken", np.int64),
+    ("reward", np.float64),
+    ("job_completed", np.bool_),
+    ("all_wheels_on_track", np.bool_),
+    ("progress", np.float64),
+    ("closest_waypoint_index", np.int64),
+    ("track_length", np.float64),
+    ("time", np.float64),
+    ("status", "U16")])
+
+# Position of job_completed within a row of trace values, as gathered by parse_episode_event()
+TRACE_ROW_JOB_COMPLETED = TRACE_COLUMNS_DTYPE.names.index("job_completed")
+
+
+def classify_line(line_of_text: str) -> int:
+    # Returns one of the LINE_TYPE_... values, checking only the (few) prefixes with the same first character
+    line_type = LINE_TYPE_OTHER
+    for prefix, prefix_line_type in _LINE_PREFIXES_BY_FIRST_CHARACTER.get(line_of_text[:1], _NO_LINE_PREFIXES):
+        if line_of_text.startswith(prefix):
+            if prefix_line_type == LINE_TYPE_TRACE:
+                return LINE_TYPE_TRACE
+            line_type = prefix_line_type
+            break
+
+    if EPISODE_STARTS_WITH in line_of_text and (len(line_of_text) > 1000 or SENT_SIGTERM in line_of_text):
+        return LINE_TYPE_EMBEDDED_TRACE
+
+    return line_type
 
-def parse_intro_event(line_of_text: str, log_meta: LogMeta):
-    if _contains_hyper(line_of_text, HYPER_BATCH_SIZE):
-        log_meta.hyper.batch_size = _get_hyper_integer_value(line_of_text, HYPER_BATCH_SIZE)
-
-    if _contains_hyper(line_of_text, HYPER_ENTROPY):
-        log_meta.hyper.entropy = _get_hyper_float_value(line_of_text, HYPER_ENTROPY)
-
-    if _contains_hyper(line_of_text, HYPER_DISCOUNT_FACTOR):
-        log_meta.hyper.discount_factor = _get_hyper_float_value(line_of_text, HYPER_DISCOUNT_FACTOR)
-
-    if _contains_hyper(line_of_text, HYPER_LOSS_TYPE):
-        log_meta.hyper.loss_type = _get_hyper_string_value(line_of_text, HYPER_LOSS_TYPE)
-
-    if _contains_hyper(line_of_text, HYPER_LEARNING_RATE):
-        log_meta.hyper.learning_rate = _get_hyper_float_value(line_of_text, HYPER_LEARNING_RATE)
-
-    if _contains_hyper(line_of_text, HYPER_EPISODES_BETWEEN_TRAINING):
-        log_meta.hyper.episodes_between_training = _get_hyper_integer_value(line_of_text,
-                                                                            HYPER_EPISODES_BETWEEN_TRAINING)
-
-    if _contains_hyper(line_of_text, HYPER_EPOCHS):
-        log_meta.hyper.epochs = _get_hyper_integer_value(line_of_text, HYPER_EPOCHS)
 
+def parse_intro_event(line_of_text: str, log_meta: LogMeta):
     if NEW_PARAM_WORLD_NAME in line_of_text:
         pos = line_of_text.find(NEW_PARAM_WORLD_NAME)
         log_meta.world_name = line_of_text[pos + len(NEW_PARAM_WORLD_NAME):].split("'", 2)[0]
 
-    if _contains_parameter(line_of_text, PARAM_RACE_TYPE):
-        log_meta.race_type = _get_parameter_string_value(line_of_text, PARAM_RACE_TYPE)
-
-    if _contains_parameter(line_of_text, PARAM_JOB_TYPE):
-        log_meta.job_type = _get_parameter_string_value(line_of_text, PARAM_JOB_TYPE)
-
-    if log_meta.model_name == "":
-        if line_of_text.startswith(MISC_MODEL_NAME_OLD_LOGS):
-            log_meta.model_name = line_of_text.split("/")[1]
-
-        if line_of_text.startswith(MISC_MODEL_NAME_NEW_LOGS_A) and \
-                not line_of_text.startswith(MISC_MODEL_NAME_OLD_LOGS):
-            log_meta.model_name = line_of_text.split("/")[2]
-
-        if line_of_text.startswith(MISC_MODEL_NAME_NEW_LOGS_B):
-            log_meta.model_name = line_of_text.split("/")[2]
-
-        if line_of_text.startswith(MISC_MODEL_NAME_CLOUD_LOGS):
-            split_parts = line_of_text[len(MISC_MODEL_NAME_CLOUD_LOGS):].split("/")
-            if split_parts[1].startswith(CLOUD_TRAINING_YAML_FILENAME_A) or split_parts[1].startswith(CLOUD_TRAINING_YAML_FILENAME_B):
-                log_meta.model_name = split_parts[0]
-
-    if line_of_text.startswith(CONTINUOUS_ACTION_SPACE_START) and CONTINUOUS_ACTION_SPACE_CONTAINS in line_of_text:
-        log_meta.action_space.mark_as_continuous()
-
-    if line_of_text.startswith(MISC_ACTION_SPACE_A):
-        _parse_actions(line_of_text, log_meta, MISC_ACTION_SPACE_A)
-
-    if line_of_text.startswith(MISC_ACTION_SPACE_B):
-        _parse_actions(line_of_text, log_meta, MISC_ACTION_SPACE_B)
+    intro_parser = _INTRO_PARSERS.get(line_of_text[:_INTRO_PARSER_KEY_LENGTH])
+    if intro_parser:
+        intro_parser(line_of_text, log_meta)
 
 
 def parse_object_locations(line_of_text: str):
@@ -89,12 +98,8 @@ def parse_object_locations(line_of_text: str):
 
 
 def parse_episode_event(line_of_text: str, episode_events, episode_object_locations,
-                        saved_events, saved_debug, saved_object_locations, is_continuous_action_space: bool):
-    if len(saved_events) > 15:
-        print(line_of_text)
-
-    assert len(saved_events) < 20
-
+                        saved_events: ReorderBuffer, saved_debug, saved_object_locations,
+                        is_continuous_action_space: bool):
     if not episode_events:
         episode_events.append([])
         episode_object_locations.append([])
@@ -154,61 +159,61 @@ def parse_episode_event(line_of_text: str, episode_events, episode_object_locati
          time,
          status) = input_line[14:].split(",")[:16]
 
-    event_meta = Event()
+    # Each step is a row of values in the same order as TRACE_COLUMNS_DTYPE, along with its debug text
+    row = (int(episode),
+           int(step),
+           float(x),
+           float(y),
+           float(heading),
+           float(steering_angle),
+           float(speed),
+           int(_CONTINUOUS_ACTION_PLACEHOLDER) if is_continuous_action_space else int(action_taken),
+           float(reward),
+           job_completed == "True",
+           all_wheels_on_track == "True",
+           float(progress),
+           int(closest_waypoint_index),
+           float(track_length),
+           float(time),
+           status)
+    trace_row = (row, saved_debug)
+
+    ready_rows = saved_events.add(row[0], row[1], row[TRACE_ROW_JOB_COMPLETED], trace_row)
+
+    for r in ready_rows:
+        episode_events[-1].append(r)
+        if r[0][TRACE_ROW_JOB_COMPLETED]:
+            episode_events.append([])
+            episode_object_locations.append([])
+
+        if r is trace_row and saved_object_locations and not episode_object_locations[-1]:
+            episode_object_locations[-1] = saved_object_locations
 
-    event_meta.episode = int(episode)
-    event_meta.step = int(step)
-    event_meta.x = float(x)
-    event_meta.y = float(y)
-    event_meta.heading = float(heading)
-    event_meta.steering_angle = float(steering_angle)
-    event_meta.speed = float(speed)
-    if is_continuous_action_space:
-        event_meta.action_taken = None
-    else:
-        event_meta.action_taken = int(action_taken)
-    event_meta.reward = float(reward)
-    event_meta.job_completed = (job_completed == "True")
-    event_meta.all_wheels_on_track = (all_wheels_on_track == "True")
-    event_meta.progress = float(progress)
-    event_meta.closest_waypoint_index = int(closest_waypoint_index)
-    event_meta.time = float(time)
-    event_meta.status = status
-    event_meta.track_length = float(track_length)
-
-    event_meta.debug_log = saved_debug
-
-    if event_meta.step > len(episode_events[-1]) + 1 or event_meta.episode > len(episode_events) - 1:
-        saved_events.append(event_meta)
-        return
-
-    assert event_meta.episode == len(episode_events) - 1
     assert len(episode_events) == len(episode_object_locations)
 
-    if event_meta.step != len(episode_events[-1]) + 1:
-        print("WARNING - something wrong near step " + str(event_meta.step) +
-              " of episode " + str(len(episode_events) - 1))
 
-    episode_events[-1].append(event_meta)
-    if event_meta.job_completed:
-        episode_events.append([])
-        episode_object_locations.append([])
+def parse_episode_event_columns(trace_lines: list[str], is_continuous_action_space: bool) -> np.ndarray:
+    # Each entry is the text of a trace line starting from SIM_TRACE_LOG
+    if not trace_lines:
+        return np.empty(0, dtype=TRACE_COLUMNS_DTYPE)
 
-    if saved_object_locations and not episode_object_locations[-1]:
-        episode_object_locations[-1] = saved_object_locations
+    lines = [line[_TRACE_PREFIX_LENGTH:].split("\n", 1)[0] for line in trace_lines]
 
-    added = True
-    while added:
-        added = False
-        for s in saved_events:
-            if s.step == len(episode_events[-1]) + 1 and s.episode == len(episode_events) - 1:
-                episode_events[-1].append(s)
-                saved_events.remove(s)
-                added = True
-                if s.job_completed:
-                    episode_events.append([])
-                    episode_object_locations.append([])
-                break
+    # Continuous actions look like [-8.85 1.23] or [-8.85, 1.23] so replace them with a placeholder in one pass
+    if is_continuous_action_space:
+        lines = _CONTINUOUS_ACTION_PATTERN.sub(_CONTINUOUS_ACTION_PLACEHOLDER, "\n".join(lines)).split("\n")
+
+    raw = np.loadtxt(lines, delimiter=",", dtype=_RAW_TRACE_COLUMNS_DTYPE,
+                     usecols=range(len(_RAW_TRACE_COLUMNS_DTYPE)), comments=None, ndmin=1)
+
+    columns = np.empty(len(raw), dtype=TRACE_COLUMNS_DTYPE)
+    for name in TRACE_COLUMNS_DTYPE.names:
+        if name in _BOOLEAN_TRACE_COLUMNS:
+            columns[name] = raw[name] == "True"
+        else:
+            columns[name] = raw[name]
+
+    return columns
 
 
 def parse_evaluation_reward_info(line_of_text: str):
@@ -283,6 +288,40 @@ EVALUATION_REWARD_START = "## agent: Finished evaluation phase. Success rate = 0
 EVALUATION_PROGRESSES_START_OLD = "Number of evaluations: "
 EVALUATION_PROGRESSES_START = "[BestModelSelection] Number of evaluations: "
 
+_TRACE_PREFIX_LENGTH = len(EPISODE_STARTS_WITH) + 1
+
+_LINE_PREFIXES = [
+    (EPISODE_STARTS_WITH, LINE_TYPE_TRACE),
+    (EVALUATION_REWARD_START, LINE_TYPE_EVALUATION_REWARD),
+    (EVALUATION_PROGRESSES_START_OLD, LINE_TYPE_EVALUATION_PROGRESSES),
+    (EVALUATION_PROGRESSES_START, LINE_TYPE_EVALUATION_PROGRESSES),
+    (STILL_EVALUATING, LINE_TYPE_STILL_EVALUATING),
+    (OBJECT_LOCATIONS, LINE_TYPE_OBJECT_LOCATIONS)
+]
+
+
+def _group_line_prefixes_by_first_character(line_prefixes: list) -> dict:
+    result = {}
+    for prefix, line_type in line_prefixes:
+        result.setdefault(prefix[0], []).append((prefix, line_type))
+    return result
+
+
+_LINE_PREFIXES_BY_FIRST_CHARACTER = _group_line_prefixes_by_first_character(_LINE_PREFIXES)
+_NO_LINE_PREFIXES = []
+
+_HYPER_PREFIX = '  "'
+_PARAMETER_PREFIX = " * /"
+
+_CONTINUOUS_ACTION_PATTERN = re.compile(r"\[[^\]\n]*\]")
+_CONTINUOUS_ACTION_PLACEHOLDER = "-1"
+
+_BOOLEAN_TRACE_COLUMNS = ["job_completed", "all_wheels_on_track"]
+
+_RAW_TRACE_COLUMNS_DTYPE = np.dtype(
+    [(name, "U5") if name in _BOOLEAN_TRACE_COLUMNS else (name, TRACE_COLUMNS_DTYPE[name])
+     for name in TRACE_COLUMNS_DTYPE.names])
+
 
 def _parse_actions(line_of_text: str, log_meta: LogMeta, starts_with: str):
     raw_actions = line_of_text[len(starts_with):].replace("'", "\"")
@@ -303,10 +342,88 @@ def _parse_actions(line_of_text: str, log_meta: LogMeta, starts_with: str):
             log_meta.action_space.add_action(new_action)
 
 
+# Parse the intro, where each parser handles all the intro lines that start with the same few characters
+
+def _parse_intro_hyper(line_of_text: str, log_meta: LogMeta):
+    if _contains_hyper(line_of_text, HYPER_BATCH_SIZE):
+        log_meta.hyper.batch_size = _get_hyper_integer_value(line_of_text, HYPER_BATCH_SIZE)
+
+    if _contains_hyper(line_of_text, HYPER_ENTROPY):
+        log_meta.hyper.entropy = _get_hyper_float_value(line_of_text, HYPER_ENTROPY)
+
+    if _contains_hyper(line_of_text, HYPER_DISCOUNT_FACTOR):
+        log_meta.hyper.discount_factor = _get_hyper_float_value(line_of_text, HYPER_DISCOUNT_FACTOR)
+
+    if _contains_hyper(line_of_text, HYPER_LOSS_TYPE):
+        log_meta.hyper.loss_type = _get_hyper_string_value(line_of_text, HYPER_LOSS_TYPE)
+
+    if _contains_hyper(line_of_text, HYPER_LEARNING_RATE):
+        log_meta.hyper.learning_rate = _get_hyper_float_value(line_of_text, HYPER_LEARNING_RATE)
+
+    if _contains_hyper(line_of_text, HYPER_EPISODES_BETWEEN_TRAINING):
+        log_meta.hyper.episodes_per_training_iteration = _get_hyper_integer_value(
+            line_of_text, HYPER_EPISODES_BETWEEN_TRAINING)
+
+    if _contains_hyper(line_of_text, HYPER_EPOCHS):
+        log_meta.hyper.epochs = _get_hyper_integer_value(line_of_text, HYPER_EPOCHS)
+
+
+def _parse_intro_parameter(line_of_text: str, log_meta: LogMeta):
+    if _contains_parameter(line_of_text, PARAM_RACE_TYPE):
+        log_meta.race_type = _get_parameter_string_value(line_of_text, PARAM_RACE_TYPE)
+
+    if _contains_parameter(line_of_text, PARAM_JOB_TYPE):
+        log_meta.job_type = _get_parameter_string_value(line_of_text, PARAM_JOB_TYPE)
+
+
+def _parse_intro_model_name(line_of_text: str, log_meta: LogMeta):
+    if log_meta.model_name == "":
+        if line_of_text.startswith(MISC_MODEL_NAME_OLD_LOGS):
+            log_meta.model_name = line_of_text.split("/")[1]
+
+        if line_of_text.startswith(MISC_MODEL_NAME_NEW_LOGS_A) and \
+                not line_of_text.startswith(MISC_MODEL_NAME_OLD_LOGS):
+            log_meta.model_name = line_of_text.split("/")[2]
+
+        if line_of_text.startswith(MISC_MODEL_NAME_NEW_LOGS_B):
+            log_meta.model_name = line_of_text.split("/")[2]
+
+        if line_of_text.startswith(MISC_MODEL_NAME_CLOUD_LOGS):
+            split_parts = line_of_text[len(MISC_MODEL_NAME_CLOUD_LOGS):].split("/")
+            if split_parts[1].startswith(CLOUD_TRAINING_YAML_FILENAME_A) or split_parts[1].startswith(CLOUD_TRAINING_YAML_FILENAME_B):
+                log_meta.model_name = split_parts[0]
+
+
+def _parse_intro_continuous_action_space(line_of_text: str, log_meta: LogMeta):
+    if line_of_text.startswith(CONTINUOUS_ACTION_SPACE_START) and CONTINUOUS_ACTION_SPACE_CONTAINS in line_of_text:
+        log_meta.action_space.mark_as_continuous()
+
+
+def _parse_intro_actions(line_of_text: str, log_meta: LogMeta):
+    if line_of_text.startswith(MISC_ACTION_SPACE_A):
+        _parse_actions(line_of_text, log_meta, MISC_ACTION_SPACE_A)
+
+    if line_of_text.startswith(MISC_ACTION_SPACE_B):
+        _parse_actions(line_of_text, log_meta, MISC_ACTION_SPACE_B)
+
+
+_INTRO_PARSER_KEY_LENGTH = 3
+
+_INTRO_PARSERS = {
+    _HYPER_PREFIX[:_INTRO_PARSER_KEY_LENGTH]: _parse_intro_hyper,
+    _PARAMETER_PREFIX[:_INTRO_PARSER_KEY_LENGTH]: _parse_intro_parameter,
+    MISC_MODEL_NAME_NEW_LOGS_A[:_INTRO_PARSER_KEY_LENGTH]: _parse_intro_model_name,
+    MISC_MODEL_NAME_NEW_LOGS_B[:_INTRO_PARSER_KEY_LENGTH]: _parse_intro_model_name,
+    CONTINUOUS_ACTION_SPACE_START[:_INTRO_PARSER_KEY_LENGTH]: _parse_intro_continuous_action_space,
+    MISC_ACTION_SPACE_A[:_INTRO_PARSER_KEY_LENGTH]: _parse_intro_actions,
+    MISC_ACTION_SPACE_B[:_INTRO_PARSER_KEY_LENGTH]: _parse_intro_actions
+}
+
+
 # Parse hyper parameters
 
 def _contains_hyper(line_of_text: str, hyper_name: str):
-    return line_of_text.startswith('  "' + hyper_name + '": ')
+    return line_of_text.startswith(_HYPER_PREFIX + hyper_name + '": ')
 
 
 def _get_hyper_integer_value(line_of_text: str, hyper_name: str):
@@ -327,7 +444,7 @@ def _get_hyper_string_value(line_of_text: str, hyper_name: str):
 # Parse the high level training settings
 
 def _contains_parameter(line_of_text: str, parameter_name: str):
-    return line_of_text.startswith(" * /" + parameter_name + ": ")
+    return line_of_text.startswith(_PARAMETER_PREFIX + parameter_name + ": ")
 
 
 def _get_parameter_string_value(line_of_text: str, parameter_name: str):
@@ -0,0 +1,109 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import heapq
+
+
+class ReorderBuffer:
+    #
+    # PUBLIC interface
+    #
+
+    # Puts trace steps back into (episode, step) order. Steps that arrive early wait in a heap until the steps
+    # before them have arrived, so each step costs O(log n) however badly the log is interleaved
+
+    def __init__(self, window: int):
+        assert window > 0
+        self._window = window
+        self._heap = []
+        self._sequence = 0
+        self._stale_count = 0
+
+        self._episode = 0     # The episode currently being built ...
+        self._next_step = 1   # ... and the step it needs next
+
+        self.out_of_order_count = 0   # Steps that had to wait in the buffer
+        self.gap_count = 0            # Steps accepted despite earlier steps never arriving, because the buffer was full
+        self.discarded_count = 0      # Steps thrown away because they arrived too late or the buffer was full
+
+    def __len__(self):
+        return len(self._heap) + self._stale_count
+
+    def get_lost_count(self) -> int:
+        return self.gap_count + self.discarded_count
+
+    def get_waiting_items(self) -> list:
+        return [item for (_, _, _, _, item) in self._heap]
+
+    def add(self, episode: int, step: int, job_completed: bool, item) -> list:
+        # Returns all the items that are now ready, in order, which might include earlier waiting items
+        ready = []
+
+        if episode < self._episode:
+            print("WARNING - discarded late step " + str(step) + " of episode " + str(episode))
+            self.discarded_count += 1
+            return ready
+
+        if step > self._next_step or episode > self._episode:
+            self.out_of_order_count += 1
+            heapq.heappush(self._heap, (episode, step, self._sequence, job_completed, item))
+            self._sequence += 1
+            if len(self) > self._window:
+                self._make_space(ready)
+            return ready
+
+        if step != self._next_step:
+            print("WARNING - something wrong near step " + str(step) + " of episode " + str(self._episode))
+
+        self._accept(job_completed, item, ready)
+        return ready
+
+    #
+    # PRIVATE implementation
+    #
+
+    def _accept(self, job_completed: bool, item, ready: list):
+        self._advance(job_completed, item, ready)
+        self._release_waiting(ready)
+
+    def _advance(self, job_completed: bool, item, ready: list):
+        ready.append(item)
+        if job_completed:
+            self._episode += 1
+            self._next_step = 1
+        else:
+            self._next_step += 1
+
+    def _release_waiting(self, ready: list):
+        while self._heap:
+            (episode, step, _, job_completed, item) = self._heap[0]
+            if (episode, step) < (self._episode, self._next_step):
+                # Can never be used now, but is still counted (as the original list of saved events did)
+                heapq.heappop(self._heap)
+                self._stale_count += 1
+            elif (episode, step) == (self._episode, self._next_step):
+                heapq.heappop(self._heap)
+                self._advance(job_completed, item, ready)
+            else:
+                return
+
+    def _make_space(self, ready: list):
+        if self._stale_count > 0:
+            self._stale_count -= 1
+            return
+
+        (episode, step, _, job_completed, item) = heapq.heappop(self._heap)
+        if episode == self._episode:
+            print("WARNING - missing steps before step " + str(step) + " of episode " + str(episode))
+            self.gap_count += 1
+            self._next_step = step
+            self._accept(job_completed, item, ready)
+        else:
+            print("WARNING - discarded step " + str(step) + " of episode " + str(episode) +
+                  " while still waiting for episode " + str(self._episode))
+            self.discarded_count += 1
@@ -0,0 +1,33 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import numpy as np
+
+import src.log.parse as parse
+
+from src.log.reorder_buffer import ReorderBuffer
+from src.log.trace_sequencer import TraceSequencer
+
+
+class TraceParseState:
+    # Everything that carries over from one line of a log to the next, so that parsing can stop at the end of
+    # what has been written so far and later carry on from exactly the same point when the log has grown
+
+    def __init__(self):
+        self.file_offset = 0
+        self.intro = True
+        self.saved_debug_lines = []
+        self.saved_object_locations = None
+        self.evaluation_rewards = []
+
+        self.sequencer = TraceSequencer(ReorderBuffer(parse.TRACE_REORDER_WINDOW))
+
+        # Trace rows that might still be needed by the unfinished episode or the reorder buffer
+        self.pending_columns = np.empty(0, dtype=parse.TRACE_COLUMNS_DTYPE)
+        self.pending_debug_logs = []
+        self.pending_first_row = 0
@@ -0,0 +1,88 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+from src.log.reorder_buffer import ReorderBuffer
+
+
+class TraceSequencer:
+    #
+    # PUBLIC interface
+    #
+
+    # Groups trace rows into episodes, applying exactly the same ordering rules as parse.parse_episode_event()
+    # but to row numbers instead of Events. Rows can be added a batch at a time as a log grows, and the rows are
+    # numbered continuously across batches
+
+    def __init__(self, reorder_buffer: ReorderBuffer):
+        self.reorder_buffer = reorder_buffer
+
+        self.episode_rows = [[]]               # The last entry is the episode still being built
+        self.episode_object_locations = [[]]
+        self.episode_iterations = []
+        self.iteration_id = 0
+        self.row_count = 0
+        self.taken_episode_count = 0
+
+    def add_rows(self, episodes: list[int], steps: list[int], job_completed: list[bool], object_locations: list,
+                 iteration_markers: list[int]):
+        # Iteration markers are the row counts at which each evaluation phase finished
+        first_row = self.row_count
+        next_marker = 0
+
+        for row, (episode, step, completed) in enumerate(zip(episodes, steps, job_completed), first_row):
+            while next_marker < len(iteration_markers) and iteration_markers[next_marker] <= row:
+                self._end_iteration()
+                next_marker += 1
+
+            for (r, r_completed) in self.reorder_buffer.add(episode, step, completed, (row, completed)):
+                self.episode_rows[-1].append(r)
+                if r_completed:
+                    self.episode_rows.append([])
+                    self.episode_object_locations.append([])
+
+                if r == row and object_locations[row - first_row] and not self.episode_object_locations[-1]:
+                    self.episode_object_locations[-1] = object_locations[row - first_row]
+
+        for _ in iteration_markers[next_marker:]:
+            self._end_iteration()
+
+        self.row_count += len(episodes)
+
+    def take_completed_episodes(self):
+        # Returns and forgets the rows, object locations and iteration of every episode completed so far
+        completed_count = len(self.episode_rows) - 1
+        while completed_count > len(self.episode_iterations):
+            self.episode_iterations.append(self.iteration_id)
+
+        episode_rows = self.episode_rows[:completed_count]
+        episode_object_locations = self.episode_object_locations[:completed_count]
+        episode_iterations = self.episode_iterations[:completed_count]
+
+        self.episode_rows = self.episode_rows[completed_count:]
+        self.episode_object_locations = self.episode_object_locations[completed_count:]
+        self.episode_iterations = self.episode_iterations[completed_count:]
+        self.taken_episode_count += completed_count
+
+        return episode_rows, episode_object_locations, episode_iterations
+
+    def get_first_needed_row(self):
+        # Rows before this one will never be part of a future episode
+        needed_rows = self.episode_rows[-1] + [row for (row, _) in self.reorder_buffer.get_waiting_items()]
+        if needed_rows:
+            return min(needed_rows)
+        else:
+            return self.row_count
+
+    #
+    # PRIVATE implementation
+    #
+
+    def _end_iteration(self):
+        while len(self.episode_rows) - 1 > len(self.episode_iterations):  # Minus 1 avoids counting next (empty) one
+            self.episode_iterations.append(self.iteration_id)
+        self.iteration_id += 1
@@ -43,6 +43,7 @@ from src.graphics.track_graphics import TrackGraphics
 from src.log.log import Log
 from src.main.version import VERSION
 from src.main.view_manager import ViewManager
+from src.personalize.configuration.analysis import COMPLETE_ANALYSIS_IN_BACKGROUND
 from src.tracks.tracks import get_all_tracks
 from src.ui.menu_bar import MenuBar
 from src.ui.please_wait import PleaseWait
@@ -54,6 +55,8 @@ from src.utils.reward_percentiles import RewardPercentiles
 DEFAULT_CANVAS_WIDTH = 900
 DEFAULT_CANVAS_HEIGHT = 650
 
+FOLLOW_POLL_MILLISECONDS = 5000
+
 
 class MainApp(tk.Frame):
     def __init__(self, root):
@@ -78,6 +81,7 @@ class MainApp(tk.Frame):
 
         self.log = None
         self.filtered_episodes = None
+        self._follow_poll_id = None
 
         self.episode_filter = EpisodeFilter()
         self.view_manager = ViewManager()
@@ -219,6 +223,7 @@ class MainApp(tk.Frame):
         #
 
         self.already_drawing = False
+        self.redraw_again = False
         self.update()
 
 
@@ -249,6 +254,9 @@ class MainApp(tk.Frame):
         self.please_wait = self.please_wait_graph
 
     def menu_callback_switch_track(self, new_track):
+        self._stop_following_file()
+        if self.log:
+            self.log.stop_background_analysis()
         self.log = None
         self.filtered_episodes = None
 
@@ -373,14 +381,17 @@ class MainApp(tk.Frame):
             self._config_manager.set_log_directory(result)
             self.menu_bar.refresh()
 
-    def callback_open_this_file(self, file_name):
+    def callback_open_this_file(self, file_name, follow=False):
 
         redraw_menu_afterwards = not self.log
+        self._stop_following_file()
+        if self.log:
+            self.log.stop_background_analysis()
 
         self.log = Log(self._config_manager.get_log_directory())
         self.log.load_all(file_name, self.please_wait, self.current_track,
                           self._config_manager.get_calculate_new_reward(),
-                          self._config_manager.get_calculate_alternate_discount_factors())
+                          self._config_manager.get_calculate_alternate_discount_factors(), follow)
 
         self.status_frame.change_model_name(self.log.get_log_meta().model_name)
         self.apply_new_action_space()
@@ -402,6 +413,47 @@ class MainApp(tk.Frame):
             self.menu_bar = MenuBar(root, self, True, self.log.get_log_meta().action_space.is_continuous())
             self.update()
 
+        if COMPLETE_ANALYSIS_IN_BACKGROUND:
+            self.log.start_background_analysis()
+
+    def menu_callback_follow_file_on(self):
+        if self.log and self.log.can_follow() and self._follow_poll_id is None:
+            if not self.log.is_following():
+                # Have to re-load from the text so parsing can carry on from exactly where it stops
+                self.callback_open_this_file(self.log.get_meta_file_name(), True)
+            self._follow_poll_id = self.after(FOLLOW_POLL_MILLISECONDS, self._poll_followed_file)
+
+    def menu_callback_follow_file_off(self):
+        self._stop_following_file()
+
+    def _stop_following_file(self):
+        if self._follow_poll_id is not None:
+            self.after_cancel(self._follow_poll_id)
+            self._follow_poll_id = None
+
+    def _poll_followed_file(self):
+        if self.log.has_been_replaced():
+            # Start again from the beginning, which also carries on following the new log
+            self._follow_poll_id = None
+            self.callback_open_this_file(self.log.get_meta_file_name(), True)
+        elif self.log.has_grown():
+            self.please_wait.start("Following")
+            new_episodes = self.log.follow(self.please_wait)
+            if new_episodes:
+                self._add_followed_episodes(new_episodes)
+            else:
+                self.please_wait.stop()
+        self._follow_poll_id = self.after(FOLLOW_POLL_MILLISECONDS, self._poll_followed_file)
+
+    def _add_followed_episodes(self, new_episodes):
+        reward_percentiles = RewardPercentiles(self.log.get_episodes(), self._config_manager.get_calculate_new_reward())
+        for v in self.all_analyzers:
+            v.set_all_episodes(self.log.get_episodes(), reward_percentiles, new_episodes)
+
+        self.episode_selector.set_all_episodes(self.log.get_episodes())
+        self.episode_filter.set_all_episodes(self.log.get_episodes())
+        self.reapply_episode_filter()
+
     def apply_new_action_space(self):
         self.action_space_filter.set_new_action_space(self.log.get_log_meta().action_space)
         for v in self.all_analyzers:
@@ -433,14 +485,23 @@ class MainApp(tk.Frame):
     def redraw(self, event=None):
         if not self.already_drawing:   # Nasty workaround to avoid multiple calls due to "please wait"
             self.already_drawing = True
+            self.redraw_again = False
             self.view_manager.redraw(self.current_track, self.track_graphics, self.analyzer, self.background_analyzer, self.episode_filter)
             self.please_wait.stop()
             self.already_drawing = False
 
+            # Anything that asked for a redraw meanwhile (e.g. a button, or a background calculation that finished)
+            # might have changed what to draw, so it gets its redraw once this one is done
+            if self.redraw_again:
+                self.after_idle(self.redraw)
+        else:
+            self.redraw_again = True
+
     def refresh_analysis_controls(self):
         self.analyzer.take_control()
 
     def close_file(self):
+        self._stop_following_file()
         self.log = None
         self.filtered_episodes = None
         self.status_frame.reset()
@@ -713,6 +774,8 @@ class MainApp(tk.Frame):
 
 
 
-root = tk.Tk()
-app = MainApp(root)
-app.mainloop()
\ No newline at end of file
+# Guard is needed so that worker processes (e.g. for importing logs) do not open another main window
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = MainApp(root)
+    app.mainloop()
\ No newline at end of file
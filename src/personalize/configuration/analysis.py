@@ -14,3 +14,12 @@ DISCOUNT_FACTORS = [0.999, 0.99, 0.97, 0.95, 0.9]
 DISCOUNT_FACTOR_MAX_STEPS = 300
 
 TIME_BEFORE_FIRST_STEP = 0.2
+
+# Otherwise the expensive parts of the analysis of each episode are only done when something first wants them
+COMPLETE_ANALYSIS_IN_BACKGROUND = True
+
+# Percentiles of rewards are exact, unless this is set (e.g. to 2000) to estimate them in bounded memory instead
+REWARD_PERCENTILES_SKETCH_SIZE = None
+
+# Heat maps that have been calculated are kept, most recently used first, up to this many megabytes
+HEAT_MAP_CACHE_MEGABYTES = 256
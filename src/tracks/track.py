@@ -6,11 +6,14 @@
 # Copyright (c) 2021 dmh23
 #
 
+import numpy as np
+
 import src.utils.geometry as geometry
 from src.analyze.util.heatmap import HeatMap
 from src.analyze.util.visitor import VisitorMap
 from src.configuration.real_world import VEHICLE_LENGTH, VEHICLE_WIDTH, BOX_OBSTACLE_WIDTH, BOX_OBSTACLE_LENGTH
 from src.graphics.track_graphics import TrackGraphics
+from src.utils.point_grid import PointGrid
 from src.utils.types import Point
 
 DISPLAY_BORDER = 0.3
@@ -45,6 +48,10 @@ class Track:
     def get_all_waypoints(self):
         return self._track_waypoints
 
+    def get_all_waypoints_as_tuple(self):
+        # The same waypoints, which can be shared by the reward input params of every step since they are immutable
+        return self._all_waypoints_tuple
+
     def get_track_bearing_at_point(self, point):
         closest_waypoint = self._get_closest_waypoint_id(point)
         (before_waypoint, after_waypoint) = self.get_waypoint_ids_before_and_after(point, closest_waypoint)
@@ -101,6 +108,8 @@ class Track:
         self._process_raw_waypoints()
         self._calculate_distances()
         self._calculate_range_of_coordinates()
+        self._prepare_waypoint_arrays()
+        self._all_waypoints_tuple = tuple(tuple(w) for w in self._track_waypoints)
 
         self._is_ready = True
 
@@ -170,7 +179,7 @@ class Track:
 
     def draw_annotations(self, track_graphics: TrackGraphics):
         for a in self._annotations:
-            a.draw(track_graphics, self._drawing_points, self._track_width)
+            a.draw(track_graphics, self._drawing_points, self._track_width / 2)
 
     def draw_grid(self, track_graphics: TrackGraphics, colour: str):
         x = self._min_x
@@ -289,10 +298,73 @@ class Track:
         else:
             return previous_id, closest_waypoint_id
 
+    def get_positions_of_points_on_track(self, x: np.ndarray, y: np.ndarray, closest_waypoint_ids: np.ndarray):
+        # For a whole array of points at once, returns arrays of the side of the track (as given by
+        # get_position_of_point_relative_to_waypoint), the distance from the centre line, and the waypoint ids
+        # before and after each point (as given by get_waypoint_ids_before_and_after)
+        ids = closest_waypoint_ids
+        left_distance = geometry.get_distances_between_points(x, y, self._left_x[ids], self._left_y[ids])
+        right_distance = geometry.get_distances_between_points(x, y, self._right_x[ids], self._right_y[ids])
+        sides = np.where(np.abs(left_distance - right_distance) < 0.001, "C",
+                         np.where(left_distance < right_distance, "L", "R"))
+
+        # The centre line is towards whichever of the next or previous different waypoints is nearer
+        next_ids = self._next_different_waypoint_ids[ids]
+        previous_ids = self._previous_different_waypoint_ids[ids]
+        is_next_nearer = (self._get_distances_to_waypoints(x, y, next_ids) <
+                          self._get_distances_to_waypoints(x, y, previous_ids))
+        line_ids = np.where(is_next_nearer, next_ids, previous_ids)
+        distances_from_centre = geometry.get_distances_of_points_from_lines(
+            x, y, self._waypoints_x[ids], self._waypoints_y[ids],
+            self._waypoints_x[line_ids], self._waypoints_y[line_ids])
+
+        (before_ids, after_ids) = self.get_waypoint_ids_before_and_after_points(x, y, ids)
+
+        return sides, distances_from_centre, before_ids, after_ids
+
+    def get_waypoint_ids_before_and_after_points(self, x: np.ndarray, y: np.ndarray, closest_waypoint_ids: np.ndarray,
+                                                 prefer_forwards=False):
+        # The same as get_waypoint_ids_before_and_after() for a whole array of points at once
+        ids = closest_waypoint_ids
+        previous_ids = self._previous_waypoint_ids[ids]
+        next_ids = self._next_waypoint_ids[ids]
+
+        previous_ratio = self._get_ratios_of_distances_to_waypoints(x, y, previous_ids,
+                                                                    self._distances_to_previous_waypoint[ids])
+        next_ratio = self._get_ratios_of_distances_to_waypoints(x, y, next_ids, self._distances_to_next_waypoint[ids])
+
+        if prefer_forwards:   # Make the behind waypoint appear 5% further away
+            previous_ratio *= 1.05
+
+        is_next_further_ahead = previous_ratio > next_ratio
+        return np.where(is_next_further_ahead, ids, previous_ids), np.where(is_next_further_ahead, next_ids, ids)
+
+    def get_bearings_to_next_waypoints(self, waypoint_ids: np.ndarray) -> np.ndarray:
+        # The same bearings as get_bearing_and_distance_to_next_waypoint() for a whole array of waypoints at once
+        return self._bearings_to_next_waypoint[waypoint_ids]
+
     def get_projected_distance_on_track(self, point: Point, heading: float, closest_waypoint_id: int,
                                         path_width: float = 0.0,
                                         blocked_left_waypoints=None, blocked_right_waypoints=None,
                                         blocked_left_object_locations=None, blocked_right_object_locations=None):
+        (x, y) = point
+        distance = self.get_projected_distances_on_track(np.array([x]), np.array([y]), np.array([heading]),
+                                                         np.array([closest_waypoint_id]), path_width,
+                                                         blocked_left_waypoints, blocked_right_waypoints,
+                                                         blocked_left_object_locations,
+                                                         blocked_right_object_locations)[0]
+        if np.isnan(distance):
+            return None
+        else:
+            return float(distance)
+
+    def get_projected_distances_on_track(self, x: np.ndarray, y: np.ndarray, headings: np.ndarray,
+                                         closest_waypoint_ids: np.ndarray, path_width: float = 0.0,
+                                         blocked_left_waypoints=None, blocked_right_waypoints=None,
+                                         blocked_left_object_locations=None, blocked_right_object_locations=None):
+        # The distance along each of a whole array of rays (i.e. a point and a heading) before going off track or
+        # hitting an object, or NaN if a ray never does. With a path width, it's the shortest of three parallel rays
+        # along the middle and the sides of the path
         if blocked_left_waypoints is None:
             blocked_left_waypoints = []
             blocked_left_object_locations = []
@@ -300,44 +372,35 @@ class Track:
             blocked_right_waypoints = []
             blocked_right_object_locations = []
 
-        heading = geometry.get_angle_in_proper_range(heading)
+        (object_at_drawing_point, object_box_sides) = self._get_blocking_objects(
+            blocked_left_waypoints, blocked_right_waypoints,
+            blocked_left_object_locations, blocked_right_object_locations)
+
+        headings = geometry.get_angles_in_proper_range(np.asarray(headings, dtype=float))
 
         if path_width > 0.0:
-            side_point_1 = geometry.get_point_at_bearing(point, heading + 90, path_width / 2)
-            side_point_2 = geometry.get_point_at_bearing(point, heading - 90, path_width / 2)
-
-            d1 = self.get_projected_distance_on_track(point, heading, closest_waypoint_id, 0.0,
-                                                      blocked_left_waypoints, blocked_right_waypoints,
-                                                      blocked_left_object_locations, blocked_right_object_locations)
-            d2 = self.get_projected_distance_on_track(side_point_1, heading, closest_waypoint_id, 0.0,
-                                                      blocked_left_waypoints, blocked_right_waypoints,
-                                                      blocked_left_object_locations, blocked_right_object_locations)
-            d3 = self.get_projected_distance_on_track(side_point_2, heading, closest_waypoint_id, 0.0,
-                                                      blocked_left_waypoints, blocked_right_waypoints,
-                                                      blocked_left_object_locations, blocked_right_object_locations)
-            return min(d1, d2, d3)
-
-        before_waypoint_id, after_waypoint_id = self.get_waypoint_ids_before_and_after(point, closest_waypoint_id, True)
-
-        previous_left = self._drawing_points[before_waypoint_id].left_safe
-        previous_right = self._drawing_points[before_waypoint_id].right_safe
-
-        for w in self._drawing_points[after_waypoint_id:] + self._drawing_points[:after_waypoint_id]:
-            off_track_distance = self._get_off_track_distance(point, heading, previous_left, previous_right, w)
-            hit_object_distance = self._get_hit_object_distance(point, heading,
-                                                                blocked_left_waypoints, blocked_right_waypoints,
-                                                                blocked_left_object_locations,
-                                                                blocked_right_object_locations, w)
-
-            if off_track_distance is None and hit_object_distance is None:
-                previous_left = w.left_safe
-                previous_right = w.right_safe
-            elif off_track_distance is None:
-                return hit_object_distance
-            elif hit_object_distance is None:
-                return off_track_distance
-            else:
-                return min(hit_object_distance, off_track_distance)
+            side_points_1 = [geometry.get_point_at_bearing(p, h + 90, path_width / 2)
+                             for p, h in zip(zip(x.tolist(), y.tolist()), headings.tolist())]
+            side_points_2 = [geometry.get_point_at_bearing(p, h - 90, path_width / 2)
+                             for p, h in zip(zip(x.tolist(), y.tolist()), headings.tolist())]
+
+            # Put in range again, exactly as when each ray was done by itself, which swaps 180 and -180
+            headings = geometry.get_angles_in_proper_range(headings)
+
+            d1 = self._get_projected_distances(x, y, headings, closest_waypoint_ids,
+                                               object_at_drawing_point, object_box_sides)
+            d2 = self._get_projected_distances(np.array([p[0] for p in side_points_1]),
+                                               np.array([p[1] for p in side_points_1]),
+                                               headings, closest_waypoint_ids,
+                                               object_at_drawing_point, object_box_sides)
+            d3 = self._get_projected_distances(np.array([p[0] for p in side_points_2]),
+                                               np.array([p[1] for p in side_points_2]),
+                                               headings, closest_waypoint_ids,
+                                               object_at_drawing_point, object_box_sides)
+            return np.minimum(np.minimum(d1, d2), d3)
+        else:
+            return self._get_projected_distances(x, y, headings, closest_waypoint_ids,
+                                                 object_at_drawing_point, object_box_sides)
 
     def get_sector_coordinates(self, sector: str):
         start, finish = self.get_sector_start_and_finish(sector)
@@ -358,19 +421,12 @@ class Track:
         return x1, y1, x2, y2
 
     def get_closest_waypoint_id(self, point: Point):
-        best_distance = geometry.get_distance_between_points(point, self._drawing_points[0].middle)
-        best_waypoint = 0
+        # The closest of the left, right and middle points of each waypoint, choosing the lowest id in a tie
+        return self._edges_and_middles_grid.get_nearest_id(point)
 
-        for i, p in enumerate(self._drawing_points):
-            distance = min(
-                geometry.get_distance_between_points(point, p.left),
-                geometry.get_distance_between_points(point, p.right),
-                geometry.get_distance_between_points(point, p.middle))
-            if distance < best_distance:
-                best_distance = distance
-                best_waypoint = i
-
-        return best_waypoint
+    def get_closest_waypoint_ids(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        # The same as get_closest_waypoint_id() for a whole array of points
+        return self._edges_and_middles_grid.get_nearest_ids(x, y)
 
     def get_bearing_at_waypoint(self, waypoint_id):
         previous_point = self._track_waypoints[self._get_previous_different_waypoint_id(waypoint_id)]
@@ -427,6 +483,31 @@ class Track:
         self._mid_x = 0.0
         self._mid_y = 0.0
 
+        # Arrays indexed by waypoint id (see _prepare_waypoint_arrays)
+        self._waypoints_x = None
+        self._waypoints_y = None
+        self._left_x = None
+        self._left_y = None
+        self._right_x = None
+        self._right_y = None
+        self._previous_waypoint_ids = None
+        self._next_waypoint_ids = None
+        self._previous_different_waypoint_ids = None
+        self._next_different_waypoint_ids = None
+        self._distances_to_previous_waypoint = None
+        self._distances_to_next_waypoint = None
+        self._bearings_to_next_waypoint = None
+        self._left_safe_x = None
+        self._left_safe_y = None
+        self._right_safe_x = None
+        self._right_safe_y = None
+
+        # Grids for finding the closest waypoint to a point quickly
+        self._waypoints_grid = None
+        self._edges_and_middles_grid = None
+
+        self._all_waypoints_tuple = None
+
         self._is_ready = False
 
     def _assert_sensible_info(self):
@@ -540,6 +621,57 @@ class Track:
             self._min_y = min(self._min_y, y1, y2, y3)
             self._max_y = max(self._max_y, y1, y2, y3)
 
+    def _prepare_waypoint_arrays(self):
+        # Tables indexed by waypoint id, for calculations on whole arrays of points at once. Anything that involves
+        # more than simple arithmetic (e.g. a bearing) is calculated here by the same code as for a single point,
+        # so the results are exactly the same either way
+        waypoint_ids = range(len(self._track_waypoints))
+        drawing_points = self._drawing_points[:len(self._track_waypoints)]
+
+        self._waypoints_x = np.array([x for (x, _) in self._track_waypoints])
+        self._waypoints_y = np.array([y for (_, y) in self._track_waypoints])
+        self._left_x = np.array([p.left[0] for p in drawing_points])
+        self._left_y = np.array([p.left[1] for p in drawing_points])
+        self._right_x = np.array([p.right[0] for p in drawing_points])
+        self._right_y = np.array([p.right[1] for p in drawing_points])
+
+        self._previous_waypoint_ids = np.array([self._get_previous_waypoint_id(w) for w in waypoint_ids])
+        self._next_waypoint_ids = np.array([self._get_next_waypoint_id(w) for w in waypoint_ids])
+        self._previous_different_waypoint_ids = np.array([self._get_previous_different_waypoint_id(w)
+                                                          for w in waypoint_ids])
+        self._next_different_waypoint_ids = np.array([self._get_next_different_waypoint_id(w) for w in waypoint_ids])
+
+        self._distances_to_previous_waypoint = np.array([
+            geometry.get_distance_between_points(p.middle, drawing_points[self._get_previous_waypoint_id(w)].middle)
+            for w, p in enumerate(drawing_points)])
+        self._distances_to_next_waypoint = np.array([
+            geometry.get_distance_between_points(p.middle, drawing_points[self._get_next_waypoint_id(w)].middle)
+            for w, p in enumerate(drawing_points)])
+        self._bearings_to_next_waypoint = np.array([self.get_bearing_and_distance_to_next_waypoint(w)[0]
+                                                    for w in waypoint_ids])
+
+        # Indexed by drawing point instead, of which there is one more than waypoints, to complete the loop
+        self._left_safe_x = np.array([p.left_safe[0] for p in self._drawing_points])
+        self._left_safe_y = np.array([p.left_safe[1] for p in self._drawing_points])
+        self._right_safe_x = np.array([p.right_safe[0] for p in self._drawing_points])
+        self._right_safe_y = np.array([p.right_safe[1] for p in self._drawing_points])
+
+        # The cells are about as wide as the track, so the closest waypoint is nearly always within a cell or two
+        self._waypoints_grid = PointGrid(self._track_waypoints, list(waypoint_ids), self._track_width / 2)
+        self._edges_and_middles_grid = PointGrid(
+            [point for p in self._drawing_points for point in (p.left, p.right, p.middle)],
+            [p.id for p in self._drawing_points for _ in range(3)], self._track_width / 2)
+
+    def _get_distances_to_waypoints(self, x: np.ndarray, y: np.ndarray, waypoint_ids: np.ndarray):
+        return geometry.get_distances_between_points(x, y, self._waypoints_x[waypoint_ids],
+                                                     self._waypoints_y[waypoint_ids])
+
+    def _get_ratios_of_distances_to_waypoints(self, x: np.ndarray, y: np.ndarray, waypoint_ids: np.ndarray,
+                                              target_distances: np.ndarray):
+        distances = self._get_distances_to_waypoints(x, y, waypoint_ids)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(target_distances == 0.0, 99999.0, distances / target_distances)
+
     def _get_next_waypoint_id(self, waypoint_id):
         if waypoint_id >= len(self._track_waypoints) - 1:
             return 0
@@ -567,14 +699,8 @@ class Track:
         return previous_waypoint_id
 
     def _get_closest_waypoint_id(self, point):
-        distance = geometry.get_distance_between_points(self._track_waypoints[0], point)
-        closest_id = 0
-        for i, w in enumerate(self._track_waypoints[1:]):
-            new_distance = geometry.get_distance_between_points(w, point)
-            if new_distance < distance:
-                distance = new_distance
-                closest_id = i + 1
-        return closest_id
+        # The closest of just the waypoints themselves, choosing the lowest id in a tie
+        return self._waypoints_grid.get_nearest_id(point)
 
     def _is_vertical_at_waypoint(self, waypoint_id: int):
         bearing = self.get_bearing_at_waypoint(waypoint_id)
@@ -584,75 +710,121 @@ class Track:
     def _get_sector_name(sector_id: int):
         return chr(ord("A") + sector_id)
 
-    @staticmethod
-    def _get_off_track_distance(point: Point, heading: float, previous_left, previous_right, drawing_point):
-        left_safe = drawing_point.left_safe
-        right_safe = drawing_point.right_safe
-
-        direction_to_left_target = geometry.get_bearing_between_points(point, left_safe)
-        direction_to_right_target = geometry.get_bearing_between_points(point, right_safe)
-
-        relative_direction_to_left_target = geometry.get_turn_between_directions(heading, direction_to_left_target)
-        relative_direction_to_right_target = geometry.get_turn_between_directions(heading, direction_to_right_target)
-
-        if relative_direction_to_left_target >= 0 and relative_direction_to_right_target <= 0:
-            return None
-        else:
-            point2 = geometry.get_point_at_bearing(point, heading, 1)  # Just some random distance (1m)
-            if left_safe == previous_left:
-                off_track_left = previous_left
-            else:
-                off_track_left = geometry.get_intersection_of_two_lines(point, point2, left_safe, previous_left)
-            if right_safe == previous_right:
-                off_track_right = previous_right
-            else:
-                off_track_right = geometry.get_intersection_of_two_lines(point, point2, right_safe, previous_right)
-
-            left_bearing = geometry.get_bearing_between_points(point, off_track_left)
-            right_bearing = geometry.get_bearing_between_points(point, off_track_right)
-
-            distances = []
-            if abs(geometry.get_turn_between_directions(left_bearing, heading)) < 1:
-                if geometry.is_point_between(off_track_left, left_safe, previous_left):
-                    distances += [geometry.get_distance_between_points(point, off_track_left)]
-            if abs(geometry.get_turn_between_directions(right_bearing, heading)) < 1:
-                if geometry.is_point_between(off_track_right, right_safe, previous_right):
-                    distances += [geometry.get_distance_between_points(point, off_track_right)]
-
-            if len(distances) > 0:
-                return max(distances)
-            else:
-                return 0.0
+    def _get_projected_distances(self, x: np.ndarray, y: np.ndarray, headings: np.ndarray,
+                                 closest_waypoint_ids: np.ndarray,
+                                 object_at_drawing_point: np.ndarray, object_box_sides: list):
+        # Each ray is followed past one drawing point after another, starting from the one ahead of it, until it
+        # passes outside the safe edges of the track or there is an object to hit there. Rays are followed together
+        # in blocks of drawing points, with each block twice as long as the last, until every ray has stopped
+        (before_ids, after_ids) = self.get_waypoint_ids_before_and_after_points(x, y, closest_waypoint_ids, True)
+
+        # A second point 1m along each ray defines its line, exactly as for a single ray
+        second_points = [geometry.get_point_at_bearing(p, h, 1)
+                         for p, h in zip(zip(x.tolist(), y.tolist()), headings.tolist())]
+        second_x = np.array([p[0] for p in second_points])
+        second_y = np.array([p[1] for p in second_points])
+
+        # The distance to hit each object, whichever drawing point it is at, plus a last column of NaN for no object
+        hit_object_distances = np.column_stack([
+            self._get_hit_object_distances(x, y, headings, second_x, second_y, object_box_sides),
+            np.full(len(x), np.nan)])
+
+        distances = np.full(len(x), np.nan)
+        rays = np.arange(len(x))
+        drawing_point_count = len(self._drawing_points)
+        start = 0
+        block_length = 8
+        while len(rays) > 0 and start < drawing_point_count:
+            finish = min(start + block_length, drawing_point_count)
+            drawing_ids = (after_ids[rays, np.newaxis] + np.arange(start, finish)) % drawing_point_count
+            previous_ids = (drawing_ids - 1) % drawing_point_count
+            if start == 0:
+                previous_ids[:, 0] = before_ids[rays]
+
+            is_off_track = ~self._are_within_safe_edges(x[rays, np.newaxis], y[rays, np.newaxis],
+                                                        headings[rays, np.newaxis], drawing_ids)
+            hit_distances = hit_object_distances[rays[:, np.newaxis], object_at_drawing_point[drawing_ids]]
+
+            is_stopped = is_off_track | ~np.isnan(hit_distances)
+            has_stopped = is_stopped.any(axis=1)
+            stopped = (np.flatnonzero(has_stopped), is_stopped.argmax(axis=1)[has_stopped])
+            stopped_rays = rays[has_stopped]
+
+            # How far to going off track is only needed where each ray stopped
+            off_track_distances = np.where(
+                is_off_track[stopped],
+                self._get_off_track_distances(x[stopped_rays], y[stopped_rays], headings[stopped_rays],
+                                              second_x[stopped_rays], second_y[stopped_rays],
+                                              drawing_ids[stopped], previous_ids[stopped]),
+                np.nan)
+            distances[stopped_rays] = np.fmin(off_track_distances, hit_distances[stopped])
+
+            rays = rays[~has_stopped]
+            start = finish
+            block_length *= 2
+
+        return distances
+
+    def _are_within_safe_edges(self, x, y, headings, drawing_ids: np.ndarray):
+        # Whether each ray passes between the left and right safe edges at these drawing points
+        relative_direction_to_left = geometry.get_turns_between_directions(
+            headings, geometry.get_bearings_between_points(x, y, self._left_safe_x[drawing_ids],
+                                                           self._left_safe_y[drawing_ids]))
+        relative_direction_to_right = geometry.get_turns_between_directions(
+            headings, geometry.get_bearings_between_points(x, y, self._right_safe_x[drawing_ids],
+                                                           self._right_safe_y[drawing_ids]))
+        return (relative_direction_to_left >= 0) & (relative_direction_to_right <= 0)
+
+    def _get_off_track_distances(self, x, y, headings, second_x, second_y,
+                                 drawing_ids: np.ndarray, previous_ids: np.ndarray):
+        # The distance to where each ray crossed a safe edge between the previous drawing point and this one, or
+        # zero if it did not cross either of them there
+        left_distances = self._get_distances_to_edge(x, y, headings, second_x, second_y,
+                                                     self._left_safe_x[drawing_ids], self._left_safe_y[drawing_ids],
+                                                     self._left_safe_x[previous_ids], self._left_safe_y[previous_ids])
+        right_distances = self._get_distances_to_edge(x, y, headings, second_x, second_y,
+                                                      self._right_safe_x[drawing_ids], self._right_safe_y[drawing_ids],
+                                                      self._right_safe_x[previous_ids],
+                                                      self._right_safe_y[previous_ids])
+        distances = np.fmax(left_distances, right_distances)
+
+        return np.where(np.isnan(distances), 0.0, distances)
 
     @staticmethod
-    def _get_object_location_at_waypoint(waypoint_id: int, blocked_left, blocked_right,
-                                         blocked_left_object_locations, blocked_right_object_locations):
-        if waypoint_id in blocked_left:
-            return blocked_left_object_locations[blocked_left.index(waypoint_id)]
-        if waypoint_id in blocked_right:
-            return blocked_right_object_locations[blocked_right.index(waypoint_id)]
-        return None
-
-    def _get_hit_object_distance(self, point: Point, heading: float, blocked_left, blocked_right,
-                                 blocked_left_object_locations, blocked_right_object_locations, drawing_point):
-
-        obj_middle = self._get_object_location_at_waypoint(drawing_point.id, blocked_left, blocked_right,
-                                                           blocked_left_object_locations,
-                                                           blocked_right_object_locations)
-        if obj_middle is None:
-            wp = self._get_previous_waypoint_id(drawing_point.id)
-            obj_middle = self._get_object_location_at_waypoint(wp, blocked_left, blocked_right,
-                                                               blocked_left_object_locations,
-                                                               blocked_right_object_locations)
-        if obj_middle is None:
-            wp = self._get_next_waypoint_id(drawing_point.id)
-            obj_middle = self._get_object_location_at_waypoint(wp, blocked_left, blocked_right,
-                                                               blocked_left_object_locations,
-                                                               blocked_right_object_locations)
-        if obj_middle is None:
-            return None
-
-        point2 = geometry.get_point_at_bearing(point, heading, 1)  # Just some random distance (1m) to define line
+    def _get_distances_to_edge(x, y, headings, second_x, second_y, edge_x, edge_y, previous_x, previous_y):
+        # NaN unless the ray crosses the edge between the previous drawing point and this one, ahead of it
+        is_same_point = (edge_x == previous_x) & (edge_y == previous_y)
+        (crossing_x, crossing_y) = geometry.get_intersections_of_two_lines(x, y, second_x, second_y,
+                                                                           edge_x, edge_y, previous_x, previous_y)
+        crossing_x = np.where(is_same_point, previous_x, crossing_x)
+        crossing_y = np.where(is_same_point, previous_y, crossing_y)
+
+        crossing_bearing = geometry.get_bearings_between_points(x, y, crossing_x, crossing_y)
+        is_crossed = ((np.abs(geometry.get_turns_between_directions(crossing_bearing, headings)) < 1) &
+                      geometry.are_points_between(crossing_x, crossing_y, edge_x, edge_y, previous_x, previous_y))
+
+        return np.where(is_crossed, geometry.get_distances_between_points(x, y, crossing_x, crossing_y), np.nan)
+
+    def _get_blocking_objects(self, blocked_left, blocked_right,
+                              blocked_left_object_locations, blocked_right_object_locations):
+        # Returns the index of the object that can be hit at each drawing point (or -1 for none) along with the
+        # four sides of the box around each object, which can be hit at the waypoints either side of it too
+        object_locations = blocked_left_object_locations + blocked_right_object_locations
+
+        object_at_drawing_point = np.full(len(self._drawing_points), -1)
+        for p in self._drawing_points:
+            for waypoint_id in [p.id, self._get_previous_waypoint_id(p.id), self._get_next_waypoint_id(p.id)]:
+                if waypoint_id in blocked_left:
+                    object_at_drawing_point[p.id] = blocked_left.index(waypoint_id)
+                    break
+                if waypoint_id in blocked_right:
+                    object_at_drawing_point[p.id] = len(blocked_left) + blocked_right.index(waypoint_id)
+                    break
+
+        object_box_sides = [side for obj_middle in object_locations for side in self._get_object_box_sides(obj_middle)]
+        return object_at_drawing_point, object_box_sides
+
+    def _get_object_box_sides(self, obj_middle: Point):
         track_bearing = self.get_track_bearing_at_point(obj_middle)
         safe_border = min(VEHICLE_WIDTH, VEHICLE_LENGTH) / 3  # Effectively enlarge the box
 
@@ -667,21 +839,31 @@ class Track:
         rear_right = geometry.get_point_at_bearing(rear_middle, track_bearing - 90,
                                                    BOX_OBSTACLE_WIDTH / 2 + safe_border)
 
-        distances = []
-        for box_side in [(front_left, front_right), (rear_left, rear_right),
-                         (front_left, rear_left), (front_right, rear_right)]:
-            (box_point1, box_point2) = box_side
-            hit_point = geometry.get_intersection_of_two_lines(point, point2, box_point1, box_point2)
-            if hit_point is not None and geometry.is_point_between(hit_point, box_point1, box_point2):
-                # Make sure it's in front of us!
-                bearing_to_hit_point = geometry.get_bearing_between_points(point, hit_point)
-                if abs(geometry.get_turn_between_directions(bearing_to_hit_point, heading)) < 1:
-                    distances.append(geometry.get_distance_between_points(point, hit_point))
-
-        if not distances:
-            return None
-        else:
-            return min(distances)
+        return [(front_left, front_right), (rear_left, rear_right), (front_left, rear_left), (front_right, rear_right)]
+
+    @staticmethod
+    def _get_hit_object_distances(x, y, headings, second_x, second_y, object_box_sides: list):
+        # The distance along each ray (in rows) to the nearest side of each object's box (in columns) that is ahead
+        # of it, or NaN if it misses
+        if not object_box_sides:
+            return np.full((len(x), 0), np.nan)
+
+        box_x1 = np.array([p1[0] for (p1, _) in object_box_sides])
+        box_y1 = np.array([p1[1] for (p1, _) in object_box_sides])
+        box_x2 = np.array([p2[0] for (_, p2) in object_box_sides])
+        box_y2 = np.array([p2[1] for (_, p2) in object_box_sides])
+        (x, y, headings) = (x[:, np.newaxis], y[:, np.newaxis], headings[:, np.newaxis])
+        (second_x, second_y) = (second_x[:, np.newaxis], second_y[:, np.newaxis])
+
+        (hit_x, hit_y) = geometry.get_intersections_of_two_lines(x, y, second_x, second_y,
+                                                                 box_x1, box_y1, box_x2, box_y2)
+        bearing_to_hit_point = geometry.get_bearings_between_points(x, y, hit_x, hit_y)
+        is_hit = (~np.isnan(hit_x) &
+                  geometry.are_points_between(hit_x, hit_y, box_x1, box_y1, box_x2, box_y2) &
+                  (np.abs(geometry.get_turns_between_directions(bearing_to_hit_point, headings)) < 1))
+        distances = np.where(is_hit, geometry.get_distances_between_points(x, y, hit_x, hit_y), np.nan)
+
+        return np.fmin.reduce(distances.reshape(len(x), -1, 4), axis=2)
 
     class DrawingPoint:
         def __init__(self, waypoint_id: int, left: Point, middle: Point, right: Point,
@@ -80,6 +80,10 @@ class MenuBar():
         menu.add_command(label="New File(s)", command=self.new_files)
         menu.add_command(label="Open File", command=self.open_file)
         menu.add_command(label="Switch Directory", command=self.main_app.menu_callback_switch_directory)
+        if self._file_is_open:
+            menu.add_separator()
+            menu.add_command(label="Follow File - On", command=self.main_app.menu_callback_follow_file_on)
+            menu.add_command(label="Follow File - Off", command=self.main_app.menu_callback_follow_file_off)
         menu.add_separator()
         menu.add_command(label="Options", command=self.file_options)
         menu.add_separator()
@@ -272,7 +276,8 @@ class MenuBar():
         ActionSpaceFilterDialog(self.main_app)
 
     def refresh_all_log_meta(self):
-        src.log.log_utils.refresh_all_log_meta(self.main_app.please_wait, self.main_app.get_log_directory())
+        src.log.log_utils.refresh_all_log_meta(self.main_app.please_wait, self.main_app.get_log_directory(),
+                                               self.main_app.get_config_manager().get_import_worker_count())
         self.main_app.please_wait.stop()
         messagebox.showinfo("Refresh All Log Meta", "Refresh succeeded!")
         self.refresh()
@@ -34,6 +34,7 @@ class NewFilesDialog(Dialog):
             tk.Label(master, text="No new log files were found").pack()
 
     def apply(self):
-        import_new_logs(self.new_log_files, self.please_wait, self.parent.get_log_directory())
+        import_new_logs(self.new_log_files, self.please_wait, self.parent.get_log_directory(),
+                        self.parent.get_config_manager().get_import_worker_count())
         self.please_wait.stop(0.2)
         tk.messagebox.showinfo("Fetch File", "Import succeeded")
@@ -10,6 +10,7 @@ import tkinter as tk
 
 from src.personalize.configuration.analysis import TIME_BEFORE_FIRST_STEP
 from src.ui.dialog import Dialog
+from src.log.log_index import LogIndexEntry
 from src.log.log_utils import get_model_info_for_open_model_dialog
 
 from src.utils.formatting import get_pretty_whole_percentage, get_pretty_large_integer, get_pretty_hours_and_minutes
@@ -26,14 +27,13 @@ class OpenFileDialog(Dialog):
         all_success_percent = []
 
         show_laps = False
-        for log in model_logs.values():
-            log_meta = log.get_log_meta()
-            if log_meta.episode_stats.average_steps > 0:
-                all_best_times.append(log_meta.episode_stats.best_time + TIME_BEFORE_FIRST_STEP)
-                all_average_times.append(log_meta.episode_stats.average_time + TIME_BEFORE_FIRST_STEP)
+        for log_entry in model_logs.values():
+            if log_entry.episode_stats.average_steps > 0:
+                all_best_times.append(log_entry.episode_stats.best_time + TIME_BEFORE_FIRST_STEP)
+                all_average_times.append(log_entry.episode_stats.average_time + TIME_BEFORE_FIRST_STEP)
                 show_laps = True
-            all_progress_percent.append(self._get_progress_percent(log_meta))
-            all_success_percent.append(self._get_success_percent(log_meta))
+            all_progress_percent.append(self._get_progress_percent(log_entry))
+            all_success_percent.append(self._get_success_percent(log_entry))
 
         if len(all_progress_percent) == 0:
             best_progress_percent = 0.0
@@ -60,30 +60,28 @@ class OpenFileDialog(Dialog):
         row = 1
 
         for model_name in sorted(model_names):
-            log = model_logs[model_name]
+            log_entry = model_logs[model_name]
 
-            callback = lambda file_name=log.get_meta_file_name(): self._callback_open_file(file_name)
+            callback = lambda file_name=log_entry.meta_file_name: self._callback_open_file(file_name)
 
-            log_meta = log.get_log_meta()
+            progress_percent = self._get_progress_percent(log_entry)
+            success_percent = self._get_success_percent(log_entry)
 
-            progress_percent = self._get_progress_percent(log_meta)
-            success_percent = self._get_success_percent(log_meta)
+            self._place_in_grid(row, 0, tk.Button(master, text=log_entry.model_name, command=callback), "E")
+            self._place_in_grid(row, 1, tk.Label(master, text=log_entry.race_type), "E")
+            self._place_in_grid(row, 2, tk.Label(master, text=log_entry.job_type), "E")
 
-            self._place_in_grid(row, 0, tk.Button(master, text=log_meta.model_name, command=callback), "E")
-            self._place_in_grid(row, 1, tk.Label(master, text=log_meta.race_type), "E")
-            self._place_in_grid(row, 2, tk.Label(master, text=log_meta.job_type), "E")
-
-            self._place_in_grid(row, 3, self._make_hours_and_minutes_label(master, log_meta.episode_stats.training_minutes))
-            self._place_in_grid(row, 4, self._make_large_integer_label(master, log_meta.episode_stats.episode_count))
+            self._place_in_grid(row, 3, self._make_hours_and_minutes_label(master, log_entry.episode_stats.training_minutes))
+            self._place_in_grid(row, 4, self._make_large_integer_label(master, log_entry.episode_stats.episode_count))
 
             self._place_in_grid(row, 5, self._make_percent_label(master, progress_percent, best_progress_percent))
             self._place_in_grid(row, 6, self._make_percent_label(master, success_percent, best_success_percent))
             if show_laps:
                 self._place_in_grid(row, 7, self._make_lap_time_label(master,
-                                                                      log_meta.episode_stats.best_time,
+                                                                      log_entry.episode_stats.best_time,
                                                                       best_best_times))
                 self._place_in_grid(row, 8, self._make_lap_time_label(master,
-                                                                      log_meta.episode_stats.average_time,
+                                                                      log_entry.episode_stats.average_time,
                                                                       best_average_times))
 
             row += 1
@@ -98,12 +96,12 @@ class OpenFileDialog(Dialog):
                                                                       pady=5, sticky="W")
 
     @staticmethod
-    def _get_progress_percent(log_meta):
-        return log_meta.episode_stats.average_percent_complete
+    def _get_progress_percent(log_entry: LogIndexEntry):
+        return log_entry.episode_stats.average_percent_complete
 
     @staticmethod
-    def _get_success_percent(log_meta):
-        return log_meta.episode_stats.success_count / log_meta.episode_stats.episode_count * 100
+    def _get_success_percent(log_entry: LogIndexEntry):
+        return log_entry.episode_stats.success_count / log_entry.episode_stats.episode_count * 100
 
     @staticmethod
     def _make_percent_label(master, value, best_value):
@@ -9,13 +9,15 @@
 import tkinter as tk
 import time
 
+from src.utils.progress import ProgressReporter
+
 NEARLY_COMPLETE = 99.99
 REDRAW_INTERVAL = 0.15
 SMALL_JUMP = 2
 BIG_JUMP = 25
 
 
-class PleaseWait():
+class PleaseWait(ProgressReporter):
     def __init__(self, root :tk.Frame, canvas :tk.Canvas):
         self.canvas = canvas
         self.root = root
@@ -10,6 +10,7 @@ import math
 from base64 import b16encode
 from enum import IntEnum, auto
 
+import numpy as np
 from matplotlib.colors import Colormap
 from matplotlib.pyplot import get_cmap
 
@@ -50,6 +51,39 @@ def get_color_for_data(data: float, palette: ColorPalette) -> str:
         return _get_color_from_cache(COLOR_CACHE_B, data)
 
 
+def get_color_lookup_table(palette: ColorPalette) -> list:
+    # Every color that get_color_for_data() can give for this palette, in the order of get_color_lookup_indexes()
+    if palette == ColorPalette.GREYS:
+        return [_rgb_color((i, i, i)) for i in range(256)]
+    if palette == ColorPalette.DISCRETE_THREE:
+        return config.DISCRETE_THREE_COLOURS
+    if palette == ColorPalette.DISCRETE_FIVE:
+        return config.DISCRETE_FIVE_COLOURS
+    if palette == ColorPalette.MULTI_COLOR_A:
+        return COLOR_CACHE_A
+    if palette == ColorPalette.MULTI_COLOR_B:
+        return COLOR_CACHE_B
+
+
+def get_color_lookup_indexes(data: np.ndarray, palette: ColorPalette) -> np.ndarray:
+    # The same as get_color_for_data() for a whole array of data, but as the index of each color in
+    # get_color_lookup_table(), or -1 wherever the data is NaN (i.e. there is nothing to draw)
+    is_drawn = ~np.isnan(data)
+    data = np.where(is_drawn, data, 0.0)
+    assert np.all((0.0 <= data) & (data <= 1.0))
+
+    if palette == ColorPalette.GREYS:
+        indexes = np.rint(255 * data)
+    elif palette == ColorPalette.DISCRETE_THREE:
+        indexes = np.minimum(np.floor(data * 3), 2)
+    elif palette == ColorPalette.DISCRETE_FIVE:
+        indexes = np.minimum(np.floor(data * 5), 4)
+    else:
+        indexes = np.rint(data * _CACHE_SIZE)
+
+    return np.where(is_drawn, indexes, -1).astype(int)
+
+
 #
 # PRIVATE implementation
 #
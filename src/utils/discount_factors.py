@@ -7,6 +7,7 @@
 #
 
 import numpy as np
+from scipy.signal import lfilter
 
 from src.personalize.configuration.analysis import DISCOUNT_FACTORS, DISCOUNT_FACTOR_MAX_STEPS
 
@@ -61,6 +62,16 @@ class DiscountFactors:
             else:
                 return value
 
+    def get_discounted_future_rewards_of_episode(self, rewards, multi_discount_factor: bool) -> np.ndarray:
+        # The same values as get_discounted_future_rewards() for rewards[i:] at every step i of an episode, with a
+        # row per step and a column per discount factor (i.e. just one column unless multi_discount_factor)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        factor_count = len(self._discount_factors) if multi_discount_factor else 1
+        discounted_future_rewards = np.empty((len(rewards), factor_count))
+        for i in range(factor_count):
+            discounted_future_rewards[:, i] = self._get_discounted_future_rewards_of_episode(rewards, i)
+        return discounted_future_rewards
+
     def print_for_debug(self):
         for i, m in enumerate(self._multipliers):
             print(self._discount_factors[i], "->", m)
@@ -83,6 +94,18 @@ class DiscountFactors:
 
         return plot_x, plot_y
 
+    def _get_discounted_future_rewards_of_episode(self, rewards: np.ndarray, index: int):
+        # Linear time, by scanning backwards from the end of the episode with future[i] = rewards[i] + df * future[i + 1]
+        # and then taking away whatever is beyond the look ahead of each step, which is df ^ max_steps times the
+        # future reward of the step that many steps later
+        df = self._discount_factors[index]
+        future_rewards = lfilter([1.0], [1.0, -df], rewards[::-1])[::-1]
+        if len(rewards) > self._max_steps:
+            beyond_look_ahead = self._multipliers[index][-1] * df
+            future_rewards[:-self._max_steps] = (future_rewards[:-self._max_steps] -
+                                                 beyond_look_ahead * future_rewards[self._max_steps:])
+        return future_rewards
+
     def _get_steps_for_plot_zoom_level(self, zoom_level: int):
         if zoom_level <= 0:
             return self._max_steps
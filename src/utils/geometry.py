@@ -8,6 +8,8 @@
 
 import math
 
+import numpy as np
+
 from src.utils.types import Point
 
 
@@ -130,3 +132,61 @@ def get_point_at_bearing(start_point, bearing: float, distance: float):
     y2 = y + math.sin(radians_to_target) * distance
 
     return x2, y2
+
+
+# The same calculations as above, for whole arrays of points (or bearings) at once
+
+def get_distances_between_points(first_x: np.ndarray, first_y: np.ndarray,
+                                 second_x: np.ndarray, second_y: np.ndarray) -> np.ndarray:
+    x_diff = second_x - first_x
+    y_diff = second_y - first_y
+
+    return np.sqrt(x_diff * x_diff + y_diff * y_diff)
+
+
+def get_bearings_between_points(start_x: np.ndarray, start_y: np.ndarray,
+                                finish_x: np.ndarray, finish_y: np.ndarray) -> np.ndarray:
+    return np.degrees(np.arctan2(finish_y - start_y, finish_x - start_x))
+
+
+def get_angles_in_proper_range(angles: np.ndarray) -> np.ndarray:
+    return np.where(angles >= 180, angles - 360, np.where(angles <= -180, 360 + angles, angles))
+
+
+def get_turns_between_directions(current: np.ndarray, required: np.ndarray) -> np.ndarray:
+    return get_angles_in_proper_range(required - current)
+
+
+def get_distances_of_points_from_lines(x: np.ndarray, y: np.ndarray, line_a_x: np.ndarray, line_a_y: np.ndarray,
+                                       line_b_x: np.ndarray, line_b_y: np.ndarray) -> np.ndarray:
+    upper_expression = np.abs((line_b_x - line_a_x) * (line_a_y - y) - (line_a_x - x) * (line_b_y - line_a_y))
+    lower_expression = np.sqrt((line_b_x - line_a_x) * (line_b_x - line_a_x) +
+                               (line_b_y - line_a_y) * (line_b_y - line_a_y))
+
+    return upper_expression / lower_expression
+
+
+def get_intersections_of_two_lines(line_a_x1: np.ndarray, line_a_y1: np.ndarray,
+                                   line_a_x2: np.ndarray, line_a_y2: np.ndarray,
+                                   line_b_x1: np.ndarray, line_b_y1: np.ndarray,
+                                   line_b_x2: np.ndarray, line_b_y2: np.ndarray):
+    # NaN where the lines are parallel (i.e. where get_intersection_of_two_lines() returns None)
+    denominator = (((line_a_x1 - line_a_x2) * (line_b_y1 - line_b_y2)) -
+                   ((line_a_y1 - line_a_y2) * (line_b_x1 - line_b_x2)))
+
+    z1 = (line_a_x1 * line_a_y2) - (line_a_y1 * line_a_x2)
+    z2 = (line_b_x1 * line_b_y2) - (line_b_y1 * line_b_x2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = ((z1 * (line_b_x1 - line_b_x2)) - ((line_a_x1 - line_a_x2) * z2)) / denominator
+        y = ((z1 * (line_b_y1 - line_b_y2)) - ((line_a_y1 - line_a_y2) * z2)) / denominator
+
+    is_parallel = denominator == 0.0
+    return np.where(is_parallel, np.nan, x), np.where(is_parallel, np.nan, y)
+
+
+def are_points_between(x: np.ndarray, y: np.ndarray, start_x: np.ndarray, start_y: np.ndarray,
+                       finish_x: np.ndarray, finish_y: np.ndarray) -> np.ndarray:
+    bearing_from_start = get_bearings_between_points(start_x, start_y, x, y)
+    bearing_to_finish = get_bearings_between_points(x, y, finish_x, finish_y)
+    return np.abs(get_turns_between_directions(bearing_from_start, bearing_to_finish)) < 1
@@ -0,0 +1,90 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import math
+
+import numpy as np
+
+ROUNDING_MARGIN = 1e-9   # Allows for a point being put in the cell next to it, due to rounding, when right on an edge
+
+
+class PointGrid:
+    #
+    # PUBLIC interface
+    #
+
+    # A uniform grid of square cells, each holding the points within it, so the nearest point to anywhere is found by
+    # looking in the cells around it, nearest cells first, rather than measuring the distance to every point
+
+    def __init__(self, points: list, ids: list, cell_size: float):
+        # Each point has an id, and several points can share the same id (e.g. the edges of the same waypoint)
+        assert len(points) == len(ids) > 0
+        assert cell_size > 0
+
+        self._cell_size = cell_size
+        self._cells = {}
+        for point, point_id in zip(points, ids):
+            self._cells.setdefault(self._get_cell(point), []).append((point, point_id))
+
+        cell_xs = [x for (x, _) in self._cells.keys()]
+        cell_ys = [y for (_, y) in self._cells.keys()]
+        self._min_cell = (min(cell_xs), min(cell_ys))
+        self._max_cell = (max(cell_xs), max(cell_ys))
+
+    def get_nearest_id(self, point) -> int:
+        # The id of the nearest point, choosing the lowest id in a tie, exactly as a simple scan of every point would
+        (x, y) = point
+        (cell_x, cell_y) = self._get_cell(point)
+        (min_x, min_y) = self._min_cell
+        (max_x, max_y) = self._max_cell
+        last_ring = max(cell_x - min_x, max_x - cell_x, cell_y - min_y, max_y - cell_y)
+
+        best_distance = math.inf
+        best_id = None
+        for ring in range(last_ring + 1):
+            # Every point in a further ring of cells is at least this far away
+            if best_distance < (ring - 1 - ROUNDING_MARGIN) * self._cell_size:
+                break
+            for cell in self._get_ring_of_cells(cell_x, cell_y, ring):
+                for ((p_x, p_y), point_id) in self._cells.get(cell, ()):
+                    # Exactly as get_distance_between_points(), which is too slow to call here
+                    x_diff = p_x - x
+                    y_diff = p_y - y
+                    distance = math.sqrt(x_diff * x_diff + y_diff * y_diff)
+                    if distance < best_distance or (distance == best_distance and point_id < best_id):
+                        best_distance = distance
+                        best_id = point_id
+
+        return best_id
+
+    def get_nearest_ids(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        # The same as get_nearest_id() for a whole array of points
+        return np.array([self.get_nearest_id(point) for point in zip(x.tolist(), y.tolist())], dtype=np.int64)
+
+    #
+    # PRIVATE implementation
+    #
+
+    def _get_cell(self, point):
+        (x, y) = point
+        return math.floor(x / self._cell_size), math.floor(y / self._cell_size)
+
+    @staticmethod
+    def _get_ring_of_cells(cell_x: int, cell_y: int, ring: int):
+        # The cells that are exactly "ring" cells away horizontally and/or vertically
+        if ring == 0:
+            return [(cell_x, cell_y)]
+
+        cells = []
+        for x in range(cell_x - ring, cell_x + ring + 1):
+            cells.append((x, cell_y - ring))
+            cells.append((x, cell_y + ring))
+        for y in range(cell_y - ring + 1, cell_y + ring):
+            cells.append((cell_x - ring, y))
+            cells.append((cell_x + ring, y))
+        return cells
@@ -0,0 +1,14 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import multiprocessing
+
+# Worker processes are always started afresh, as they already are by default on Windows and macOS, rather than forked.
+# A forked process gets a copy of any lock held at that moment by another thread (e.g. the background analysis of a
+# log, or a heat map being calculated) which is then never released, so the worker could deadlock
+PROCESS_CONTEXT = multiprocessing.get_context("spawn")
@@ -0,0 +1,73 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import math
+import time
+
+MAX_TICKS_PER_TASK = 100       # Progress is never reported more often than once per 1% of a task ...
+MAX_TICKS_PER_SECOND = 10      # ... and never more often than this, however quickly the task is going
+
+
+class ProgressReporter:
+    # The callbacks used to report progress of a long task, such as loading a log. This base class reports nothing,
+    # so it can be used as is when there is no UI (e.g. in a worker process or a test), while the UI overrides it
+    # to draw a progress bar (see src.ui.please_wait)
+
+    def start(self, title: str):
+        pass
+
+    def stop(self, pause_seconds: float = 0):
+        pass
+
+    def set_progress(self, percent_done: float):
+        pass
+
+
+class ProgressTicker:
+    #
+    # PUBLIC interface
+    #
+
+    # Maps the amount of a task done so far (bytes read, episodes built etc.) onto a range of percentages, and only
+    # passes it on to the reporter occasionally. The caller keeps the returned threshold and only calls tick() once
+    # the amount done reaches it, so the cost in a tight loop is just one comparison:
+    #
+    #     next_tick = ticker.tick(0)
+    #     for ...
+    #         amount_done += ...
+    #         if amount_done >= next_tick:
+    #             next_tick = ticker.tick(amount_done)
+    #     ticker.finish()
+
+    def __init__(self, reporter: ProgressReporter, min_percent: float, max_percent: float,
+                 total_amount: int, min_step: int = 1):
+        self._reporter = reporter
+        self._min_percent = min_percent
+        self._percent_range = max_percent - min_percent
+        self._total_amount = max(1, total_amount)
+        self._step = max(min_step, math.ceil(self._total_amount / MAX_TICKS_PER_TASK))
+        self._reported_at = None
+
+    def tick(self, amount_done: int) -> int:
+        # Returns the amount to reach before it is worth calling this again
+        now = time.monotonic()
+        if self._reported_at is None or now - self._reported_at >= 1 / MAX_TICKS_PER_SECOND:
+            self._reported_at = now
+            self._report(amount_done)
+        return amount_done + self._step
+
+    def finish(self):
+        self._report(self._total_amount)
+
+    #
+    # PRIVATE implementation
+    #
+
+    def _report(self, amount_done: int):
+        fraction_done = min(1.0, amount_done / self._total_amount)
+        self._reporter.set_progress(self._min_percent + fraction_done * self._percent_range)
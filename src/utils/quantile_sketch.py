@@ -0,0 +1,88 @@
+#
+# DeepRacer Guru
+#
+# Version 3.0 onwards
+#
+# Copyright (c) 2021 dmh23
+#
+
+import numpy as np
+
+
+class QuantileSketch:
+    #
+    # PUBLIC interface
+    #
+
+    # Estimates the quantiles of any number of values in bounded memory, in the style of a KLL sketch. The values are
+    # held in levels, where each value at level h stands for 2^h of the values added. Whenever a level holds more
+    # than "size" values, it is sorted and every other value is promoted to the next level up, so the sketch only
+    # grows with the log of the number of values. Each promotion moves the rank of any value by at most the weight
+    # of that level, so the error in rank is roughly log2(count / size) / size of the count.
+    #
+    # Sketches of different values (e.g. from different logs or worker processes) can be merged, and the result is
+    # just as accurate as a single sketch of all the values
+
+    def __init__(self, size: int):
+        assert size >= 2
+        self._size = size
+        self._levels = [np.empty(0)]
+        self._count = 0
+        self._compactions = 0
+
+    def add(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float).ravel()
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._count += len(values)
+        self._compact()
+
+    def merge(self, other):
+        for level, values in enumerate(other._levels):
+            if level == len(self._levels):
+                self._levels.append(np.empty(0))
+            self._levels[level] = np.concatenate([self._levels[level], values])
+        self._count += other._count
+        self._compact()
+
+    def get_count(self) -> int:
+        return self._count
+
+    def get_percentiles(self, percents: np.ndarray) -> np.ndarray:
+        assert self._count > 0
+
+        # Exactly as np.percentile() until there are too many values to keep them all
+        if len(self._levels) == 1:
+            return np.percentile(self._levels[0], percents)
+
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(v), 2 ** level) for level, v in enumerate(self._levels)])
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        cumulative_weights = np.cumsum(weights[order])
+
+        # The value at the same rank as np.percentile() would use, without interpolating
+        ranks = np.asarray(percents) / 100 * (self._count - 1)
+        return values[np.minimum(np.searchsorted(cumulative_weights, ranks, side="right"), len(values) - 1)]
+
+    #
+    # PRIVATE implementation
+    #
+
+    def _compact(self):
+        level = 0
+        while level < len(self._levels):
+            values = self._levels[level]
+            if len(values) > self._size:
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+
+                # An even number of values are promoted in pairs, alternately keeping the lower or higher of each
+                # pair so that neither end is favoured, and any odd one left over stays at this level
+                values = np.sort(values)
+                paired_count = len(values) - len(values) % 2
+                promoted = values[self._compactions % 2:paired_count:2]
+                self._compactions += 1
+
+                self._levels[level] = values[paired_count:]
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+            level += 1
@@ -7,53 +7,72 @@
 #
 
 from src.episode.episode import Episode
+from src.personalize.configuration.analysis import REWARD_PERCENTILES_SKETCH_SIZE
+from src.utils.quantile_sketch import QuantileSketch
 import numpy as np
 
+PERCENTS = np.arange(100)
 
-class RewardPercentiles:
 
-    def __init__(self, episodes: list[Episode], calculate_new_reward: bool):
-        percents = np.arange(100)
+class RewardPercentiles:
+    #
+    # PUBLIC interface
+    #
 
-        all_rewards = episodes[0].rewards
-        for e in episodes[1:]:
-            all_rewards += e.rewards
-        self._reward_percentiles = np.percentile(np.array(all_rewards), percents)
+    # The percentiles of each measure of reward over every step of all the episodes. These are exact, unless a
+    # sketch size is given, in which case they are estimated from a QuantileSketch of each measure in bounded
+    # memory, and can be merged with the percentiles of other episodes (e.g. from other logs) without the episodes
 
-        all_new_rewards = episodes[0].new_rewards
+    def __init__(self, episodes: list[Episode], calculate_new_reward: bool,
+                 sketch_size: int = REWARD_PERCENTILES_SKETCH_SIZE):
+        column_names = ["reward", "discounted_future_rewards"]
         if calculate_new_reward:
-            for e in episodes[1:]:
-                all_new_rewards += e.new_rewards
-            self._new_reward_percentiles = np.percentile(np.array(all_new_rewards), percents)
-        else:
-            self._new_reward_percentiles = None
+            column_names += ["new_reward", "new_discounted_future_reward"]
 
-        all_new_discounted_future_rewards = episodes[0].new_discounted_future_rewards
-        if calculate_new_reward:
-            for e in episodes[1:]:
-                all_new_discounted_future_rewards += e.new_discounted_future_rewards
-            self._new_discounted_future_reward_percentiles = np.percentile(np.array(all_new_discounted_future_rewards),
-                                                                           percents)
-        else:
-            self._new_discounted_future_reward_percentiles = None
-
-        self._discounted_future_reward_percentiles = []
-        for i in range(len(episodes[0].discounted_future_rewards)):
-            all_discounted_future_rewards = episodes[0].discounted_future_rewards[i]
-            for e in episodes[1:]:
-                all_discounted_future_rewards += e.discounted_future_rewards[i]
-            self._discounted_future_reward_percentiles.append(
-                np.percentile(np.array(all_discounted_future_rewards), percents))
+        self._sketches = {} if sketch_size else None
+        self._percentiles = {}
+        for name in column_names:
+            # One column of values per discount factor, or else just one column
+            values = np.concatenate([e.table.get_column(name) for e in episodes])
+            values = values.reshape(len(values), -1)
+
+            if sketch_size:
+                self._sketches[name] = [QuantileSketch(sketch_size) for _ in range(values.shape[1])]
+                for sketch, sketch_values in zip(self._sketches[name], values.T):
+                    sketch.add(sketch_values)
+            else:
+                self._percentiles[name] = list(np.percentile(values, PERCENTS, axis=0).T)
+
+        if sketch_size:
+            self._set_percentiles_from_sketches()
+
+    def merge(self, other):
+        # Both must have been created with a sketch size, and for the same measures of reward
+        assert self._sketches is not None and other._sketches is not None
+        assert self._sketches.keys() == other._sketches.keys()
+
+        for name, sketches in self._sketches.items():
+            for sketch, other_sketch in zip(sketches, other._sketches[name]):
+                sketch.merge(other_sketch)
+        self._set_percentiles_from_sketches()
 
     def get_reward_percentile(self, reward):
-        return np.searchsorted(self._reward_percentiles, reward)
+        return np.searchsorted(self._percentiles["reward"][0], reward)
 
     def get_new_reward_percentile(self, new_reward):
-        return np.searchsorted(self._new_reward_percentiles, new_reward)
+        return np.searchsorted(self._percentiles["new_reward"][0], new_reward)
 
     def get_new_discounted_future_reward_percentile(self, new_discounted_future_reward):
-        return np.searchsorted(self._new_discounted_future_reward_percentiles, new_discounted_future_reward)
+        return np.searchsorted(self._percentiles["new_discounted_future_reward"][0], new_discounted_future_reward)
 
     def get_discounted_future_reward_percentile(self, discounted_future_reward, discount_factor_index):
-        return np.searchsorted(self._discounted_future_reward_percentiles[discount_factor_index],
+        return np.searchsorted(self._percentiles["discounted_future_rewards"][discount_factor_index],
                                discounted_future_reward)
+
+    #
+    # PRIVATE implementation
+    #
+
+    def _set_percentiles_from_sketches(self):
+        for name, sketches in self._sketches.items():
+            self._percentiles[name] = [sketch.get_percentiles(PERCENTS) for sketch in sketches]
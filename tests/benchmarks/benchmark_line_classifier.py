@@ -0,0 +1,162 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+# Compares the original cascade of line checks in Log._parse_episode_events() and parse_intro_event() with the
+# single-pass classifier, over all the log files used by the file parsing system tests
+#
+# Run from the tests directory with:   python -m benchmarks.benchmark_line_classifier
+
+import os
+import tarfile
+import time
+
+import src.log.parse as parse
+
+from src.log.log_meta import LogMeta
+
+INPUT_FILES_DIR = os.path.join(os.path.dirname(__file__), "..", "system_tests", "resources", "file_parsing",
+                               "input_log_files")
+
+REPEATS = 5
+
+_INTRO_CASCADE_PREFIXES = [
+    '  "' + parse.HYPER_BATCH_SIZE + '": ',
+    '  "' + parse.HYPER_ENTROPY + '": ',
+    '  "' + parse.HYPER_DISCOUNT_FACTOR + '": ',
+    '  "' + parse.HYPER_LOSS_TYPE + '": ',
+    '  "' + parse.HYPER_LEARNING_RATE + '": ',
+    '  "' + parse.HYPER_EPISODES_BETWEEN_TRAINING + '": ',
+    '  "' + parse.HYPER_EPOCHS + '": ',
+    " * /" + parse.PARAM_RACE_TYPE + ": ",
+    " * /" + parse.PARAM_JOB_TYPE + ": ",
+    parse.MISC_MODEL_NAME_OLD_LOGS,
+    parse.MISC_MODEL_NAME_NEW_LOGS_A,
+    parse.MISC_MODEL_NAME_NEW_LOGS_B,
+    parse.MISC_MODEL_NAME_CLOUD_LOGS,
+    parse.CONTINUOUS_ACTION_SPACE_START,
+    parse.MISC_ACTION_SPACE_A,
+    parse.MISC_ACTION_SPACE_B
+]
+
+
+def main():
+    (intro_lines, episode_lines) = _read_all_log_lines()
+    print("Read", sum(len(lines) for lines in intro_lines), "intro lines and", len(episode_lines), "episode lines")
+
+    old_rate = _measure_lines_per_second(_classify_lines_with_cascade, [episode_lines])
+    new_rate = _measure_lines_per_second(_classify_lines, [episode_lines])
+    _print_comparison("Episode lines", old_rate, new_rate)
+
+    old_rate = _measure_lines_per_second(_check_intro_lines_with_cascade, intro_lines)
+    new_rate = _measure_lines_per_second(_parse_intro_lines, intro_lines)
+    _print_comparison("Intro lines", old_rate, new_rate)
+
+
+def _read_all_log_lines():
+    # Intro lines are kept separately for each file, since each one needs its own LogMeta to be parsed into
+    intro_lines = []
+    episode_lines = []
+    for file_name in sorted(os.listdir(INPUT_FILES_DIR)):
+        file_path = os.path.join(INPUT_FILES_DIR, file_name)
+        if file_name.endswith(".gz"):
+            with tarfile.open(file_path, "r") as tar:
+                for member in tar:
+                    if "/logs/training" in member.name and member.name.endswith("-robomaker.log"):
+                        lines = [line.decode() for line in tar.extractfile(member)]
+                        _split_intro_lines(lines, intro_lines, episode_lines)
+        else:
+            with open(file_path, "r") as file_io:
+                _split_intro_lines(file_io.readlines(), intro_lines, episode_lines)
+
+    return intro_lines, episode_lines
+
+
+def _split_intro_lines(lines: list[str], intro_lines: list[str], episode_lines: list[str]):
+    for i, line in enumerate(lines):
+        if line.startswith(parse.EPISODE_STARTS_WITH):
+            intro_lines.append(lines[:i])
+            episode_lines += lines[i:]
+            return
+    intro_lines.append(lines)
+
+
+def _measure_lines_per_second(lines_function, all_lines: list[list[str]]) -> float:
+    start_time = time.perf_counter()
+    for _ in range(REPEATS):
+        for lines in all_lines:
+            lines_function(lines)
+    return REPEATS * sum(len(lines) for lines in all_lines) / (time.perf_counter() - start_time)
+
+
+def _print_comparison(title: str, old_rate: float, new_rate: float):
+    print(title)
+    print("    Cascade      %10.0f lines per second" % old_rate)
+    print("    Classifier   %10.0f lines per second   (x %.1f)" % (new_rate, new_rate / old_rate))
+
+
+def _classify_lines(lines: list[str]):
+    for line_of_text in lines:
+        parse.classify_line(line_of_text)
+
+
+def _parse_intro_lines(lines: list[str]):
+    log_meta = LogMeta()
+    for line_of_text in lines:
+        parse.parse_intro_event(line_of_text, log_meta)
+
+
+def _classify_lines_with_cascade(lines: list[str]):
+    for line_of_text in lines:
+        _classify_line_with_cascade(line_of_text)
+
+
+def _check_intro_lines_with_cascade(lines: list[str]):
+    for line_of_text in lines:
+        _check_intro_line_with_cascade(line_of_text)
+
+
+def _classify_line_with_cascade(line_of_text: str):
+    # Exactly the checks that were made for each line before the classifier existed
+    if line_of_text.startswith(parse.EPISODE_STARTS_WITH):
+        return parse.LINE_TYPE_TRACE
+    if parse.EPISODE_STARTS_WITH in line_of_text and \
+            (len(line_of_text) > 1000 or parse.SENT_SIGTERM in line_of_text):
+        return parse.LINE_TYPE_EMBEDDED_TRACE
+
+    evaluation_reward = parse.parse_evaluation_reward_info(line_of_text)
+    try:
+        evaluation_progresses = parse.parse_evaluation_progress_info(line_of_text)
+    except ValueError:
+        evaluation_progresses = None    # Some intro lines look like an evaluation but have no progresses
+    object_locations = parse.parse_object_locations(line_of_text)
+
+    if evaluation_reward is not None:
+        return parse.LINE_TYPE_EVALUATION_REWARD
+    elif evaluation_progresses is not None:
+        return parse.LINE_TYPE_EVALUATION_PROGRESSES
+    elif line_of_text.startswith(parse.STILL_EVALUATING):
+        return parse.LINE_TYPE_STILL_EVALUATING
+    elif object_locations:
+        return parse.LINE_TYPE_OBJECT_LOCATIONS
+    else:
+        return parse.LINE_TYPE_OTHER
+
+
+def _check_intro_line_with_cascade(line_of_text: str):
+    # Only the checks, not the parsing, so this slightly flatters the cascade
+    for prefix in _INTRO_CASCADE_PREFIXES:
+        if line_of_text.startswith(prefix):
+            pass
+    if parse.NEW_PARAM_WORLD_NAME in line_of_text:
+        pass
+    if parse.CONTINUOUS_ACTION_SPACE_CONTAINS in line_of_text:
+        pass
+
+
+if __name__ == "__main__":
+    main()
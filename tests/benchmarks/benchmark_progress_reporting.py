@@ -0,0 +1,133 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+# Compares the cost of reporting progress for every line read by Log._parse_episode_events() with the throttled
+# ticker, over all the log files used by the file parsing system tests. The reporter mimics the checks that
+# PleaseWait.set_progress() makes before deciding whether to redraw, but never draws anything
+#
+# Run from the tests directory with:   python -m benchmarks.benchmark_progress_reporting
+
+import os
+import tarfile
+import time
+
+from src.log.log import Log, PROGRESS_MIN_TICK_BYTES
+from src.ui.please_wait import NEARLY_COMPLETE, REDRAW_INTERVAL, SMALL_JUMP, BIG_JUMP
+from src.utils.progress import ProgressReporter, ProgressTicker
+
+INPUT_FILES_DIR = os.path.join(os.path.dirname(__file__), "..", "system_tests", "resources", "file_parsing",
+                               "input_log_files")
+
+REPEATS = 20
+
+
+class CountingProgressReporter(ProgressReporter):
+    def __init__(self):
+        self.call_count = 0
+        self.percent_done = 0.0
+        self.last_drawn_at = time.time()
+
+    def set_progress(self, percent_done: float):
+        self.call_count += 1
+        if percent_done < 0.0:
+            percent_done = 0.0
+        if percent_done > 100.0:
+            percent_done = 100.0
+
+        jump = percent_done - self.percent_done
+        if percent_done >= NEARLY_COMPLETE > self.percent_done or jump >= BIG_JUMP or \
+                (jump >= SMALL_JUMP and time.time() - self.last_drawn_at >= REDRAW_INTERVAL):
+            self.percent_done = percent_done
+            self.last_drawn_at = time.time()
+
+
+def main():
+    all_lines = _read_all_log_lines()
+    print("Read", sum(len(lines) for lines in all_lines), "lines")
+
+    (old_seconds, old_calls) = _measure(_report_every_line, all_lines)
+    (new_seconds, new_calls) = _measure(_report_with_ticker, all_lines)
+    print("Progress reporting overhead per line read")
+    print("    Every line   %8.1f ns   %8d calls to set_progress()" % (old_seconds * 1e9, old_calls))
+    print("    Ticker       %8.1f ns   %8d calls to set_progress()" % (new_seconds * 1e9, new_calls))
+
+    reporter = CountingProgressReporter()
+    start_time = time.perf_counter()
+    for file_name in sorted(os.listdir(INPUT_FILES_DIR)):
+        Log(INPUT_FILES_DIR).parse(file_name, reporter, 0, 100)
+    print("Parsed every log in %.2f seconds with %d calls to set_progress()" %
+          (time.perf_counter() - start_time, reporter.call_count))
+
+
+def _read_all_log_lines():
+    all_lines = []
+    for file_name in sorted(os.listdir(INPUT_FILES_DIR)):
+        file_path = os.path.join(INPUT_FILES_DIR, file_name)
+        if file_name.endswith(".gz"):
+            with tarfile.open(file_path, "r") as tar:
+                for member in tar:
+                    if "/logs/training" in member.name and member.name.endswith("-robomaker.log"):
+                        all_lines.append(tar.extractfile(member).read().decode().splitlines(keepends=True))
+        else:
+            with open(file_path, "r") as file_io:
+                all_lines.append(file_io.readlines())
+    return all_lines
+
+
+def _measure(report_function, all_lines: list[list[str]]):
+    # Returns the overhead per line (beyond an empty loop) and the number of calls made to the reporter
+    reporter = CountingProgressReporter()
+    line_count = REPEATS * sum(len(lines) for lines in all_lines)
+
+    start_time = time.perf_counter()
+    for _ in range(REPEATS):
+        for lines in all_lines:
+            _empty_loop(lines)
+    empty_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(REPEATS):
+        for lines in all_lines:
+            report_function(lines, reporter)
+    seconds = time.perf_counter() - start_time
+
+    return (seconds - empty_seconds) / line_count, reporter.call_count // REPEATS
+
+
+def _empty_loop(lines: list[str]):
+    for line_of_text in lines:
+        pass
+
+
+def _report_every_line(lines: list[str], reporter: ProgressReporter):
+    # Exactly the progress reporting that was done for each line before the ticker existed
+    file_size = sum(len(line_of_text) for line_of_text in lines)
+    min_progress_percent = 2
+    mid_progress_percent = 50
+    file_amount_read = 0
+    for line_of_text in lines:
+        file_amount_read += len(line_of_text)
+        percent_read = file_amount_read / file_size * 100
+        scaled_percent_read = (mid_progress_percent - min_progress_percent) / 100 * percent_read
+        reporter.set_progress(min_progress_percent + scaled_percent_read)
+
+
+def _report_with_ticker(lines: list[str], reporter: ProgressReporter):
+    file_size = sum(len(line_of_text) for line_of_text in lines)
+    ticker = ProgressTicker(reporter, 2, 50, file_size, PROGRESS_MIN_TICK_BYTES)
+    next_tick = ticker.tick(0)
+    file_amount_read = 0
+    for line_of_text in lines:
+        file_amount_read += len(line_of_text)
+        if file_amount_read >= next_tick:
+            next_tick = ticker.tick(file_amount_read)
+    ticker.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import threading
+import time
+import unittest
+
+from src.analyze.core.background_calculation import BackgroundCalculation
+from src.utils.progress import ProgressReporter
+
+
+class TestBackgroundCalculation(unittest.TestCase):
+    def setUp(self):
+        self.scheduled = []
+        self.results = []
+        self.background_calculation = BackgroundCalculation(self, ProgressReporter(), self.results.append)
+
+    def test_result_handed_back_on_polling(self):
+        self.background_calculation.start("Adding", _add, 2, 3)
+        self.assertTrue(self.background_calculation.is_running())
+        self._poll_until_finished()
+
+        self.assertEqual([5], self.results)
+        self.assertFalse(self.background_calculation.is_running())
+
+    def test_only_latest_result_handed_back(self):
+        release = threading.Event()
+        self.background_calculation.start("Waiting", _wait_then_add, release, 1, 1)
+        self.background_calculation.start("Adding", _add, 2, 2)
+        release.set()
+        self._poll_until_finished()
+
+        self.assertEqual([4], self.results)
+
+    def test_stale_calculation_told_to_give_up(self):
+        release = threading.Event()
+        cancelled_events = []
+        self.background_calculation.start("Waiting", _remember_cancelled_then_wait, cancelled_events, release)
+        while not cancelled_events:
+            time.sleep(0.01)
+        self.background_calculation.start("Adding", _add, 3, 3)
+        self._poll_until_finished()
+
+        self.assertTrue(cancelled_events[0].is_set())
+        self.assertEqual([6], self.results)
+        release.set()
+
+    def test_no_result_when_cancelled(self):
+        self.background_calculation.start("Adding", _add, 2, 3)
+        self.background_calculation.cancel()
+        self._poll_until_finished()
+
+        self.assertEqual([], self.results)
+
+    def test_error_raised_on_polling(self):
+        self.background_calculation.start("Failing", _fail)
+        with self.assertRaises(ZeroDivisionError):
+            self._poll_until_finished()
+
+    def after(self, milliseconds: int, callback: callable):
+        # Stands in for the widget that polls for results
+        self.scheduled.append(callback)
+
+    def _poll_until_finished(self):
+        while self.scheduled:
+            time.sleep(0.01)
+            self.scheduled.pop(0)()
+
+
+def _add(cancelled: threading.Event, progress: ProgressReporter, a: int, b: int):
+    progress.set_progress(100)
+    return a + b
+
+
+def _wait_then_add(cancelled: threading.Event, progress: ProgressReporter, release: threading.Event, a: int, b: int):
+    release.wait(5)
+    return a + b
+
+
+def _remember_cancelled_then_wait(cancelled: threading.Event, progress: ProgressReporter, cancelled_events: list,
+                                  release: threading.Event):
+    cancelled_events.append(cancelled)
+    release.wait(5)
+
+
+def _fail(cancelled: threading.Event, progress: ProgressReporter):
+    return 1 / 0
@@ -0,0 +1,77 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+import numpy as np
+
+from src.analyze.util.heat_map_cache import HeatMapCache
+from src.analyze.util.heatmap import HeatMap
+
+
+class TestHeatMapCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = HeatMapCache(10 ** 6)
+        (heat_map, contributions) = _create_heat_map(["a", "b"])
+        cache.put("speed", ("a", "b"), heat_map, contributions)
+
+        self.assertIs(heat_map, cache.get_heat_map("speed", ("a", "b")))
+        self.assertIsNone(cache.get_heat_map("speed", ("a",)))
+        self.assertIsNone(cache.get_heat_map("reward", ("a", "b")))
+        self.assertEqual((1, 2), (cache.get_hits(), cache.get_misses()))
+
+    def test_contributions_kept_for_other_episodes(self):
+        cache = HeatMapCache(10 ** 6)
+        (heat_map, contributions) = _create_heat_map(["a", "b"])
+        cache.put("speed", ("a", "b"), heat_map, contributions)
+
+        # A copy, so adding to it does not change the cache
+        cached_contributions = cache.get_contributions("speed")
+        self.assertEqual(["a", "b"], list(cached_contributions.keys()))
+        cached_contributions["c"] = contributions["a"]
+        self.assertEqual(["a", "b"], list(cache.get_contributions("speed").keys()))
+        self.assertEqual({}, cache.get_contributions("reward"))
+
+    def test_least_recently_used_removed_to_stay_within_budget(self):
+        (heat_map, contributions) = _create_heat_map(["a"])
+        size = heat_map.get_memory_size()
+        cache = HeatMapCache(3 * size)
+        for key in ["speed", "reward", "slide"]:
+            cache.put(key, ("a",), heat_map, contributions)
+
+        # Using speed makes reward the least recently used
+        cache.get_heat_map("speed", ("a",))
+        cache.put("skew", ("a",), heat_map, contributions)
+
+        self.assertIsNone(cache.get_heat_map("reward", ("a",)))
+        for key in ["speed", "slide", "skew"]:
+            self.assertIs(heat_map, cache.get_heat_map(key, ("a",)))
+        self.assertEqual(3 * size, cache.get_memory_size())
+
+    def test_latest_kept_even_if_over_budget(self):
+        cache = HeatMapCache(1)
+        (heat_map, contributions) = _create_heat_map(["a"])
+        cache.put("speed", ("a",), heat_map, contributions)
+        cache.put("reward", ("a",), heat_map, contributions)
+
+        self.assertIsNone(cache.get_heat_map("speed", ("a",)))
+        self.assertIs(heat_map, cache.get_heat_map("reward", ("a",)))
+
+        cache.clear()
+        self.assertIsNone(cache.get_heat_map("reward", ("a",)))
+
+
+def _create_heat_map(episodes: list):
+    heat_map = HeatMap(0, 0, 2, 1, 0.1, True)
+    contributions = {}
+    for i, e in enumerate(episodes):
+        contribution = heat_map.get_contribution(
+            lambda h: h.visit_all(np.array([0.5, 1.5]), np.array([0.5, 0.5]), e, np.array([i, i + 1.0])))
+        heat_map.add_contribution(e, contribution)
+        contributions[e] = contribution
+    return heat_map, contributions
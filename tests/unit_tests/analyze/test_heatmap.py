@@ -0,0 +1,101 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+import numpy as np
+
+from src.analyze.util.heatmap import HeatMap
+
+
+class TestHeatMap(unittest.TestCase):
+    def setUp(self):
+        # Visits by three visitors, in turn, to a few cells so that many are repeats
+        random = np.random.default_rng(11)
+        self.x = random.uniform(0, 2, 3000).round(1)
+        self.y = random.uniform(0, 1, 3000).round(1)
+        self.stats = random.integers(0, 5, 3000).astype(float)
+        self.visitors = np.repeat(["a", "b", "c", "a"], 750)
+
+    def test_visits_of_arrays_same_as_one_at_a_time(self):
+        for allow_repeats in [True, False]:
+            heat_map = self._create_heat_map(allow_repeats)
+            for x, y, visitor, stat in zip(self.x.tolist(), self.y.tolist(), self.visitors, self.stats.tolist()):
+                heat_map.visit(x, y, visitor, stat)
+
+            array_heat_map = self._create_heat_map(allow_repeats)
+            array_heat_map.visit_all(self.x[:1000], self.y[:1000], self.visitors[:1000], self.stats[:1000])
+            for visitor in ["b", "c", "a"]:
+                is_visitor = self.visitors[1000:] == visitor
+                array_heat_map.visit_all(self.x[1000:][is_visitor], self.y[1000:][is_visitor], visitor,
+                                         self.stats[1000:][is_visitor])
+
+            for stat_method in [np.count_nonzero, np.median]:
+                self.assertTrue(np.array_equal(heat_map._get_stats_array(stat_method)[0],
+                                               array_heat_map._get_stats_array(stat_method)[0], equal_nan=True))
+
+    def test_stats_of_each_cell(self):
+        heat_map = self._create_heat_map(False)
+        heat_map.visit_all(self.x, self.y, self.visitors, self.stats)
+        (medians, min_median, max_median) = heat_map._get_stats_array(np.median)
+        (counts, _, _) = heat_map._get_stats_array(np.count_nonzero)
+
+        # Simply a list of the stats of each cell, where a visit only counts if the cell's last visitor was different
+        cell_stats = {}
+        last_visitors = {}
+        for x, y, visitor, stat in zip(self.x.tolist(), self.y.tolist(), self.visitors, self.stats.tolist()):
+            cell = (heat_map._get_y_index(y), heat_map._get_x_index(x))
+            if last_visitors.get(cell) != visitor:
+                last_visitors[cell] = visitor
+                cell_stats.setdefault(cell, []).append(stat)
+
+        self.assertEqual(len(cell_stats), np.count_nonzero(~np.isnan(medians)))
+        for cell, stats in cell_stats.items():
+            self.assertEqual(np.median(stats), medians[cell])
+            self.assertEqual(np.count_nonzero(stats), counts[cell])
+        self.assertEqual(min(np.median(s) for s in cell_stats.values()), min_median)
+        self.assertEqual(max(np.median(s) for s in cell_stats.values()), max_median)
+
+    def test_stats_only_where_enough_visits(self):
+        heat_map = self._create_heat_map(True)
+        heat_map.visit_all(self.x, self.y, "a", self.stats)
+        visits_heat_map = self._create_heat_map(False)
+        # Twenty different visitors to the first cell, but only one to the next cell, which is too few to show
+        visits_heat_map.visit_all(np.array([0.0] * 20 + [1.0]), np.array([0.0] * 20 + [1.0]), list(range(21)),
+                                  np.ones(21))
+
+        (stats, _, _) = heat_map._get_stats_array(np.median, 0, visits_heat_map)
+        self.assertEqual([(0, 0)], list(zip(*np.nonzero(~np.isnan(stats)))))
+
+    def test_contributions_same_as_visits(self):
+        for allow_repeats in [True, False]:
+            heat_map = self._create_heat_map(allow_repeats)
+            for visitor in ["a", "b", "c"]:
+                is_visitor = self.visitors == visitor
+                heat_map.visit_all(self.x[is_visitor], self.y[is_visitor], visitor, self.stats[is_visitor])
+
+            # Contributions added in any order, including one that is removed again
+            contribution_heat_map = self._create_heat_map(allow_repeats)
+            for visitor in ["c", "d", "a", "b"]:
+                is_visitor = self.visitors == visitor
+                contribution = contribution_heat_map.get_contribution(
+                    lambda h: h.visit_all(self.x[is_visitor] + 0.5, self.y[is_visitor], visitor,
+                                          self.stats[is_visitor]) if visitor == "d" else
+                    h.visit_all(self.x[is_visitor], self.y[is_visitor], visitor, self.stats[is_visitor]))
+                contribution_heat_map.add_contribution(visitor, contribution)
+            contribution_heat_map.remove_contribution("d")
+
+            self.assertEqual(["c", "a", "b"], contribution_heat_map.get_contributors())
+            for stat_method in [np.count_nonzero, np.median]:
+                self.assertTrue(np.array_equal(heat_map._get_stats_array(stat_method)[0],
+                                               contribution_heat_map._get_stats_array(stat_method)[0],
+                                               equal_nan=True))
+
+    @staticmethod
+    def _create_heat_map(allow_repeats: bool):
+        return HeatMap(0, 0, 2, 1, 0.1, allow_repeats)
@@ -0,0 +1,47 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+from src.action_space.action_space import ActionSpace
+from src.episode.episode import Episode, STEP_ANALYSIS_COLUMNS, OFF_TRACK
+from src.episode.episode_table import create_episode_table
+from src.log.debug_logs import create_debug_logs
+from src.log.parse import parse_episode_event_columns
+
+TRACE_LINES = [
+    "SIM_TRACE_LOG:0,1,0.6159,0.4622,131.5767,20.00,1.50,-1,0.0000,False,True,0.4212,0,33.28,34.648,prepare,0.00\n",
+    "SIM_TRACE_LOG:0,2,0.6659,0.5122,131.5767,20.00,1.60,-1,1.0000,False,True,0.9212,1,33.28,34.748,in_progress\n",
+    "SIM_TRACE_LOG:0,3,0.7259,0.5722,131.5767,20.00,1.70,-1,1.5000,False,True,1.4212,1,33.28,34.848,in_progress\n",
+    "SIM_TRACE_LOG:0,4,0.7959,0.6422,131.5767,20.00,1.80,-1,0.5000,True,False,1.9212,2,33.28,34.948,off_track\n"
+]
+
+
+class TestEpisode(unittest.TestCase):
+    def test_step_analysis_recreates_same_episode(self):
+        action_space = ActionSpace()
+        action_space.mark_as_continuous()
+        episode = Episode(0, 0, self._create_table(), [], action_space, False)
+
+        # Only the step analysis and the columns it set are needed, as when they are sent back by another process
+        table = self._create_table()
+        for name in STEP_ANALYSIS_COLUMNS:
+            table.set_column(name, episode.table.get_column(name))
+        same_episode = Episode(0, 0, table, [], action_space, False, step_analysis=episode.get_step_analysis())
+
+        self.assertEqual(OFF_TRACK, same_episode.outcome)
+        self.assertEqual(4, same_episode.step_count)
+        self.assertEqual(episode.get_step_analysis(), same_episode.get_step_analysis())
+        self.assertEqual(episode.rewards, same_episode.rewards)
+        self.assertEqual([e.track_speed for e in episode.events], [e.track_speed for e in same_episode.events])
+
+    @staticmethod
+    def _create_table():
+        columns = parse_episode_event_columns(TRACE_LINES, True)
+        debug_logs = create_debug_logs([""] * len(TRACE_LINES))
+        return create_episode_table(columns, debug_logs, True)
@@ -0,0 +1,83 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+from src.episode.episode_table import create_episode_table
+from src.log.debug_logs import create_debug_logs
+from src.log.parse import parse_episode_event_columns
+
+TRACE_LINES = [
+    "SIM_TRACE_LOG:0,1,0.6159,0.4622,131.5767,20.00,1.50,2,0.0000,False,True,0.4212,0,33.28,34.648,prepare,0.00\n",
+    "SIM_TRACE_LOG:0,2,0.6659,0.5122,131.5767,20.00,1.50,3,1.0000,False,True,0.9212,1,33.28,34.748,in_progress\n",
+    "SIM_TRACE_LOG:0,3,0.7159,0.5622,131.5767,20.00,1.50,2,1.5000,True,False,1.4212,1,33.28,34.848,off_track,0.00\n"
+]
+
+
+class TestEpisodeTable(unittest.TestCase):
+    def test_events_read_fields_from_columns(self):
+        table = self._create_table(False)
+        events = table.get_events()
+        self.assertEqual(3, len(events))
+        self.assertEqual(2, events[1].step)
+        self.assertEqual(0.6659, events[1].x)
+        self.assertEqual(3, events[1].action_taken)
+        self.assertEqual("off_track", events[-1].status)
+        self.assertEqual("L", events[0].track_side)
+        self.assertEqual("debug 2\n", events[2].get_debug_log())
+        self.assertEqual("debug 2\n", events[2].debug_log)
+        self.assertEqual([1, 2, 3], [e.step for e in events])
+        self.assertEqual([2, 3], [e.step for e in events[1:]])
+
+    def test_events_are_read_only(self):
+        event = self._create_table(False).get_event(0)
+        with self.assertRaises(AttributeError):
+            event.track_speed = 1.0
+        with self.assertRaises(AttributeError):
+            _ = event.no_such_field
+
+    def test_continuous_action_space_has_no_action_taken(self):
+        table = self._create_table(True)
+        self.assertIsNone(table.get_event(0).action_taken)
+        self.assertEqual([None, None, None], table.get_column_as_list("action_taken"))
+
+    def test_rows_write_through_to_whole_table(self):
+        table = self._create_table(False)
+        rows = table.get_rows(1, 3)
+        rows.set_column("track_speed", [2.0, 3.0])
+        self.assertEqual([0.0, 2.0, 3.0], table.get_column_as_list("track_speed"))
+        self.assertEqual(2, rows.get_event(0).step)
+        self.assertEqual("debug 1\n", rows.get_event(0).get_debug_log())
+
+    def test_discounted_future_rewards_are_a_list_per_step(self):
+        table = self._create_table(False)
+        self.assertEqual([], table.get_event(0).discounted_future_rewards)
+        table.set_column("discounted_future_rewards", [[3.0, 2.5], [2.0, 1.5], [1.0, 1.0]])
+        self.assertEqual([2.0, 1.5], table.get_event(1).discounted_future_rewards)
+
+    def test_pending_columns_are_calculated_once_when_first_read(self):
+        table = self._create_table(False)
+        calls = []
+
+        def calculate():
+            calls.append(True)
+            table.set_column("skew", [1.0, 2.0, 3.0])
+
+        table.set_pending_columns(["skew", "slide"], calculate)
+        self.assertTrue(table.is_column_pending("slide"))
+        self.assertEqual(2.0, table.get_event(1).skew)
+        self.assertEqual(0.0, table.get_event(1).slide)
+        self.assertEqual([1.0, 2.0, 3.0], table.get_column_as_list("skew"))
+        self.assertEqual(1, len(calls))
+        self.assertFalse(table.is_column_pending("slide"))
+
+    @staticmethod
+    def _create_table(is_continuous: bool):
+        columns = parse_episode_event_columns(TRACE_LINES, is_continuous)
+        debug_logs = create_debug_logs(["debug " + str(i) + "\n" for i in range(len(TRACE_LINES))])
+        return create_episode_table(columns, debug_logs, is_continuous)
@@ -0,0 +1,66 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+from src.action_space.action_space import ActionSpace
+from src.episode.episode import Episode
+from src.episode.episode_table import create_episode_table
+from src.episode.new_reward_scoring import get_reward_function_key, score_steps
+from src.event.event_meta import REWARD_INPUT_COLUMNS, get_reward_input_params_of_steps
+from src.log.debug_logs import create_debug_logs
+from src.log.parse import parse_episode_event_columns
+from src.personalize.reward_functions.follow_centre_line import reward_function as follow_centre_line
+from src.personalize.reward_functions.stay_inside_the_two_borders import reward_function as stay_inside
+from src.tracks.reinvent_2018_track import Reinvent2018Track
+from src.tracks.track import Track
+
+TRACE_LINE = "SIM_TRACE_LOG:0,{},{:.4f},{:.4f},0.5,-10.00,1.50,-1,1.0,False,{},{:.4f},{},17.71,{:.3f},{}\n"
+
+
+class TestNewRewardScoring(unittest.TestCase):
+    def setUp(self):
+        self.track = Reinvent2018Track()
+        self.track.prepare({})
+        action_space = ActionSpace()
+        action_space.mark_as_continuous()
+
+        lines = [TRACE_LINE.format(step + 1, 3.2 + step * 0.15, 0.6 + step * 0.05, "True" if step < 5 else "False",
+                                   step * 0.8, step + 1, 10 + step * 0.1, "off_track" if step == 5 else "in_progress")
+                 for step in range(6)]
+        table = create_episode_table(parse_episode_event_columns(lines, True),
+                                     create_debug_logs([""] * len(lines)), True)
+        self.episode = Episode(0, 0, table, [], action_space, True, self.track)
+
+    def test_scores_match_params_of_each_event(self):
+        # Params made from the fields of each event in turn, rather than from whole columns
+        params = list(get_reward_input_params_of_steps(
+            {name: [getattr(e, name) for e in self.episode.events] for name in REWARD_INPUT_COLUMNS},
+            self.track.get_all_waypoints_as_tuple(), self.track.get_width()))
+        columns = {name: self.episode.table.get_column(name) for name in REWARD_INPUT_COLUMNS}
+
+        self.assertEqual([follow_centre_line(p) for p in params],
+                         score_steps(follow_centre_line, columns, self.track.get_all_waypoints_as_tuple(),
+                                     self.track.get_width()).tolist())
+        self.assertTrue(params[-1]["is_offtrack"])
+        self.assertIs(params[0]["waypoints"], params[-1]["waypoints"])
+
+    def test_scores_set_on_episode(self):
+        self.episode.set_new_rewards([1.0] * 6)
+        self.assertEqual([1.0] * 6, self.episode.new_rewards)
+        self.assertEqual([1.0, 2.0, 3.0, 4.0, 5.0, 6.0], self.episode.table.get_column("new_reward_total").tolist())
+        self.assertFalse(self.episode.table.is_column_pending("new_discounted_future_reward"))
+
+    def test_key_is_different_for_each_function_and_track(self):
+        other_track = Track()
+        other_track._world_name = "other_world"
+        key = get_reward_function_key(stay_inside, self.track)
+
+        self.assertEqual(key, get_reward_function_key(stay_inside, self.track))
+        self.assertNotEqual(key, get_reward_function_key(follow_centre_line, self.track))
+        self.assertNotEqual(key, get_reward_function_key(stay_inside, other_track))
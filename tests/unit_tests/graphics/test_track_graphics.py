@@ -0,0 +1,53 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import struct
+import unittest
+import zlib
+
+import numpy as np
+
+from src.graphics.track_graphics import _get_box_grid_pixels, _get_png
+
+
+class TestBoxGridImage(unittest.TestCase):
+    def test_box_under_middle_of_each_box(self):
+        # A grid of 10 rows of 20 boxes, each 0.1 across, with the bottom left at (1, 2) on a canvas of 37 pixels
+        # per metre, whose top left is at (0.5, 3.5)
+        (left, top, pixel_boxes) = _get_box_grid_pixels(1.0, 2.0, 0.1, (10, 20), 37.0, 0.5, 3.5, 800, 600)
+        self.assertEqual((18, 18), (left, top))
+        self.assertEqual((38, 75), pixel_boxes.shape)
+
+        for row in range(10):
+            for column in range(20):
+                x = (1.0 + (column + 0.5) * 0.1 - 0.5) * 37.0 - left
+                y = (3.5 - 2.0 - (row + 0.5) * 0.1) * 37.0 - top
+                self.assertEqual(row * 20 + column, pixel_boxes[int(y), int(x)])
+
+        # Any pixel not under a box is one past the last box
+        self.assertTrue(np.all((pixel_boxes >= 0) & (pixel_boxes <= 200)))
+
+    def test_only_pixels_on_canvas(self):
+        self.assertIsNone(_get_box_grid_pixels(1.0, 2.0, 0.1, (10, 20), 37.0, 50.0, 3.5, 800, 600))
+
+        (left, top, pixel_boxes) = _get_box_grid_pixels(-8.0, -6.0, 0.05, (240, 340), 120.0, -3.0, 2.0, 1200, 900)
+        self.assertEqual((0, 0, (900, 1200)), (left, top, pixel_boxes.shape))
+
+    def test_png(self):
+        rgba = np.random.default_rng(5).integers(0, 256, (7, 9, 4), dtype=np.uint8)
+        png = _get_png(rgba)
+
+        self.assertEqual(b"\x89PNG\r\n\x1a\n", png[:8])
+        self.assertEqual((9, 7, 8, 6), struct.unpack(">IIBB", png[16:26]))
+
+        # The pixels are the rows of the only data chunk, each after a zero byte for no filtering
+        (data_length,) = struct.unpack(">I", png[33:37])
+        self.assertEqual(b"IDAT", png[37:41])
+        scanlines = np.frombuffer(zlib.decompress(png[41:41 + data_length]), dtype=np.uint8).reshape(7, 37)
+        self.assertTrue(np.all(scanlines[:, 0] == 0))
+        self.assertTrue(np.array_equal(rgba, scanlines[:, 1:].reshape(7, 9, 4)))
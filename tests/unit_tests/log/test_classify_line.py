@@ -0,0 +1,52 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+import src.log.parse as parse
+
+from src.log.log_meta import LogMeta
+
+
+class TestClassifyLine(unittest.TestCase):
+    def test_each_prefix_has_its_own_line_type(self):
+        self.assertEqual(parse.LINE_TYPE_TRACE, parse.classify_line("SIM_TRACE_LOG:0,1,0.6159,0.4622\n"))
+        self.assertEqual(parse.LINE_TYPE_EVALUATION_REWARD, parse.classify_line(
+            "## agent: Finished evaluation phase. Success rate = 0.0, Avg Total Reward = 12.5\n"))
+        self.assertEqual(parse.LINE_TYPE_EVALUATION_PROGRESSES, parse.classify_line(
+            "Number of evaluations: 1 Evaluation progresses: [50.0]\n"))
+        self.assertEqual(parse.LINE_TYPE_EVALUATION_PROGRESSES, parse.classify_line(
+            "[BestModelSelection] Number of evaluations: 1 Evaluation progresses: [50.0]\n"))
+        self.assertEqual(parse.LINE_TYPE_STILL_EVALUATING, parse.classify_line("Reset agent\n"))
+        self.assertEqual(parse.LINE_TYPE_OBJECT_LOCATIONS, parse.classify_line("DRG-OBJECTS:[[1.0, 2.0]]\n"))
+
+    def test_other_lines(self):
+        self.assertEqual(parse.LINE_TYPE_OTHER, parse.classify_line("\n"))
+        self.assertEqual(parse.LINE_TYPE_OTHER, parse.classify_line("Reward debug info\n"))
+        self.assertEqual(parse.LINE_TYPE_OTHER, parse.classify_line(
+            "## agent: Finished evaluation phase. Success rate = 0.5, Avg Total Reward = 12.5\n"))
+
+    def test_embedded_trace(self):
+        self.assertEqual(parse.LINE_TYPE_EMBEDDED_TRACE, parse.classify_line(
+            "Sent SIGTERM to process SIM_TRACE_LOG:0,1,0.6159,0.4622\n"))
+        self.assertEqual(parse.LINE_TYPE_OTHER, parse.classify_line("Mentions SIM_TRACE_LOG:0,1 in passing\n"))
+
+    def test_intro_events_are_dispatched_by_prefix(self):
+        log_meta = LogMeta()
+        parse.parse_intro_event('  "batch_size": 64,\n', log_meta)
+        parse.parse_intro_event('  "lr": 0.0003,\n', log_meta)
+        parse.parse_intro_event(" * /RACE_TYPE: TIME_TRIAL\n", log_meta)
+        parse.parse_intro_event("{'WORLD_NAME': 'reInvent2019_track', 'NUMBER_OF_TRIALS': 5}\n", log_meta)
+        parse.parse_intro_event("[s3] Successfully downloaded model metadata from local/model/my-model/x.json\n",
+                                log_meta)
+
+        self.assertEqual(64, log_meta.hyper.batch_size)
+        self.assertEqual(0.0003, log_meta.hyper.learning_rate)
+        self.assertEqual("TIME_TRIAL", log_meta.race_type)
+        self.assertEqual("reInvent2019_track", log_meta.world_name)
+        self.assertEqual("my-model", log_meta.model_name)
@@ -0,0 +1,43 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import pickle
+import unittest
+
+from src.log.debug_logs import create_debug_logs, concatenate_debug_logs
+
+DEBUG_LOGS = ["", "Speed bonus\n", "Café\n", "Speed\nbonus\n"]
+
+
+class TestDebugLogs(unittest.TestCase):
+    def test_each_step_decodes_to_original_text(self):
+        debug_logs = create_debug_logs(DEBUG_LOGS)
+        self.assertEqual(4, len(debug_logs))
+        self.assertEqual(DEBUG_LOGS, [debug_logs.get(i) for i in range(4)])
+
+    def test_range_shares_text_of_selected_steps(self):
+        debug_logs = create_debug_logs(DEBUG_LOGS).get_range(1, 3)
+        self.assertEqual(2, len(debug_logs))
+        self.assertEqual("Café\n", debug_logs.get(1))
+        self.assertTrue(debug_logs.contains("bonus"))
+        self.assertFalse(create_debug_logs(DEBUG_LOGS).get_range(2, 3).contains("bonus"))
+
+    def test_search_with_newline_does_not_cross_steps(self):
+        debug_logs = create_debug_logs(DEBUG_LOGS)
+        self.assertTrue(debug_logs.contains("Speed\nbonus"))
+        self.assertFalse(debug_logs.contains("bonus\nCafé"))
+
+    def test_concatenate_keeps_every_step(self):
+        debug_logs = concatenate_debug_logs([create_debug_logs(DEBUG_LOGS[:2]),
+                                             create_debug_logs(DEBUG_LOGS).get_range(2, 4)])
+        self.assertEqual(DEBUG_LOGS, [debug_logs.get(i) for i in range(4)])
+
+    def test_pickled_range_keeps_only_its_own_steps(self):
+        debug_logs = pickle.loads(pickle.dumps(create_debug_logs(DEBUG_LOGS).get_range(1, 3)))
+        self.assertEqual(DEBUG_LOGS[1:3], [debug_logs.get(i) for i in range(2)])
+        self.assertEqual(len((DEBUG_LOGS[1] + DEBUG_LOGS[2]).encode()), len(debug_logs.get_text_and_offsets()[0]))
@@ -0,0 +1,69 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.log.debug_logs import create_debug_logs
+from src.log.episode_cache import read_episode_cache, write_episode_cache
+from src.log.evaluation_phase import EvaluationPhase
+from src.log.parse import TRACE_COLUMNS_DTYPE
+
+
+class TestEpisodeCache(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._source_path = os.path.join(self._directory.name, "test.log")
+        self._cache_path = self._source_path + ".cache.npz"
+        with open(self._source_path, "w") as source_file:
+            source_file.write("SIM_TRACE_LOG:...\n")
+
+        self._trace_columns = np.zeros(3, dtype=TRACE_COLUMNS_DTYPE)
+        self._trace_columns["step"] = [1, 2, 1]
+        self._trace_columns["x"] = [0.5, 0.75, 1.25]
+        self._trace_columns["status"] = ["prepare", "off_track", "prepare"]
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_cache_round_trip(self):
+        self._write_cache()
+
+        (trace_columns, debug_logs, episode_offsets, episode_ids, episode_iterations,
+         episode_object_locations, evaluation_phases) = read_episode_cache(self._cache_path, self._source_path)
+
+        self.assertTrue(np.array_equal(self._trace_columns, trace_columns))
+        self.assertEqual(["", "Bonus £1\n", ""], [debug_logs.get(i) for i in range(len(debug_logs))])
+        self.assertTrue(debug_logs.contains("£1"))
+        self.assertFalse(debug_logs.get_range(2, 3).contains("£1"))
+        self.assertEqual([0, 2, 3], episode_offsets)
+        self.assertEqual([0, 1], episode_ids)
+        self.assertEqual([0, 0], episode_iterations)
+        self.assertEqual([[[1.5, 2.5]], []], episode_object_locations)
+        self.assertEqual(1, len(evaluation_phases))
+        self.assertEqual([1.5, 2.5], evaluation_phases[0].rewards.tolist())
+        self.assertEqual([10.0, 20.0], evaluation_phases[0].progresses.tolist())
+
+    def test_cache_is_ignored_when_source_changes(self):
+        self._write_cache()
+        with open(self._source_path, "a") as source_file:
+            source_file.write("SIM_TRACE_LOG:...\n")
+
+        self.assertIsNone(read_episode_cache(self._cache_path, self._source_path))
+
+    def test_missing_cache_is_ignored(self):
+        self.assertIsNone(read_episode_cache(self._cache_path, self._source_path))
+
+    def _write_cache(self):
+        write_episode_cache(self._cache_path, self._source_path, self._trace_columns,
+                            create_debug_logs(["", "Bonus £1\n", ""]),
+                            [0, 2, 3], [0, 1], [0, 0], [[[1.5, 2.5]], []],
+                            [EvaluationPhase([1.5, 2.5], [10.0, 20.0])])
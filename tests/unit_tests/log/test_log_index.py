@@ -0,0 +1,86 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import json
+import os
+import tempfile
+import unittest
+
+from src.log.log_index import LogIndex, INDEX_FILE_NAME
+from src.log.log_meta import LogMeta
+
+
+class TestLogIndex(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._log_directory = self._directory.name
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _write_meta_file(self, log_file_name: str, model_name: str, episode_count: int):
+        log_meta = LogMeta()
+        log_meta.model_name = model_name
+        log_meta.world_name = "reInvent2019_track"
+        log_meta.episode_stats.episode_count = episode_count
+        with open(os.path.join(self._log_directory, log_file_name + ".meta.json"), "w") as meta_file:
+            json.dump(log_meta.get_as_json(), meta_file)
+
+    def _write_log_file(self, log_file_name: str):
+        with open(os.path.join(self._log_directory, log_file_name), "w") as log_file:
+            log_file.write("")
+
+    def test_entries_come_from_meta_files(self):
+        self._write_meta_file("a.log", "Model-A", 10)
+        log_index = LogIndex(self._log_directory)
+        log_index.refresh()
+
+        [entry] = log_index.get_entries()
+        self.assertEqual("a.log.meta.json", entry.meta_file_name)
+        self.assertEqual("Model-A", entry.model_name)
+        self.assertEqual("reInvent2019_track", entry.world_name)
+        self.assertEqual(10, entry.episode_stats.episode_count)
+
+    def test_saved_index_is_used_instead_of_unchanged_meta_files(self):
+        self._write_meta_file("a.log", "Model-A", 10)
+        LogIndex(self._log_directory).refresh()
+        self.assertTrue(os.path.exists(os.path.join(self._log_directory, INDEX_FILE_NAME)))
+
+        # Make the meta file unreadable without changing its size or time, so only the index can provide the entry
+        meta_path = os.path.join(self._log_directory, "a.log.meta.json")
+        stat = os.stat(meta_path)
+        with open(meta_path, "r+") as meta_file:
+            meta_file.write("X")
+        os.utime(meta_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        log_index = LogIndex(self._log_directory)
+        log_index.refresh()
+        self.assertEqual("Model-A", log_index.get_entries()[0].model_name)
+
+    def test_changed_and_deleted_meta_files_are_noticed(self):
+        self._write_meta_file("a.log", "Model-A", 10)
+        self._write_meta_file("b.log", "Model-B", 20)
+        log_index = LogIndex(self._log_directory)
+        log_index.refresh()
+
+        self._write_meta_file("a.log", "Model-A", 1000)
+        os.remove(os.path.join(self._log_directory, "b.log.meta.json"))
+        log_index.refresh()
+
+        [entry] = log_index.get_entries()
+        self.assertEqual(1000, entry.episode_stats.episode_count)
+
+    def test_new_log_files_have_no_meta_file(self):
+        self._write_log_file("a.log")
+        self._write_log_file("b.log")
+        self._write_log_file("c.tar.gz")
+        self._write_meta_file("a.log", "Model-A", 10)
+        log_index = LogIndex(self._log_directory)
+        log_index.refresh()
+
+        self.assertEqual(["b.log", "c.tar.gz"], sorted(log_index.get_new_log_files()))
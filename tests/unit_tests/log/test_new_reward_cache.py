@@ -0,0 +1,68 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.log.new_reward_cache import NEW_REWARD_CACHES_KEPT_PER_LOG, get_new_reward_cache_path, read_new_reward_cache, \
+    write_new_reward_cache
+
+KEY = "0123456789abcdef" * 4
+OTHER_KEY = "0123456789abcdef" + "f" * 48
+
+
+class TestNewRewardCache(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._source_path = os.path.join(self._directory.name, "test.log")
+        with open(self._source_path, "w") as source_file:
+            source_file.write("SIM_TRACE_LOG:...\n")
+        self._new_reward = np.array([1.0, 0.001, 2.5])
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_cache_round_trip(self):
+        cache_path = get_new_reward_cache_path(self._source_path, KEY)
+        write_new_reward_cache(cache_path, self._source_path, KEY, self._new_reward)
+
+        self.assertEqual(self._new_reward.tolist(),
+                         read_new_reward_cache(cache_path, self._source_path, KEY, 3).tolist())
+
+    def test_each_reward_function_has_its_own_cache(self):
+        self.assertNotEqual(get_new_reward_cache_path(self._source_path, KEY),
+                            get_new_reward_cache_path(self._source_path, "f" * 64))
+
+    def test_cache_is_ignored_when_anything_changes(self):
+        cache_path = get_new_reward_cache_path(self._source_path, KEY)
+        write_new_reward_cache(cache_path, self._source_path, KEY, self._new_reward)
+
+        # Even a different key with the same short name in the path is noticed
+        self.assertIsNone(read_new_reward_cache(cache_path, self._source_path, OTHER_KEY, 3))
+        self.assertIsNone(read_new_reward_cache(cache_path, self._source_path, KEY, 4))
+
+        with open(self._source_path, "a") as source_file:
+            source_file.write("SIM_TRACE_LOG:...\n")
+        self.assertIsNone(read_new_reward_cache(cache_path, self._source_path, KEY, 3))
+
+    def test_only_most_recently_used_caches_kept(self):
+        keys = ["%016x" % k + "0" * 48 for k in range(NEW_REWARD_CACHES_KEPT_PER_LOG + 1)]
+        cache_paths = [get_new_reward_cache_path(self._source_path, key) for key in keys]
+        for i in range(NEW_REWARD_CACHES_KEPT_PER_LOG):
+            write_new_reward_cache(cache_paths[i], self._source_path, keys[i], self._new_reward)
+            os.utime(cache_paths[i], (1000 + i, 1000 + i))
+
+        # Reading the oldest makes it the most recently used, so the next oldest is removed by another write
+        read_new_reward_cache(cache_paths[0], self._source_path, keys[0], 3)
+        write_new_reward_cache(cache_paths[-1], self._source_path, keys[-1], self._new_reward)
+
+        self.assertEqual([True, False] + [True] * (NEW_REWARD_CACHES_KEPT_PER_LOG - 1),
+                         [os.path.isfile(p) for p in cache_paths])
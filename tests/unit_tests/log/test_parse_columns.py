@@ -0,0 +1,53 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+import numpy as np
+
+from src.log.parse import parse_episode_event, parse_episode_event_columns
+from src.log.reorder_buffer import ReorderBuffer
+
+DISCRETE_LINES = [
+    "SIM_TRACE_LOG:0,1,0.6159,0.4622,131.5767,20.00,1.50,2,0.0000,False,True,0.4212,0,33.28,34.648,prepare,0.00\n",
+    "SIM_TRACE_LOG:0,3,0.7159,0.5622,131.5767,20.00,1.50,2,1.5000,True,False,1.4212,1,33.28,34.848,off_track,0.00\n",
+    "SIM_TRACE_LOG:0,2,0.6659,0.5122,131.5767,20.00,1.50,3,1.0000,False,True,0.9212,1,33.28,34.748,in_progress\n",
+    "SIM_TRACE_LOG:1,1,0.6159,0.4622,131.5767,10.00,2.00,1,0.0000,False,True,0.4212,0,33.28,35.648,prepare,0.00\n",
+    "SIM_TRACE_LOG:1,2,0.6659,0.5122,131.5767,10.00,2.00,1,2.0000,True,True,0.9212,1,33.28,35.748,lap_complete,0\n"
+]
+
+CONTINUOUS_LINES = [
+    "SIM_TRACE_LOG:0,1,0.6158,0.4622,131.5629,-8.85,1.23,[-8.85277653  1.22985172],0.0000,False,True,0.4215,0,"
+    "33.28,49.239,prepare,0.00\n",
+    "SIM_TRACE_LOG:0,2,0.6258,0.4722,131.5629,-8.85,1.23,[-8.85277653, 1.22985172],0.5000,True,True,0.5215,0,"
+    "33.28,49.339,off_track,0.00\n"
+]
+
+
+class TestParseColumns(unittest.TestCase):
+    def test_discrete_columns_match_scalar_parse(self):
+        self._assert_columns_match_scalar_parse(DISCRETE_LINES, False)
+
+    def test_continuous_columns_match_scalar_parse(self):
+        self._assert_columns_match_scalar_parse(CONTINUOUS_LINES, True)
+
+    def _assert_columns_match_scalar_parse(self, lines: list[str], is_continuous: bool):
+        episode_events = []
+        episode_object_locations = []
+        saved_events = ReorderBuffer(20)
+        for i, line in enumerate(lines):
+            parse_episode_event(line, episode_events, episode_object_locations, saved_events, "debug " + str(i),
+                                None, is_continuous)
+        expected_rows = sorted([r for rows in episode_events for r in rows], key=lambda r: (r[0][0], r[0][1]))
+
+        columns = parse_episode_event_columns(lines, is_continuous)
+        order = np.lexsort((columns["step"], columns["episode"]))
+        actual_rows = columns[order].tolist()
+
+        self.assertEqual([row for (row, _) in expected_rows], actual_rows)
+        self.assertEqual(["debug " + str(i) for i in order.tolist()], [debug for (_, debug) in expected_rows])
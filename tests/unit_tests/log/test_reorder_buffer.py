@@ -0,0 +1,54 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+from src.log.reorder_buffer import ReorderBuffer
+
+
+class TestReorderBuffer(unittest.TestCase):
+    def test_steps_in_order_are_ready_immediately(self):
+        buffer = ReorderBuffer(5)
+        self.assertEqual(["a"], buffer.add(0, 1, False, "a"))
+        self.assertEqual(["b"], buffer.add(0, 2, True, "b"))
+        self.assertEqual(["c"], buffer.add(1, 1, False, "c"))
+        self.assertEqual(0, len(buffer))
+        self.assertEqual(0, buffer.out_of_order_count)
+
+    def test_early_steps_wait_for_missing_step(self):
+        buffer = ReorderBuffer(5)
+        self.assertEqual(["a"], buffer.add(0, 1, False, "a"))
+        self.assertEqual([], buffer.add(1, 1, False, "d"))
+        self.assertEqual([], buffer.add(0, 3, True, "c"))
+        self.assertEqual(2, len(buffer))
+        self.assertEqual(["b", "c", "d"], buffer.add(0, 2, False, "b"))
+        self.assertEqual(0, len(buffer))
+        self.assertEqual(2, buffer.out_of_order_count)
+
+    def test_step_that_can_never_be_used_is_still_counted(self):
+        buffer = ReorderBuffer(5)
+        buffer.add(0, 1, False, "a")
+        buffer.add(0, 3, False, "never")
+        buffer.add(0, 2, True, "b")
+        self.assertEqual(["c"], buffer.add(1, 1, False, "c"))
+        self.assertEqual(1, len(buffer))
+
+    def test_full_buffer_gives_up_on_missing_step(self):
+        buffer = ReorderBuffer(2)
+        buffer.add(0, 1, False, "a")
+        self.assertEqual([], buffer.add(0, 3, False, "c"))
+        self.assertEqual([], buffer.add(0, 4, False, "d"))
+        self.assertEqual(["c", "d", "e"], buffer.add(0, 5, False, "e"))
+        self.assertEqual(1, buffer.gap_count)
+        self.assertEqual(0, len(buffer))
+
+    def test_late_step_is_discarded(self):
+        buffer = ReorderBuffer(5)
+        buffer.add(0, 1, True, "a")
+        self.assertEqual([], buffer.add(0, 2, False, "late"))
+        self.assertEqual(1, buffer.discarded_count)
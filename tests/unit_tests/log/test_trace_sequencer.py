@@ -0,0 +1,55 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+from src.log.reorder_buffer import ReorderBuffer
+from src.log.trace_sequencer import TraceSequencer
+
+EPISODES = [0, 0, 0, 1, 1, 2]
+STEPS = [1, 3, 2, 1, 2, 1]
+JOB_COMPLETED = [False, True, False, False, True, False]
+
+
+class TestTraceSequencer(unittest.TestCase):
+    def test_out_of_order_steps_are_sequenced_like_scalar_parse(self):
+        reorder_buffer = ReorderBuffer(20)
+        sequencer = TraceSequencer(reorder_buffer)
+        sequencer.add_rows(EPISODES, STEPS, JOB_COMPLETED, [None] * 6, [])
+
+        self.assertEqual([[0, 2, 1], [3, 4], [5]], sequencer.episode_rows)
+        self.assertEqual(0, len(reorder_buffer))
+        self.assertEqual(1, reorder_buffer.out_of_order_count)
+
+    def test_iteration_markers_count_completed_episodes(self):
+        sequencer = TraceSequencer(ReorderBuffer(20))
+        sequencer.add_rows(EPISODES, STEPS, JOB_COMPLETED, [None] * 6, [3, 5])
+
+        self.assertEqual([0, 1], sequencer.episode_iterations)
+        self.assertEqual(2, sequencer.iteration_id)
+
+    def test_rows_added_in_batches_are_numbered_continuously(self):
+        sequencer = TraceSequencer(ReorderBuffer(20))
+        sequencer.add_rows(EPISODES[:2], STEPS[:2], JOB_COMPLETED[:2], [None] * 2, [])
+        self.assertEqual(0, sequencer.get_first_needed_row())
+
+        sequencer.add_rows(EPISODES[2:], STEPS[2:], JOB_COMPLETED[2:], [None] * 4, [5])
+        self.assertEqual(5, sequencer.get_first_needed_row())
+
+        episode_rows, _, episode_iterations = sequencer.take_completed_episodes()
+        self.assertEqual([[0, 2, 1], [3, 4]], episode_rows)
+        self.assertEqual([0, 0], episode_iterations)
+        self.assertEqual([[5]], sequencer.episode_rows)
+        self.assertEqual(2, sequencer.taken_episode_count)
+
+    def test_object_locations_come_from_first_row_of_episode(self):
+        sequencer = TraceSequencer(ReorderBuffer(20))
+        sequencer.add_rows(EPISODES, STEPS, JOB_COMPLETED, [None, None, None, [(1, 2)], [(3, 4)], None], [])
+
+        _, episode_object_locations, _ = sequencer.take_completed_episodes()
+        self.assertEqual([[], [(1, 2)]], episode_object_locations)
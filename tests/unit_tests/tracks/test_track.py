@@ -0,0 +1,91 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+import numpy as np
+
+from src.tracks.reinvent_2018_track import Reinvent2018Track
+from src.utils.geometry import get_distance_between_points, get_distance_of_point_from_line, get_point_at_bearing
+
+
+class TestTrackArrays(unittest.TestCase):
+    def setUp(self):
+        self.track = Reinvent2018Track()
+        self.track.prepare({})
+
+        # Points scattered around random waypoints, including some exactly on a waypoint
+        random = np.random.default_rng(7)
+        self.waypoint_ids = random.integers(0, self.track.get_number_of_waypoints(), 500)
+        self.x = np.array([self.track.get_waypoint(w)[0] for w in self.waypoint_ids])
+        self.y = np.array([self.track.get_waypoint(w)[1] for w in self.waypoint_ids])
+        self.x[20:] += random.normal(0, 0.5, 480)
+        self.y[20:] += random.normal(0, 0.5, 480)
+
+    def test_positions_match_single_points(self):
+        (sides, distances, before_ids, after_ids) = self.track.get_positions_of_points_on_track(
+            self.x, self.y, self.waypoint_ids)
+
+        for i, (point, w) in enumerate(self._get_points()):
+            self.assertEqual(self.track.get_position_of_point_relative_to_waypoint(point, w), sides[i])
+            self.assertEqual(self._get_distance_from_centre(point, w), distances[i])
+            self.assertEqual(self.track.get_waypoint_ids_before_and_after(point, w), (before_ids[i], after_ids[i]))
+
+    def test_preferring_forwards_matches_single_points(self):
+        (before_ids, after_ids) = self.track.get_waypoint_ids_before_and_after_points(
+            self.x, self.y, self.waypoint_ids, True)
+
+        for i, (point, w) in enumerate(self._get_points()):
+            self.assertEqual(self.track.get_waypoint_ids_before_and_after(point, w, True),
+                             (before_ids[i], after_ids[i]))
+
+    def test_bearings_match_single_waypoints(self):
+        bearings = self.track.get_bearings_to_next_waypoints(self.waypoint_ids)
+        for i, w in enumerate(self.waypoint_ids.tolist()):
+            self.assertEqual(self.track.get_bearing_and_distance_to_next_waypoint(w)[0], bearings[i])
+
+    def test_projected_distances_match_single_rays(self):
+        headings = np.array([self.track.get_bearing_at_waypoint(w) for w in self.waypoint_ids.tolist()])
+        headings[::3] += 25
+        distances = self.track.get_projected_distances_on_track(self.x, self.y, headings, self.waypoint_ids)
+
+        for i, (point, w) in enumerate(self._get_points()):
+            self.assertEqual(self.track.get_projected_distance_on_track(point, float(headings[i]), w), distances[i])
+
+    def test_projected_distance_of_path_is_shortest_of_its_sides(self):
+        point = self.track.get_waypoint(10)
+        heading = self.track.get_bearing_at_waypoint(10) + 10
+        distances = [self.track.get_projected_distance_on_track(point, heading, 10)]
+        for side in [90, -90]:
+            side_point = get_point_at_bearing(point, heading + side, 0.1)
+            distances.append(self.track.get_projected_distance_on_track(side_point, heading, 10))
+
+        self.assertEqual(min(distances), self.track.get_projected_distance_on_track(point, heading, 10, 0.2))
+
+    def test_object_ahead_shortens_projected_distance(self):
+        point = self.track.get_waypoint(5)
+        heading = self.track.get_bearing_at_waypoint(5)
+        object_location = get_point_at_bearing(self.track.get_waypoint(8), heading + 90, 0.1)
+        object_waypoint = self.track.get_closest_waypoint_id(object_location)
+
+        clear_distance = self.track.get_projected_distance_on_track(point, heading, 5)
+        blocked_distance = self.track.get_projected_distance_on_track(point, heading, 5, 0.0,
+                                                                      [object_waypoint], [], [object_location], [])
+        self.assertLess(blocked_distance, clear_distance)
+        self.assertLess(blocked_distance, get_distance_between_points(point, object_location))
+
+    def _get_points(self):
+        return zip(zip(self.x.tolist(), self.y.tolist()), self.waypoint_ids.tolist())
+
+    def _get_distance_from_centre(self, point, waypoint_id):
+        next_waypoint = self.track.get_next_different_waypoint(waypoint_id)
+        previous_waypoint = self.track.get_previous_different_waypoint(waypoint_id)
+        if get_distance_between_points(point, next_waypoint) < get_distance_between_points(point, previous_waypoint):
+            return get_distance_of_point_from_line(point, self.track.get_waypoint(waypoint_id), next_waypoint)
+        else:
+            return get_distance_of_point_from_line(point, self.track.get_waypoint(waypoint_id), previous_waypoint)
@@ -0,0 +1,31 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import math
+import unittest
+
+import numpy as np
+
+from src.utils.colors import ColorPalette, get_color_for_data, get_color_lookup_indexes, get_color_lookup_table
+
+
+class TestColors(unittest.TestCase):
+    def test_lookup_same_as_color_for_data(self):
+        # Including the edges of the discrete colors, and values that round halfway between two colors
+        data = np.concatenate([np.random.default_rng(3).uniform(0, 1, 2000), np.arange(1001) / 1000,
+                               np.arange(256) / 255, (np.arange(255) + 0.5) / 255, [0.2, 0.4, 1 / 3, 2 / 3]])
+
+        for palette in ColorPalette:
+            lookup_table = get_color_lookup_table(palette)
+            indexes = get_color_lookup_indexes(data, palette)
+            for d, i in zip(data.tolist(), indexes.tolist()):
+                self.assertEqual(get_color_for_data(d, palette), lookup_table[i])
+
+    def test_nothing_to_draw_where_nan(self):
+        indexes = get_color_lookup_indexes(np.array([[0.5, math.nan], [math.nan, 1.0]]), ColorPalette.GREYS)
+        self.assertEqual([[128, -1], [-1, 255]], indexes.tolist())
@@ -0,0 +1,42 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+import numpy as np
+
+from src.personalize.configuration.analysis import DISCOUNT_FACTOR_MAX_STEPS
+from src.utils.discount_factors import DiscountFactors
+
+
+class TestDiscountFactors(unittest.TestCase):
+    def test_whole_episode_matches_each_step(self):
+        self._assert_whole_episode_matches_each_step(np.random.default_rng(1).uniform(0, 2, 40), True)
+
+    def test_whole_episode_beyond_look_ahead_matches_each_step(self):
+        rewards = np.random.default_rng(2).uniform(0, 5, 3 * DISCOUNT_FACTOR_MAX_STEPS + 7)
+        self._assert_whole_episode_matches_each_step(rewards, True)
+        self._assert_whole_episode_matches_each_step(rewards, False)
+
+    def test_whole_episode_with_no_discount(self):
+        discount_factors = DiscountFactors()
+        discount_factors.reset_for_log(1.0)
+        rewards = np.ones(DISCOUNT_FACTOR_MAX_STEPS + 5)
+        actual = discount_factors.get_discounted_future_rewards_of_episode(rewards, False)[:, 0]
+        self.assertEqual(DISCOUNT_FACTOR_MAX_STEPS, actual[0])
+        self.assertEqual(5, actual[-5])
+        self.assertEqual(1, actual[-1])
+
+    def _assert_whole_episode_matches_each_step(self, rewards: np.ndarray, multi_discount_factor: bool):
+        discount_factors = DiscountFactors()
+        actual = discount_factors.get_discounted_future_rewards_of_episode(rewards, multi_discount_factor)
+
+        expected = [discount_factors.get_discounted_future_rewards(rewards[i:], multi_discount_factor, True)
+                    for i in range(len(rewards))]
+        self.assertEqual(np.array(expected).shape, actual.shape)
+        np.testing.assert_allclose(expected, actual, rtol=1e-9)
@@ -0,0 +1,42 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+import numpy as np
+
+from src.utils.geometry import get_distance_between_points, get_bearing_between_points, \
+    get_turn_between_directions, get_distances_between_points, get_bearings_between_points, \
+    get_turns_between_directions
+
+START_X = np.array([0.0, 1.5, -2.0, 3.0])
+START_Y = np.array([0.0, 2.5, 1.0, -1.0])
+FINISH_X = np.array([3.0, 1.5, -4.0, 2.0])
+FINISH_Y = np.array([4.0, 0.5, -1.0, -1.0])
+
+
+class TestGeometryArrays(unittest.TestCase):
+    def test_distances_match_single_points(self):
+        expected = [get_distance_between_points(a, b) for a, b in self._get_points()]
+        self.assertEqual(expected, get_distances_between_points(START_X, START_Y, FINISH_X, FINISH_Y).tolist())
+
+    def test_bearings_match_single_points(self):
+        expected = [get_bearing_between_points(a, b) for a, b in self._get_points()]
+        actual = get_bearings_between_points(START_X, START_Y, FINISH_X, FINISH_Y).tolist()
+        for e, a in zip(expected, actual):
+            self.assertAlmostEqual(e, a, 10)
+
+    def test_turns_are_in_proper_range(self):
+        current = np.array([170.0, -170.0, 10.0, 0.0, -90.0])
+        required = np.array([-170.0, 170.0, 40.0, 180.0, 90.0])
+        expected = [get_turn_between_directions(c, r) for c, r in zip(current, required)]
+        self.assertEqual(expected, get_turns_between_directions(current, required).tolist())
+
+    @staticmethod
+    def _get_points():
+        return zip(zip(START_X, START_Y), zip(FINISH_X, FINISH_Y))
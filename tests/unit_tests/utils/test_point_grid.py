@@ -0,0 +1,44 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+import numpy as np
+
+from src.utils.geometry import get_distance_between_points
+from src.utils.point_grid import PointGrid
+
+
+class TestPointGrid(unittest.TestCase):
+    def setUp(self):
+        random = np.random.default_rng(3)
+        self.points = [(float(x), float(y)) for (x, y) in random.uniform(0, 10, (200, 2))]
+        self.points += self.points[:20]   # Repeated points, to make ties
+        self.ids = list(range(len(self.points)))
+        self.ids.reverse()
+        self.grid = PointGrid(self.points, self.ids, 0.5)
+
+        self.queries = [(float(x), float(y)) for (x, y) in random.uniform(-5, 15, (300, 2))] + self.points[:30]
+
+    def test_nearest_matches_scan_of_every_point(self):
+        for query in self.queries:
+            self.assertEqual(self._get_nearest_id_by_scan(query), self.grid.get_nearest_id(query))
+
+    def test_nearest_of_array_matches_single_points(self):
+        x = np.array([x for (x, _) in self.queries])
+        y = np.array([y for (_, y) in self.queries])
+        expected = [self.grid.get_nearest_id(q) for q in self.queries]
+        self.assertEqual(expected, self.grid.get_nearest_ids(x, y).tolist())
+
+    def test_tie_between_equidistant_points_chooses_lowest_id(self):
+        grid = PointGrid([(1.0, 0.0), (-1.0, 0.0), (0.0, 1.0)], [5, 3, 4], 0.3)
+        self.assertEqual(3, grid.get_nearest_id((0.0, 0.0)))
+
+    def _get_nearest_id_by_scan(self, query):
+        distances = [(get_distance_between_points(query, p), i) for p, i in zip(self.points, self.ids)]
+        return min(distances)[1]
@@ -0,0 +1,47 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+from src.utils.progress import ProgressReporter, ProgressTicker
+
+
+class RecordingProgressReporter(ProgressReporter):
+    def __init__(self):
+        self.progress = []
+
+    def set_progress(self, percent_done: float):
+        self.progress.append(percent_done)
+
+
+class TestProgressTicker(unittest.TestCase):
+    def test_ticks_are_throttled_but_start_and_finish_are_reported(self):
+        reporter = RecordingProgressReporter()
+        ticker = ProgressTicker(reporter, 10, 20, 1000)
+        next_tick = ticker.tick(0)
+        tick_count = 1
+        for amount_done in range(1, 1001):
+            if amount_done >= next_tick:
+                next_tick = ticker.tick(amount_done)
+                tick_count += 1
+        ticker.finish()
+
+        self.assertLessEqual(tick_count, 101)
+        self.assertEqual(10, reporter.progress[0])
+        self.assertEqual(20, reporter.progress[-1])
+        self.assertEqual(sorted(reporter.progress), reporter.progress)
+
+    def test_step_is_never_less_than_minimum(self):
+        ticker = ProgressTicker(ProgressReporter(), 0, 100, 1000, 300)
+        self.assertEqual(300, ticker.tick(0))
+        self.assertEqual(310, ticker.tick(10))
+
+    def test_empty_task_finishes_at_max_percent(self):
+        reporter = RecordingProgressReporter()
+        ProgressTicker(reporter, 0, 50, 0).finish()
+        self.assertEqual([50], reporter.progress)
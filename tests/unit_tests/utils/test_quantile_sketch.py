@@ -0,0 +1,52 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+import numpy as np
+
+from src.utils.quantile_sketch import QuantileSketch
+
+PERCENTS = np.arange(100)
+
+
+class TestQuantileSketch(unittest.TestCase):
+    def test_few_values_are_exact(self):
+        values = np.random.default_rng(1).normal(0, 1, 50)
+        sketch = QuantileSketch(100)
+        sketch.add(values)
+        self.assertEqual(np.percentile(values, PERCENTS).tolist(), sketch.get_percentiles(PERCENTS).tolist())
+
+    def test_many_values_are_estimated_in_bounded_memory(self):
+        values = np.random.default_rng(2).exponential(1, 100000)
+        sketch = QuantileSketch(200)
+        for chunk in np.array_split(values, 100):
+            sketch.add(chunk)
+
+        self.assertEqual(100000, sketch.get_count())
+        self.assertLess(sum(len(level) for level in sketch._levels), 200 * 12)
+        self.assertLess(self._get_max_rank_error(values, sketch), 0.02)
+
+    def test_merged_sketches_estimate_all_values(self):
+        random = np.random.default_rng(3)
+        values_1 = random.normal(0, 1, 30000)
+        values_2 = random.normal(2, 1, 50000)
+        sketch = QuantileSketch(200)
+        sketch.add(values_1)
+        other_sketch = QuantileSketch(200)
+        other_sketch.add(values_2)
+
+        sketch.merge(other_sketch)
+        self.assertEqual(80000, sketch.get_count())
+        self.assertLess(self._get_max_rank_error(np.concatenate([values_1, values_2]), sketch), 0.02)
+
+    @staticmethod
+    def _get_max_rank_error(values: np.ndarray, sketch: QuantileSketch):
+        # How far out the estimated percentiles are, as a fraction of all the values
+        ranks = np.searchsorted(np.sort(values), sketch.get_percentiles(PERCENTS)) / len(values)
+        return np.abs(ranks - PERCENTS / 100).max()
@@ -0,0 +1,63 @@
+#
+# DeepRacer Guru
+#
+# Version 4.0 onwards
+#
+# Copyright (c) 2023 dmh23
+#
+
+import unittest
+
+import numpy as np
+
+from src.action_space.action_space import ActionSpace
+from src.episode.episode import Episode
+from src.episode.episode_table import create_episode_table
+from src.log.debug_logs import create_debug_logs
+from src.log.parse import parse_episode_event_columns
+from src.tracks.reinvent_2018_track import Reinvent2018Track
+from src.utils.reward_percentiles import RewardPercentiles
+
+TRACE_LINE = "SIM_TRACE_LOG:{},{},{:.4f},0.4622,131.5767,20.00,1.50,-1,{:.4f},False,True,{:.4f},0,33.28,{:.3f},{}\n"
+
+
+class TestRewardPercentiles(unittest.TestCase):
+    def setUp(self):
+        track = Reinvent2018Track()
+        track.prepare({})
+        action_space = ActionSpace()
+        action_space.mark_as_continuous()
+
+        random = np.random.default_rng(5)
+        self.episodes = []
+        for episode_id in range(4):
+            rewards = random.uniform(0, 10, 20)
+            lines = [TRACE_LINE.format(episode_id, step + 1, 0.6 + step * 0.05, reward, 0.5 + step, 30 + step * 0.1,
+                                       "off_track" if step == 19 else "in_progress")
+                     for step, reward in enumerate(rewards.tolist())]
+            table = create_episode_table(parse_episode_event_columns(lines, True),
+                                         create_debug_logs([""] * len(lines)), True)
+            self.episodes.append(Episode(episode_id, 0, table, [], action_space, True, track))
+
+    def test_episodes_are_not_changed(self):
+        rewards = [list(e.rewards) for e in self.episodes]
+        RewardPercentiles(self.episodes, False)
+        self.assertEqual(rewards, [e.rewards for e in self.episodes])
+
+    def test_percentiles_of_all_rewards(self):
+        all_rewards = np.concatenate([e.rewards for e in self.episodes])
+        percentiles = RewardPercentiles(self.episodes, False)
+        self.assertEqual(0, percentiles.get_reward_percentile(all_rewards.min()))
+        self.assertEqual(50, percentiles.get_reward_percentile(np.median(all_rewards)))
+        self.assertEqual(100, percentiles.get_reward_percentile(all_rewards.max() + 1))
+
+        all_future_rewards = np.concatenate([e.discounted_future_rewards[0] for e in self.episodes])
+        self.assertEqual(50, percentiles.get_discounted_future_reward_percentile(np.median(all_future_rewards), 0))
+
+    def test_merged_sketches_match_sketch_of_all_episodes(self):
+        percentiles = RewardPercentiles(self.episodes[:2], False, 1000)
+        percentiles.merge(RewardPercentiles(self.episodes[2:], False, 1000))
+        all_percentiles = RewardPercentiles(self.episodes, False, 1000)
+
+        for reward in np.linspace(0, 10, 21).tolist():
+            self.assertEqual(all_percentiles.get_reward_percentile(reward), percentiles.get_reward_percentile(reward))